@@ -9,7 +9,8 @@ from datetime import datetime, timedelta
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker # Added async_sessionmaker
 from utils.pgvector_client import PgVectorClient, FUNDING_MIN
-from database.models import Grant, Analysis, GrantStatus
+from database.models import Grant, Analysis
+from app.duplicate_detection import grant_upsert_statement, grant_url_key
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +34,8 @@ class AnalysisAgent:
             
         analyzed_and_stored_grants = []
         try:
-            existing_titles = await self._get_existing_grant_titles()
+            # Duplicates of stored grants are skipped on insert (see _analyze_and_store_single_grant)
+            existing_titles: Set[str] = set()
             
             for grant_data in grants:
                 if not isinstance(grant_data, dict):
@@ -63,14 +65,6 @@ class AnalysisAgent:
             logger.error(f"Error during grant analysis batch: {str(e)}", exc_info=True)
             return analyzed_and_stored_grants # Return what was processed so far
 
-    async def _get_existing_grant_titles(self) -> Set[str]:
-        """Get titles of existing grants to avoid duplicates."""
-        async with self.db_sessionmaker() as session: # Use sessionmaker
-            result = await session.execute(
-                select(Grant.title).distinct()
-            )
-            return set(result.scalars().all())
-    
     async def _analyze_and_store_single_grant(self, grant_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Analyze a single grant, store it, and return its analyzed representation."""
         # Safe extraction of fields from grant_data
@@ -82,12 +76,8 @@ class AnalysisAgent:
         source_url = grant_data.get("source_url")
         category = grant_data.get("category", "Uncategorized")
         eligibility_info = grant_data.get("eligibility_criteria", grant_data.get("eligibility")) # Check both keys
-        if isinstance(eligibility_info, str): # Ensure eligibility is a dict for JSON field
-            eligibility_json = {"text_summary": eligibility_info}
-        elif isinstance(eligibility_info, dict):
-            eligibility_json = eligibility_info
-        else:
-            eligibility_json = {"details": "Not specified or invalid format"}
+        if isinstance(eligibility_info, dict): # Only a text summary has a column to go in
+            eligibility_info = eligibility_info.get("text_summary")
 
         # Scores
         semantic_relevance_score = grant_data.get("score", 0.5)
@@ -107,24 +97,33 @@ class AnalysisAgent:
 
         async with self.db_sessionmaker() as session:
             try:
-                db_grant = Grant(
+                # Grants without a URL identity fall back to an exact title check
+                if grant_url_key(source_url) is None:
+                    existing = await session.execute(select(Grant.id).where(Grant.title == title).limit(1))
+                    if existing.scalar_one_or_none():
+                        logger.info(f"Skipping duplicate grant by title: {title}")
+                        return None
+
+                # Insert unless a grant with the same normalized URL is already stored
+                grant_id = (await session.execute(grant_upsert_statement([dict(
                     title=title,
                     description=description,
                     # funding_amount is tricky if it's a range. Store raw or parse to a representative float?
                     # For now, let's try to parse a primary numeric value for the DB field if it's a float.
                     funding_amount=self._parse_funding_to_float(raw_funding_amount), 
                     deadline=parsed_deadline_dt, # Store as datetime
-                    source=source_name,
+                    source_name=source_name,
                     source_url=source_url,
-                    category=category,
-                    eligibility=eligibility_json, # Stored as JSON
-                    status=GrantStatus.ACTIVE # Default status
-                )
-                session.add(db_grant)
-                await session.flush() # To get db_grant.id for the Analysis record
+                    identified_sector=category,
+                    eligibility_summary_llm=eligibility_info if isinstance(eligibility_info, str) else None,
+                    record_status="ACTIVE" # Default status
+                )], update=False).returning(Grant.id))).scalar_one_or_none()
+                if grant_id is None:
+                    logger.info(f"Skipping duplicate grant by URL: {source_url}")
+                    return None
                 
                 db_analysis = Analysis(
-                    grant_id=db_grant.id,
+                    grant_id=grant_id,
                     final_score=final_score,
                     relevance_score=semantic_relevance_score,
                     overall_summary=f"Deadline: {deadline_score:.2f}, Funding: {funding_score:.2f}, Semantic: {semantic_relevance_score:.2f}"
@@ -136,7 +135,7 @@ class AnalysisAgent:
                 
                 # Return a dictionary representing the analyzed grant for further processing (e.g., notifications)
                 return {
-                    "id": db_grant.id, # Include DB id
+                    "id": grant_id, # Include DB id
                     "title": title,
                     "description": description,
                     "funding_amount_display": str(raw_funding_amount or "N/A"), # Keep display string
@@ -4,10 +4,10 @@ This module provides backward compatibility while using the new recursive approa
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+from typing import AsyncGenerator, Awaitable, Callable, List, Optional, Dict, Any
 from datetime import datetime, timezone
 
-from agents.recursive_research_agent import RecursiveResearchAgent
+from agents.recursive_research_agent import RecursiveResearchAgent, SearchProgress
 from app.models import GrantFilter
 from app.schemas import EnrichedGrant
 from sqlalchemy.ext.asyncio import async_sessionmaker
@@ -42,6 +42,27 @@ class IntegratedResearchAgent:
             logger.warning("Legacy deep research is disabled. Using recursive search.")
             return await self.recursive_agent.search_grants_recursive(grant_filter)
 
+    async def stream_grants(
+        self,
+        grant_filter: GrantFilter,
+        on_progress: Optional[Callable[[SearchProgress], Awaitable[None]]] = None
+    ) -> AsyncGenerator[EnrichedGrant, None]:
+        """
+        Streaming search: yields grants as soon as their chunk resolves so
+        callers can persist them while later tiers are still being searched.
+        """
+        logger.info("Using streaming recursive chunked search approach")
+        async for grant in self.recursive_agent.stream_grants_recursive(grant_filter, on_progress=on_progress):
+            yield grant
+
+    async def search_grants_for_filters(self, grant_filters: Dict[Any, GrantFilter]) -> Dict[Any, List[EnrichedGrant]]:
+        """
+        Search for many filters at once, executing each distinct chunk only once.
+        Used by the scheduled beat cycle to share chunk searches across users.
+        """
+        logger.info(f"Using planned recursive search for {len(grant_filters)} filters")
+        return await self.recursive_agent.search_grants_for_filters(grant_filters)
+
     async def enrich_grant_details(self, grant: EnrichedGrant) -> EnrichedGrant:
         """
         Enrich a single grant with additional details using targeted recursive searches.
@@ -144,7 +165,7 @@ class IntegratedResearchAgent:
             ],
             "deep_research_enabled": False,
             "chunking_enabled": True,
-            "rate_limit_strategy": "batch_processing_with_delays"
+            "rate_limit_strategy": "adaptive_token_bucket"
         }
 
 # Factory function for backward compatibility
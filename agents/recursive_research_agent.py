@@ -7,7 +7,7 @@ import logging
 import asyncio
 import time
 import json
-from typing import Dict, List, Any, Optional, Set
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List, Any, Optional, Set
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 
@@ -38,6 +38,17 @@ class ChunkedSearchResult:
     search_metadata: Dict[str, Any]
     chunk_info: SearchChunk
 
+@dataclass
+class SearchProgress:
+    """Progress event emitted by the streaming search pipeline."""
+    tier: str
+    chunks_done: int
+    chunks_total: int
+    raw_grants: int
+
+# Marks the end of the chunk producer's output
+_PIPELINE_DONE = object()
+
 class RecursiveResearchAgent:
     """
     Refactored Research Agent using recursive, chunked reasoning searches.
@@ -53,10 +64,9 @@ class RecursiveResearchAgent:
         self.FALLBACK_MODEL = "deepseek-chat"  # Same model for consistency
         self.FAST_MODEL = "deepseek-chat"  # Same model for consistency
         
-        # Chunking configuration
+        # Chunking configuration (request pacing is handled by the shared
+        # DeepSeek rate limiter in services.rate_limiter)
         self.MAX_KEYWORDS_PER_CHUNK = 3
-        self.MAX_CONCURRENT_CHUNKS = 5
-        self.CHUNK_DELAY_SECONDS = 1.5  # Respect rate limits
         
         # Kevin's specific focus areas for chunking
         self.FOCUS_AREAS = {
@@ -94,12 +104,40 @@ class RecursiveResearchAgent:
     # Minimum grants before we stop widening geographic scope
     MIN_RESULTS_BEFORE_WIDENING_STOPS = 5
 
+    # Geographic tiers in widening order (local first)
+    TIER_ORDER = ["local", "state", "regional", "federal"]
+
+    # Bound on raw grants buffered between chunk execution and enrichment;
+    # a slow consumer (e.g. persisting + embedding) pauses chunk fan-out.
+    PIPELINE_QUEUE_SIZE = 50
+
     async def search_grants_recursive(self, grant_filter: GrantFilter) -> List[EnrichedGrant]:
         """
         Main entry point for recursive grant searching.
         Uses progressive geographic widening: searches local first, then widens
         to state/regional/federal only if fewer than MIN_RESULTS grants found.
         """
+        return [grant async for grant in self.stream_grants_recursive(grant_filter)]
+
+    async def stream_grants_recursive(
+        self,
+        grant_filter: GrantFilter,
+        on_progress: Optional[Callable[[SearchProgress], Awaitable[None]]] = None
+    ) -> AsyncGenerator[EnrichedGrant, None]:
+        """
+        Streaming version of search_grants_recursive.
+
+        Pipeline: chunk -> parse -> dedup -> enrich, yielding each EnrichedGrant
+        as soon as the chunk that found it resolves, so callers can persist
+        while later chunks and tiers are still in flight. Chunk results flow
+        through a bounded queue, so a slow consumer applies back-pressure.
+        Stops once MAX_GRANTS_PER_SEARCH grants have been yielded.
+
+        Args:
+            grant_filter: Search filter
+            on_progress: Awaited with a SearchProgress after each chunk, from the
+                consumer's task (safe to use the caller's DB session)
+        """
         logger.info("Starting recursive grant search with progressive geographic widening")
         start_time = time.time()
 
@@ -107,59 +145,232 @@ class RecursiveResearchAgent:
         search_chunks = self._create_search_chunks(grant_filter)
         logger.info(f"Created {len(search_chunks)} search chunks for processing")
 
-        all_grants = []
-        processed_urls = set()
+        # Make grant limit configurable
+        settings = Settings()
+        max_grants = getattr(settings, 'MAX_GRANTS_PER_SEARCH', 20)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+        producer = asyncio.create_task(
+            self._produce_chunk_results(self._group_chunks_by_tier(search_chunks), queue)
+        )
+
+        seen_grants: Set[str] = set()
+        yielded = 0
+        try:
+            while yielded < max_grants:
+                item = await queue.get()
+                if item is _PIPELINE_DONE:
+                    break
+                if isinstance(item, SearchProgress):
+                    if on_progress:
+                        try:
+                            await on_progress(item)
+                        except Exception as e:
+                            logger.warning(f"Search progress callback failed: {e}")
+                    continue
+
+                # Incremental dedup (same identity as _deduplicate_grants)
+                identifier = self._grant_identifier(item)
+                if not identifier or identifier in seen_grants:
+                    continue
+                seen_grants.add(identifier)
+
+                try:
+                    enriched = await self._create_enriched_grant(item)
+                except Exception as e:
+                    logger.warning(f"Failed to enrich grant {item.get('title', 'Unknown')}: {e}")
+                    continue
+                if enriched:
+                    yielded += 1
+                    yield enriched
+        finally:
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+        total_time = time.time() - start_time
+        logger.info(f"Recursive search completed in {total_time:.2f}s. Found {yielded} enriched grants")
+
+    async def _produce_chunk_results(self, tier_chunks: Dict[str, List[SearchChunk]], queue: asyncio.Queue) -> None:
+        """
+        Pipeline producer: run chunks tier by tier and push raw grants and
+        progress events onto the queue as each chunk resolves.
+        """
+        processed_urls: Set[str] = set()
+        raw_grants = 0
+        chunks_done = 0
+        chunks_total = sum(len(chunks) for chunks in tier_chunks.values())
         current_tier = None
 
-        # Group chunks by geographic tier for progressive widening
-        tier_order = ["local", "state", "regional", "federal"]
-        tier_chunks = {t: [] for t in tier_order}
-        for chunk in search_chunks:
-            tier_chunks.get(chunk.geographic_focus, tier_chunks["federal"]).append(chunk)
+        try:
+            for tier in self.TIER_ORDER:
+                chunks_for_tier = tier_chunks[tier]
+                if not chunks_for_tier:
+                    continue
+
+                # Check if we already have enough grants
+                if raw_grants >= self.MIN_RESULTS_BEFORE_WIDENING_STOPS and tier != "local":
+                    logger.info(
+                        f"Skipping '{tier}' tier - already found {raw_grants} grants "
+                        f"(>= {self.MIN_RESULTS_BEFORE_WIDENING_STOPS} minimum)"
+                    )
+                    chunks_total -= len(chunks_for_tier)
+                    continue
+
+                current_tier = tier
+                logger.info(f"Searching '{tier}' tier ({len(chunks_for_tier)} chunks, {raw_grants} grants so far)")
+
+                tasks = [
+                    asyncio.create_task(self._process_search_chunk(chunk, processed_urls))
+                    for chunk in chunks_for_tier
+                ]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        try:
+                            result = await next_done
+                        except Exception as e:
+                            logger.error(f"Error processing chunk in '{tier}' tier: {e}")
+                            result = None
+
+                        chunks_done += 1
+                        if result and isinstance(result, ChunkedSearchResult) and result.grants:
+                            raw_grants += len(result.grants)
+                            logger.info(f"Chunk {result.chunk_info.chunk_id} found {len(result.grants)} grants")
+                            for grant in result.grants:
+                                await queue.put(grant)
+
+                        await queue.put(SearchProgress(
+                            tier=tier,
+                            chunks_done=chunks_done,
+                            chunks_total=chunks_total,
+                            raw_grants=raw_grants
+                        ))
+                finally:
+                    for task in tasks:
+                        task.cancel()
+
+            # Final totals once skipped tiers have been discounted
+            await queue.put(SearchProgress(
+                tier=current_tier or "",
+                chunks_done=chunks_done,
+                chunks_total=chunks_total,
+                raw_grants=raw_grants
+            ))
+            logger.info(f"Progressive search completed through '{current_tier}' tier with {raw_grants} raw grants")
+        except Exception as e:
+            logger.error(f"Search pipeline producer failed: {e}", exc_info=True)
 
-        for tier in tier_order:
-            chunks_for_tier = tier_chunks[tier]
-            if not chunks_for_tier:
-                continue
+        await queue.put(_PIPELINE_DONE)
+
+    async def search_grants_for_filters(self, grant_filters: Dict[Any, GrantFilter]) -> Dict[Any, List[EnrichedGrant]]:
+        """
+        Run one search cycle for many filters (e.g. every user in a beat cycle).
 
-            # Check if we already have enough grants
-            if len(all_grants) >= self.MIN_RESULTS_BEFORE_WIDENING_STOPS and tier != "local":
+        Chunks are planned across all filters and each distinct chunk is sent to
+        DeepSeek once per tier; its raw grants are then fanned back out to every
+        filter that asked for it. Progressive geographic widening is applied per
+        filter exactly as in search_grants_recursive, so a tier is only executed
+        for filters that still have fewer than MIN_RESULTS grants.
+
+        Args:
+            grant_filters: Mapping of caller key (e.g. user id) -> GrantFilter
+
+        Returns:
+            Mapping of the same keys -> enriched grants
+        """
+        start_time = time.time()
+        chunks_by_owner = {
+            owner: self._group_chunks_by_tier(self._create_search_chunks(grant_filter))
+            for owner, grant_filter in grant_filters.items()
+        }
+        raw_by_owner: Dict[Any, List[Dict[str, Any]]] = {owner: [] for owner in grant_filters}
+        chunk_results: Dict[tuple, List[Dict[str, Any]]] = {}
+        requested = 0
+
+        for tier in self.TIER_ORDER:
+            owners_in_tier = []
+            pending: Dict[tuple, SearchChunk] = {}
+
+            for owner, tier_chunks in chunks_by_owner.items():
+                if not tier_chunks[tier]:
+                    continue
+                if tier != "local" and len(raw_by_owner[owner]) >= self.MIN_RESULTS_BEFORE_WIDENING_STOPS:
+                    continue
+                owners_in_tier.append(owner)
+                for chunk in tier_chunks[tier]:
+                    requested += 1
+                    signature = self._chunk_signature(chunk)
+                    if signature not in chunk_results:
+                        pending.setdefault(signature, chunk)
+
+            if pending:
                 logger.info(
-                    f"Skipping '{tier}' tier - already found {len(all_grants)} grants "
-                    f"(>= {self.MIN_RESULTS_BEFORE_WIDENING_STOPS} minimum)"
+                    f"Searching '{tier}' tier for {len(owners_in_tier)} filters "
+                    f"({len(pending)} distinct chunks)"
                 )
-                continue
+                results = await self._execute_chunks(list(pending.values()))
+                chunk_results.update(zip(pending.keys(), results))
 
-            current_tier = tier
-            logger.info(f"Searching '{tier}' tier ({len(chunks_for_tier)} chunks, {len(all_grants)} grants so far)")
+            for owner in owners_in_tier:
+                for chunk in chunks_by_owner[owner][tier]:
+                    raw_by_owner[owner].extend(chunk_results[self._chunk_signature(chunk)])
 
-            # Process tier chunks in batches
-            chunk_batches = [
-                chunks_for_tier[i:i + self.MAX_CONCURRENT_CHUNKS]
-                for i in range(0, len(chunks_for_tier), self.MAX_CONCURRENT_CHUNKS)
-            ]
+        logger.info(
+            f"Planned search executed {len(chunk_results)} distinct chunks for "
+            f"{requested} requested across {len(grant_filters)} filters"
+        )
 
-            for batch_idx, chunk_batch in enumerate(chunk_batches):
-                batch_tasks = [
-                    self._process_search_chunk_with_delay(chunk, processed_urls)
-                    for chunk in chunk_batch
-                ]
+        results_by_owner = {}
+        for owner, raw_grants in raw_by_owner.items():
+            results_by_owner[owner] = await self._finalize_grants(raw_grants)
 
-                batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
+        logger.info(f"Planned search completed in {time.time() - start_time:.2f}s")
+        return results_by_owner
 
-                for i, result in enumerate(batch_results):
-                    if isinstance(result, Exception):
-                        logger.error(f"Error processing chunk {chunk_batch[i].chunk_id}: {result}")
-                        continue
-                    if result and isinstance(result, ChunkedSearchResult) and result.grants:
-                        all_grants.extend(result.grants)
-                        logger.info(f"Chunk {chunk_batch[i].chunk_id} found {len(result.grants)} grants")
+    def _group_chunks_by_tier(self, chunks: List[SearchChunk]) -> Dict[str, List[SearchChunk]]:
+        """Group chunks by geographic tier for progressive widening."""
+        tier_chunks = {t: [] for t in self.TIER_ORDER}
+        for chunk in chunks:
+            tier_chunks.get(chunk.geographic_focus, tier_chunks["federal"]).append(chunk)
+        return tier_chunks
+
+    @staticmethod
+    def _chunk_signature(chunk: SearchChunk) -> tuple:
+        """Identity of a chunk's query: chunks with equal signatures produce the same prompt."""
+        return (tuple(chunk.keywords), chunk.geographic_focus, chunk.sector_focus)
+
+    async def _execute_chunks(
+        self,
+        chunks: List[SearchChunk],
+        processed_urls: Optional[Set[str]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run chunks concurrently, paced by the shared DeepSeek rate limiter.
 
-                if batch_idx < len(chunk_batches) - 1:
-                    await asyncio.sleep(self.CHUNK_DELAY_SECONDS * 2)
+        Chunks are started in priority order and the limiter admits them FIFO,
+        so local chunks still reach the API first. Returns the raw grants for
+        each chunk, in input order. When processed_urls is None every chunk gets
+        its own seen-set, so results can be shared between searches without one
+        chunk masking another's grants.
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in chunks]
+        chunk_results = await asyncio.gather(*[
+            self._process_search_chunk(chunk, processed_urls if processed_urls is not None else set())
+            for chunk in chunks
+        ], return_exceptions=True)
+
+        for i, result in enumerate(chunk_results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing chunk {chunks[i].chunk_id}: {result}")
+                continue
+            if result and isinstance(result, ChunkedSearchResult) and result.grants:
+                results[i] = result.grants
+                logger.info(f"Chunk {chunks[i].chunk_id} found {len(result.grants)} grants")
 
-        logger.info(f"Progressive search completed through '{current_tier}' tier with {len(all_grants)} raw grants")
-        
+        return results
+
+    async def _finalize_grants(self, all_grants: List[Dict[str, Any]]) -> List[EnrichedGrant]:
+        """Deduplicate raw grants and convert them to EnrichedGrant objects."""
         # Remove duplicates and enrich results
         unique_grants = self._deduplicate_grants(all_grants)
         logger.info(f"Found {len(unique_grants)} unique grants after deduplication")
@@ -177,10 +388,7 @@ class RecursiveResearchAgent:
                     enriched_grants.append(enriched)
             except Exception as e:
                 logger.warning(f"Failed to enrich grant {grant_data.get('title', 'Unknown')}: {e}")
-        
-        total_time = time.time() - start_time
-        logger.info(f"Recursive search completed in {total_time:.2f}s. Found {len(enriched_grants)} enriched grants")
-        
+
         return enriched_grants
 
     def _create_search_chunks(self, grant_filter: GrantFilter) -> List[SearchChunk]:
@@ -225,11 +433,6 @@ class RecursiveResearchAgent:
         
         return chunks
 
-    async def _process_search_chunk_with_delay(self, chunk: SearchChunk, processed_urls: Set[str]) -> ChunkedSearchResult:
-        """Process a single search chunk with appropriate delay for rate limiting."""
-        await asyncio.sleep(self.CHUNK_DELAY_SECONDS * chunk.priority)  # Stagger based on priority
-        return await self._process_search_chunk(chunk, processed_urls)
-
     async def _process_search_chunk(self, chunk: SearchChunk, processed_urls: Set[str]) -> ChunkedSearchResult:
         """Process a single search chunk using recursive reasoning."""
         logger.debug(f"Processing chunk {chunk.chunk_id}: {chunk.keywords}")
@@ -474,27 +677,27 @@ class RecursiveResearchAgent:
                     refined_grant["detailed_analysis"] = refinement_content
                     refined_grant["refinement_completed"] = True
                     refined_grants.append(refined_grant)
-                
-                # Small delay between refinements
-                await asyncio.sleep(0.5)
-                
+
             except Exception as e:
                 logger.warning(f"Failed to refine grant {grant.get('title', 'Unknown')}: {e}")
         
         return refined_grants
 
+    @staticmethod
+    def _grant_identifier(grant: Dict[str, Any]) -> str:
+        """Identity used for deduplication: URL if available, otherwise title."""
+        # Create unique identifier with proper null handling
+        title = (grant.get('title') or '').lower().strip()
+        url = (grant.get('source_url') or '').strip()
+        return url if url else title
+
     def _deduplicate_grants(self, grants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Remove duplicate grants based on title and URL."""
         seen_grants = set()
         unique_grants = []
         
         for grant in grants:
-            # Create unique identifier with proper null handling
-            title = (grant.get('title') or '').lower().strip()
-            url = (grant.get('source_url') or '').strip()
-            
-            # Use URL if available, otherwise use title
-            identifier = url if url else title
+            identifier = self._grant_identifier(grant)
             
             if identifier and identifier not in seen_grants:
                 seen_grants.add(identifier)
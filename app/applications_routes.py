@@ -5,14 +5,16 @@ API routes for AI-generated grant applications management.
 import logging
 from typing import Optional, List
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
 from app.auth import get_current_user, check_application_limit
 from database.session import get_db
 from database.models import User, GeneratedApplication, Grant, BusinessProfile, ApplicationGenerationStatus
-from tasks.application_generator import generate_grant_application
+from services.application_stream import format_sse, get_application_stream, stream_channel
+from tasks.application_generator import SECTION_GENERATORS, generate_grant_application, regenerate_application_section
 
 logger = logging.getLogger(__name__)
 
@@ -146,6 +148,7 @@ async def get_application(
 @router.post("/generate")
 async def create_application(
     grant_id: int = Body(..., embed=True),
+    stream: bool = Body(False, embed=True),
     current_user: User = Depends(check_application_limit),
     db: AsyncSession = Depends(get_db)
 ):
@@ -155,9 +158,10 @@ async def create_application(
 
     Args:
         grant_id: Grant ID to generate application for
+        stream: Also publish sections as they are written, readable from stream_url
 
     Returns:
-        Task ID for tracking generation progress
+        Task ID for tracking generation progress (and stream_url in streaming mode)
     """
     try:
         # Check if grant exists
@@ -200,20 +204,27 @@ async def create_application(
             }
 
         # Queue Celery task for generation
-        task = generate_grant_application.delay(
-            user_id=current_user.id,
-            grant_id=grant_id,
-            business_profile_id=profile.id
-        )
+        task_kwargs = {
+            "user_id": current_user.id,
+            "grant_id": grant_id,
+            "business_profile_id": profile.id
+        }
+        stream = stream and get_application_stream() is not None
+        if stream:
+            task_kwargs["stream"] = True
+        task = generate_grant_application.apply_async(kwargs=task_kwargs)
 
         logger.info(f"Application generation queued for user {current_user.id}, grant {grant_id}, task {task.id}")
 
-        return {
+        response = {
             "message": "Application generation started",
             "task_id": task.id,
             "status": "processing",
             "estimated_time_seconds": 60
         }
+        if stream:
+            response["stream_url"] = f"/api/applications/tasks/{task.id}/stream"
+        return response
 
     except HTTPException:
         raise
@@ -263,6 +274,45 @@ async def get_task_status(
         raise HTTPException(status_code=500, detail="Failed to check task status")
 
 
+@router.get("/tasks/{task_id}/stream")
+async def stream_task(
+    task_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-sent events for a generation task queued with stream=true.
+
+    Sends the draft application id, each section's tokens as they are written,
+    each finished section, and a final completed/failed event.
+
+    Args:
+        task_id: Celery task ID
+
+    Returns:
+        text/event-stream response
+    """
+    application_stream = get_application_stream()
+    if application_stream is None:
+        raise HTTPException(status_code=503, detail="Application streaming is not available")
+
+    channel = stream_channel(current_user.id, task_id)
+
+    async def events():
+        try:
+            async for event in application_stream.subscribe(channel, request.is_disconnected):
+                yield ": keepalive\n\n" if event is None else format_sse(event)
+        except Exception as e:
+            logger.error(f"Error streaming task {task_id}: {str(e)}", exc_info=True)
+            yield format_sse({"id": "error", "event": "stream_error", "error": "Stream interrupted"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.put("/{application_id}")
 async def update_application(
     application_id: int,
@@ -370,35 +420,34 @@ async def regenerate_section(
         if not application:
             raise HTTPException(status_code=404, detail="Application not found")
 
-        valid_sections = [
-            "executive_summary",
-            "needs_statement",
-            "project_description",
-            "budget_narrative",
-            "organizational_capacity",
-            "impact_statement"
-        ]
-
-        if section_name not in valid_sections:
+        if section_name not in SECTION_GENERATORS:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid section. Must be one of: {', '.join(valid_sections)}"
+                detail=f"Invalid section. Must be one of: {', '.join(SECTION_GENERATORS)}"
             )
 
-        # TODO: Implement section regeneration with DeepSeek
-        # For now, return a placeholder
-        logger.info(f"Section regeneration requested: {section_name} for application {application_id}")
+        try:
+            section_result = await regenerate_application_section(db, application, section_name, feedback)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+        await db.commit()
+        await db.refresh(application)
+
+        logger.info(f"Regenerated section {section_name} of application {application_id}")
 
         return {
-            "message": "Section regeneration feature coming soon",
+            "data": application.to_dict(),
             "section_name": section_name,
-            "status": "pending_implementation"
+            "content": section_result["content"],
+            "message": "Section regenerated successfully"
         }
 
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error regenerating section: {str(e)}", exc_info=True)
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to regenerate section")
 
 
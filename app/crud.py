@@ -3,14 +3,19 @@ import time # Added time
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 import json
-from sqlalchemy import select, func, or_, text
+from types import SimpleNamespace
+from sqlalchemy import select, func, insert, or_, text, case, true
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker 
 from sqlalchemy.orm import selectinload
 
 from database.models import Grant as DBGrant, Analysis, SearchRun, UserSettings, ApplicationHistory # Added ApplicationHistory
 from utils.pgvector_client import PgVectorClient
 from app.schemas import EnrichedGrant, ResearchContextScores, ComplianceScores, GrantSourceDetails, ApplicationHistoryCreate # Added ApplicationHistoryCreate
-from app.duplicate_detection import check_duplicate_grant, update_duplicate_grant # Added duplicate detection
+from app.duplicate_detection import (  # Added duplicate detection
+    bulk_upsert_grants, check_duplicate_grant, dedupe_batch, find_duplicate_grants,
+    grant_url_key, more_complete_fields, update_duplicate_grant, upsert_grant,
+)
+from app.pagination import Page, InvalidCursor, cached_count, fetch_keyset_page
 # It's generally better to import specific classes if you're not using the whole module via alias.
 # However, the generated CRUD functions used models. and schemas. prefixes, so let's add module imports for them.
 from database import models
@@ -20,10 +25,68 @@ from agents.research_agent import ResearchAgent
 from agents.compliance_agent import ComplianceAnalysisAgent
 from services.deepseek_client import DeepSeekClient
 from config.settings import get_settings # Changed from settings to get_settings()
+from services.response_cache import GRANTS, SEARCH_RUNS, invalidate_after_commit, invalidate_responses
 
 logger = logging.getLogger(__name__) # Added logger instance
 settings = get_settings() # Initialize settings
 
+# Columns read by safe_convert_to_enriched_grant; listings select only these
+GRANT_LISTING_COLUMNS = [
+    DBGrant.id, DBGrant.title, DBGrant.description, DBGrant.grant_id_external,
+    DBGrant.summary_llm, DBGrant.eligibility_summary_llm, DBGrant.funder_name,
+    DBGrant.funding_amount, DBGrant.funding_amount_min, DBGrant.funding_amount_max,
+    DBGrant.funding_amount_exact, DBGrant.funding_amount_display,
+    DBGrant.deadline, DBGrant.deadline_date, DBGrant.application_open_date,
+    DBGrant.keywords_json, DBGrant.categories_project_json,
+    DBGrant.source_name, DBGrant.source_url, DBGrant.retrieved_at,
+    DBGrant.identified_sector, DBGrant.identified_sub_sector, DBGrant.geographic_scope,
+    DBGrant.specific_location_mentions_json, DBGrant.overall_composite_score,
+    DBGrant.compliance_summary_json, DBGrant.feasibility_score, DBGrant.risk_assessment_json,
+    DBGrant.raw_source_data_json, DBGrant.enrichment_log_json,
+]
+
+def latest_analysis_lateral():
+    """LATERAL subquery with each grant's most recent analysis (at most one row per grant)."""
+    return (
+        select(
+            Analysis.id.label("analysis_id"),
+            Analysis.final_score.label("analysis_final_score"),
+            Analysis.feasibility_score.label("analysis_feasibility_score"),
+        )
+        .where(Analysis.grant_id == DBGrant.id)
+        .order_by(Analysis.analysis_date.desc(), Analysis.id.desc())
+        .limit(1)
+        .lateral("latest_analysis")
+    )
+
+def grant_listing_query(latest=None):
+    """Lean listing projection: plain rows of GRANT_LISTING_COLUMNS plus the latest analysis.
+    One row per grant, no ORM hydration and no second query for analyses.
+    """
+    latest = latest if latest is not None else latest_analysis_lateral()
+    return (
+        select(
+            *GRANT_LISTING_COLUMNS,
+            latest.c.analysis_id,
+            latest.c.analysis_final_score,
+            latest.c.analysis_feasibility_score,
+        )
+        .outerjoin(latest, true())
+    )
+
+def _latest_analysis_of(grant) -> Optional[Any]:
+    """The analysis shown for a grant: the lateral-joined latest one for listing rows,
+    the first loaded one for ORM grants."""
+    if hasattr(grant, "analysis_id"):
+        if grant.analysis_id is None:
+            return None
+        return SimpleNamespace(
+            final_score=grant.analysis_final_score,
+            feasibility_score=grant.analysis_feasibility_score,
+        )
+    analyses = safe_getattr(grant, 'analyses', [])
+    return analyses[0] if analyses else None
+
 async def fetch_grants(
     db: AsyncSession,
     vector_client: PgVectorClient,
@@ -36,13 +99,12 @@ async def fetch_grants(
     """
     Fetch grants with optional filtering using SQLAlchemy.
     Returns a tuple of (grants_list, total_count).    """
-    query = select(DBGrant).outerjoin(Analysis).options(selectinload(DBGrant.analyses))
+    latest = latest_analysis_lateral()
+    query = grant_listing_query(latest)
     
     if min_score > 0:
-        # This filter assumes 'score' is on the Analysis table and there's a join.
-        # If 'overall_composite_score' on DBGrant should be used, adjust accordingly.
-        # For now, sticking to original logic which might be for a different 'score'.
-        query = query.filter(Analysis.final_score >= min_score) # Assuming Analysis.final_score is the target
+        # Filter on the latest analysis' final score (one row per grant, no fan-out)
+        query = query.filter(latest.c.analysis_final_score >= min_score)
     
     if category:
         # Assuming 'category' refers to 'identified_sector' on DBGrant
@@ -60,15 +122,15 @@ async def fetch_grants(
     query = query.offset((page - 1) * page_size).limit(page_size)
     
     result = await db.execute(query)
-    grants_models = result.scalars().all()
+    grants_models = result.all()
     grants_data = []
     for grant_model in grants_models:
         score_value = 0.0  # Default score value
-        # Attempt to get score from related Analysis table if it exists
-        if grant_model.analyses and len(grant_model.analyses) > 0:
-            # Assuming the first analysis record is relevant, and it has a 'final_score'
-            if grant_model.analyses[0].final_score is not None:
-                score_value = grant_model.analyses[0].final_score
+        # Attempt to get score from the latest analysis if it exists
+        latest_analysis = _latest_analysis_of(grant_model)
+        if latest_analysis is not None:
+            if latest_analysis.final_score is not None:
+                score_value = latest_analysis.final_score
         elif hasattr(grant_model, 'overall_composite_score') and grant_model.overall_composite_score is not None:
             # Fallback to overall_composite_score on the grant itself if no analysis score
             score_value = grant_model.overall_composite_score
@@ -95,6 +157,16 @@ async def fetch_grants(
     return grants_data, total
 
 async def fetch_stats(db: AsyncSession) -> Dict[str, Any]:
+    """Get dashboard statistics from the grant_stats aggregates (live queries as fallback)."""
+    try:
+        from services.dashboard_stats import read_stats
+        async with db.begin_nested():
+            return await read_stats(db)
+    except Exception as e:
+        logger.warning(f"Dashboard aggregates unavailable, computing stats live: {e}")
+        return await _fetch_stats_live(db)
+
+async def _fetch_stats_live(db: AsyncSession) -> Dict[str, Any]:
     """Get dashboard statistics using SQLAlchemy."""
     total_query = select(func.count()).select_from(DBGrant)
     total_result = await db.execute(total_query)
@@ -132,6 +204,16 @@ async def fetch_stats(db: AsyncSession) -> Dict[str, Any]:
     }
 
 async def fetch_distribution(db: AsyncSession) -> Dict[str, List[Dict[str, Any]]]:
+    """Get analytics distribution from the grant_stats aggregates (live queries as fallback)."""
+    try:
+        from services.dashboard_stats import read_distribution
+        async with db.begin_nested():
+            return await read_distribution(db)
+    except Exception as e:
+        logger.warning(f"Dashboard aggregates unavailable, computing distribution live: {e}")
+        return await _fetch_distribution_live(db)
+
+async def _fetch_distribution_live(db: AsyncSession) -> Dict[str, List[Dict[str, Any]]]:
     """Get analytics distribution using SQLAlchemy, formatted for frontend charts."""
     category_query = (
         select(
@@ -331,34 +413,19 @@ async def run_full_search_cycle(
         fully_analyzed_grants = researched_grants  # Use research grants without compliance analysis
 
     saved_grants_count = 0
-    processed_grants_for_return: List[EnrichedGrant] = [] # New list to store results of create_or_update_grant
+    processed_grants_for_return: List[EnrichedGrant] = []
     async with db_sessionmaker() as session: 
         logger.info(f"Saving/updating {len(fully_analyzed_grants)} grants to the database...")
-        for enriched_grant_data in fully_analyzed_grants:
-            try:
-                # Convert EnrichedGrant to dict for database saving
-                grant_dict = enriched_grant_data.dict(exclude_none=True) if hasattr(enriched_grant_data, 'dict') else enriched_grant_data.__dict__
-                
-                # Call the dedicated create_or_update_grant function
-                saved_grant = await create_or_update_grant(session, grant_dict)
-                if saved_grant:
-                    # Convert saved grant back to EnrichedGrant for return
-                    enriched_saved = safe_convert_to_enriched_grant(saved_grant)
-                    if enriched_saved:
-                        processed_grants_for_return.append(enriched_saved)
-                    saved_grants_count += 1
-                    # Safe access to title attribute
-                    grant_title = getattr(saved_grant, 'title', None)
-                    title_display = grant_title[:50] if grant_title else 'N/A'
-                    logger.info(f"Successfully saved/updated grant via dedicated function: {title_display} (ID: {saved_grant.id})")
-                else:
-                    logger.error(f"Failed to save/update grant: {enriched_grant_data.title[:50] if enriched_grant_data.title else 'N/A'} using dedicated function.")
-            except Exception as e:
-                logger.error(f"Error during save/update via dedicated function for grant {enriched_grant_data.title if enriched_grant_data.title else 'N/A'}: {e}", exc_info=True)
-                # Ensure rollback is handled within create_or_update_grant or here if necessary,
-                # but create_or_update_grant already handles its own rollback on commit failure.
-                # await session.rollback() # This might not be needed if create_or_update_grant handles it.
-                continue 
+        try:
+            saved_grants = await bulk_store_grants(session, fully_analyzed_grants)
+            for saved_grant in saved_grants:
+                enriched_saved = safe_convert_to_enriched_grant(saved_grant)
+                if enriched_saved:
+                    processed_grants_for_return.append(enriched_saved)
+            saved_grants_count = len(saved_grants)
+        except Exception as e:
+            logger.error(f"Error bulk saving grants from search cycle: {e}", exc_info=True)
+            await session.rollback()
 
         logger.info(f"Successfully processed {saved_grants_count} grants for saving/updating to the database.")
 
@@ -371,6 +438,8 @@ async def run_full_search_cycle(
             )
             session.add(search_run)
             await session.commit()
+            # The stored grants commit here too; only now may cached listings be rebuilt
+            await invalidate_responses(GRANTS, SEARCH_RUNS)
             logger.info(f"Search run recorded with ID: {search_run.id}")
         except Exception as e:
             logger.error(f"Error recording search run: {e}", exc_info=True)
@@ -382,6 +451,87 @@ async def run_full_search_cycle(
     
     return processed_grants_for_return
 
+async def bulk_store_grants(db: AsyncSession, grants: List[EnrichedGrant]) -> List[DBGrant]:
+    """Persist a search cycle's grants in a few statements instead of several per grant.
+
+    Grants are deduplicated within the batch and against stored grants in one
+    query. Grants matching a stored grant by title rather than URL only fill in
+    more complete fields; the rest go through one multi-row upsert on the URL
+    identity. Their Analysis rows are inserted together and their embeddings
+    generated as one batch. Changes are flushed, not committed; the caller
+    commits and then invalidates the GRANTS response cache.
+    """
+    grant_by_row: Dict[int, EnrichedGrant] = {}
+    rows = []
+    for grant in grants:
+        data = grant.model_dump(exclude_none=True) if hasattr(grant, 'model_dump') else dict(grant)
+        if grant_url_key(data.get('source_url')) is None:
+            logger.warning(f"Skipping grant '{data.get('title', 'Unknown')}' - no valid URL: {data.get('source_url')}")
+            continue
+        row = {k: v for k, v in data.items() if k in DBGrant.__table__.c and k not in ('id', 'source_url_key')}
+        grant_by_row[id(row)] = grant
+        rows.append(row)
+
+    rows = dedupe_batch(rows)
+    if not rows:
+        return []
+
+    matches = await find_duplicate_grants(db, rows)
+    stored: List[Tuple[DBGrant, EnrichedGrant]] = []
+    upsert_rows = []
+    for row, existing in zip(rows, matches):
+        same_identity = (
+            existing is not None
+            and existing.user_id is None
+            and existing.source_url_key == grant_url_key(row['source_url'])
+        )
+        if existing is None or same_identity:
+            upsert_rows.append(row)
+            continue
+        # Same grant listed under another URL: keep the stored row, fill in gaps (flushed with the upsert)
+        for field, value in more_complete_fields(existing, row).items():
+            setattr(existing, field, value)
+        stored.append((existing, grant_by_row[id(row)]))
+
+    upserted = await bulk_upsert_grants(db, upsert_rows)
+    stored.extend(
+        (grant, grant_by_row[id(row)]) for row, grant in zip(upsert_rows, upserted) if grant is not None
+    )
+
+    analysis_rows = []
+    for grant, source in stored:
+        research = source.research_scores
+        compliance = source.compliance_scores
+        if research is None and compliance is None:
+            continue
+        analysis_rows.append({
+            "grant_id": grant.id,
+            "final_score": (compliance.final_weighted_score if compliance else None) or source.overall_composite_score,
+            "relevance_score": research.sector_relevance if research else None,
+            "compliance_score": compliance.business_logic_alignment if compliance else None,
+            "feasibility_score": compliance.feasibility_score if compliance else None,
+            "relevance_details": research.model_dump() if research else None,
+            "compliance_details": compliance.model_dump() if compliance else None,
+        })
+    if analysis_rows:
+        await db.execute(insert(Analysis), analysis_rows)
+    await db.flush()
+
+    try:
+        from services.embedding_service import get_embedding_service
+        async with db.begin_nested():
+            await get_embedding_service().embed_grants(
+                db, [(grant.id, grant.title, grant.description or "") for grant, _ in stored]
+            )
+    except Exception as e:
+        logger.warning(f"Failed to embed grants from search cycle: {e}")
+
+    logger.info(
+        f"Stored {len(stored)} grants ({len(upsert_rows)} upserted, "
+        f"{len(rows) - len(upsert_rows)} merged into title duplicates), {len(analysis_rows)} analyses"
+    )
+    return [grant for grant, _ in stored]
+
 # Search Run Management Functions
 
 async def create_search_run(
@@ -440,6 +590,7 @@ async def update_search_run_result(
             raise ValueError(f"Failed to update SearchRun with id {search_run_id}")
         
         await db.commit()
+        await invalidate_responses(SEARCH_RUNS)
         
         # Fetch and return updated search run
         query = select(models.SearchRun).where(models.SearchRun.id == search_run_id)
@@ -465,6 +616,24 @@ async def get_search_runs(
     days_back: int = 30
 ) -> Tuple[List[Dict[str, Any]], int]:
     """Get paginated search runs with optional filtering."""
+    result = await get_search_runs_page(
+        db, page=page, page_size=page_size, run_type=run_type, status=status, days_back=days_back
+    )
+    return result.items, result.total
+
+async def get_search_runs_page(
+    db: AsyncSession,
+    page: int = 1,
+    page_size: int = 20,
+    run_type: Optional[str] = None,
+    status: Optional[str] = None,
+    days_back: int = 30,
+    cursor: Optional[str] = None,
+    include_total: bool = True
+) -> Page:
+    """Get search runs newest first; pass cursor (from next_cursor) for keyset paging.
+    Raises InvalidCursor for a malformed cursor.
+    """
     # Base query
     query = select(models.SearchRun)
     
@@ -479,18 +648,24 @@ async def get_search_runs(
     cutoff_date = datetime.now() - timedelta(days=days_back)
     query = query.where(models.SearchRun.created_at >= cutoff_date)
     
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one() or 0
-    
-    # Add pagination and ordering
-    query = query.order_by(models.SearchRun.created_at.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    # Get total count (cached briefly; optional)
+    total = None
+    if include_total:
+        total = await cached_count(db, query, ("search_runs", run_type, status, days_back))
     
-    # Execute query
-    result = await db.execute(query)
-    search_runs = result.scalars().all()
+    # Keyset pagination on (created_at, id), newest first
+    search_runs, next_cursor = await fetch_keyset_page(
+        db,
+        query,
+        sort_key="created_at",
+        sort_column=models.SearchRun.created_at,
+        id_column=models.SearchRun.id,
+        descending=True,
+        limit=page_size,
+        sort_value=lambda run: run.created_at,
+        cursor=cursor,
+        offset=(page - 1) * page_size,
+    )
     
     # Convert to dictionaries
     runs_data = []
@@ -515,7 +690,7 @@ async def get_search_runs(
         }
         runs_data.append(run_dict)
     
-    return runs_data, total
+    return Page(items=runs_data, total=total, next_cursor=next_cursor)
 
 async def get_latest_automated_run(db: AsyncSession) -> Optional[Dict[str, Any]]:
     """Get the latest automated search run."""
@@ -798,7 +973,10 @@ async def get_grant_by_id(db: AsyncSession, grant_id: int) -> Optional[EnrichedG
         return None
 
 async def create_or_update_grant(db: AsyncSession, grant_data: dict) -> Optional[DBGrant]:
-    """Create or update a grant in the database with defensive programming. REQUIRES valid URL."""
+    """Create or update a grant in the database with defensive programming. REQUIRES valid URL.
+
+    Does not commit; cached grant responses are invalidated once the caller commits.
+    """
     try:
         # MANDATORY URL VALIDATION - Skip grants without valid URLs
         source_url = (grant_data.get('source_url') or '').strip()
@@ -810,7 +988,9 @@ async def create_or_update_grant(db: AsyncSession, grant_data: dict) -> Optional
         existing_grant = await check_duplicate_grant(db, grant_data)
         if existing_grant:
             logger.info(f"Duplicate grant detected, updating existing: {existing_grant.id}")
-            return await update_duplicate_grant(db, existing_grant, grant_data)
+            updated_grant = await update_duplicate_grant(db, existing_grant, grant_data)
+            invalidate_after_commit(db, GRANTS)
+            return updated_grant
 
         grant_id = grant_data.get('id')
         external_id = grant_data.get('grant_id_external')
@@ -836,28 +1016,26 @@ async def create_or_update_grant(db: AsyncSession, grant_data: dict) -> Optional
             # Update existing grant - use SQL UPDATE statement
             update_data = {k: v for k, v in grant_data.items() if v is not None and hasattr(DBGrant, k)}
             update_data['updated_at'] = datetime.utcnow()
+            if 'source_url' in update_data:
+                update_data['source_url_key'] = grant_url_key(update_data['source_url'])
             
             from sqlalchemy import update
-            update_stmt = update(DBGrant).where(DBGrant.id == existing_grant.id).values(**update_data)
-            await db.execute(update_stmt)
-            await db.flush()
-            
-            # Fetch updated grant
-            result = await db.execute(select(DBGrant).where(DBGrant.id == existing_grant.id))
+            update_stmt = update(DBGrant).where(DBGrant.id == existing_grant.id).values(**update_data).returning(DBGrant)
+            result = await db.execute(update_stmt, execution_options={"populate_existing": True})
             updated_grant = result.scalar_one_or_none()
             logger.info(f"Updated existing grant {existing_grant.id}")
+            invalidate_after_commit(db, GRANTS)
             return updated_grant
         
         else:
-            # Create new grant
-            create_data = {k: v for k, v in grant_data.items() if v is not None and hasattr(DBGrant, k)}
+            # Create new grant; a concurrent writer storing the same URL turns this into an update
+            create_data = {k: v for k, v in grant_data.items() if v is not None and k in DBGrant.__table__.c}
             create_data['created_at'] = datetime.utcnow()
             create_data['updated_at'] = datetime.utcnow()
             
-            new_grant = DBGrant(**create_data)
-            db.add(new_grant)
-            await db.flush()
-            logger.info(f"Created new grant {new_grant.id}")
+            new_grant = await upsert_grant(db, create_data)
+            logger.info(f"Stored grant {new_grant.id}")
+            invalidate_after_commit(db, GRANTS)
             return new_grant
             
     except Exception as e:
@@ -933,13 +1111,12 @@ def safe_convert_to_enriched_grant(grant_model) -> Optional[EnrichedGrant]:
         overall_composite_score = safe_getattr(grant_model, 'overall_composite_score', 0.0)
         
         # Safely access analysis data
-        analyses = safe_getattr(grant_model, 'analyses', [])
+        analysis = _latest_analysis_of(grant_model)
         
         # Build research context scores safely using correct field names
         research_scores = None
         compliance_scores = None
-        if analyses and len(analyses) > 0:
-            analysis = analyses[0]
+        if analysis is not None:
             research_scores = ResearchContextScores(
                 sector_relevance=safe_getattr(analysis, 'sector_relevance_score', 0.0),
                 geographic_relevance=safe_getattr(analysis, 'geographic_relevance_score', 0.0),
@@ -1039,48 +1216,97 @@ async def get_grants_list(
     Get grants list with advanced filtering, sorting, and pagination.
     Returns EnrichedGrant objects with defensive error handling.
     """
+    page = await get_grants_page(
+        db,
+        skip=skip,
+        limit=limit,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        status_filter=status_filter,
+        min_overall_score=min_overall_score,
+        max_overall_score=max_overall_score,
+        category=category,
+        search_query=search_query,
+    )
+    return page.items, page.total or 0
+
+async def get_grants_page(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 20,
+    sort_by: str = "overall_composite_score",
+    sort_order: str = "desc",
+    status_filter: Optional[str] = None,
+    min_overall_score: Optional[float] = None,
+    max_overall_score: Optional[float] = None,
+    category: Optional[str] = None,
+    search_query: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    fast_serialize: bool = False
+) -> Page:
+    """
+    Get one page of grants with advanced filtering and sorting.
+    search_query uses hybrid full-text + vector search; sort_by="relevance"
+    orders by the fused rank (falls back to overall_composite_score without a query).
+    Pages are keyset-paginated on (sort column, id): pass the returned next_cursor
+    as cursor for the next page (skip is only used without a cursor).
+    fast_serialize=True returns JSON-ready dicts (app.serialization) instead of EnrichedGrant models.
+    Raises InvalidCursor for a malformed cursor; other errors degrade to an empty page.
+    """
     try:
-        logger.info(f"get_grants_list called with skip={skip}, limit={limit}, sort_by={sort_by}")
-        
-        # Build base query with safe joins - FILTER OUT GRANTS WITHOUT URLs
-        query = select(DBGrant).outerjoin(Analysis).options(selectinload(DBGrant.analyses))
+        logger.info(f"get_grants_page called with skip={skip}, limit={limit}, sort_by={sort_by}, cursor={bool(cursor)}")
         
         # MANDATORY: Only include grants with valid source URLs
-        query = query.filter(DBGrant.source_url.isnot(None))
-        query = query.filter(DBGrant.source_url != "")
-        query = query.filter(DBGrant.source_url.like("http%"))  # Must be a valid URL
+        filters = [
+            DBGrant.source_url.isnot(None),
+            DBGrant.source_url != "",
+            DBGrant.source_url.like("http%"),  # Must be a valid URL
+        ]
         
         # Apply filters with safe checks
         if min_overall_score is not None:
-            query = query.filter(DBGrant.overall_composite_score >= min_overall_score)
+            filters.append(DBGrant.overall_composite_score >= min_overall_score)
         
         if max_overall_score is not None:
-            query = query.filter(DBGrant.overall_composite_score <= max_overall_score)
+            filters.append(DBGrant.overall_composite_score <= max_overall_score)
         
         if category:
-            query = query.filter(DBGrant.identified_sector == category)
+            filters.append(DBGrant.identified_sector == category)
         
         if status_filter:
-            query = query.filter(DBGrant.application_status == status_filter)
+            filters.append(DBGrant.application_status == status_filter)
         
+        relevance = None
         if search_query:
-            search_filter = or_(
-                DBGrant.title.ilike(f"%{search_query}%"),
-                DBGrant.description.ilike(f"%{search_query}%")
-            )
-            query = query.filter(search_filter)
+            from services.hybrid_search import hybrid_grant_candidates
+            relevance = await hybrid_grant_candidates(db, search_query)
+            if relevance is not None:
+                filters.append(DBGrant.id.in_(list(relevance)))
+            else:
+                filters.append(or_(
+                    DBGrant.title.ilike(f"%{search_query}%"),
+                    DBGrant.description.ilike(f"%{search_query}%")
+                ))
         
-        # Get total count safely
-        count_query = select(func.count()).select_from(query.subquery())
-        try:
-            total_result = await db.execute(count_query)
-            total = total_result.scalar() or 0
-        except Exception as e:
-            logger.warning(f"Error getting total count, using 0: {e}")
-            total = 0
+        # Lean projection with the latest analysis per grant (one row per grant)
+        query = grant_listing_query().where(*filters)
+        
+        # Get total count safely over grants alone (cached briefly; optional for infinite scroll)
+        total = None
+        if include_total:
+            try:
+                total = await cached_count(db, select(DBGrant.id).where(*filters), (
+                    "grants", status_filter, min_overall_score, max_overall_score, category,
+                    search_query, tuple(relevance) if relevance is not None else None,
+                ))
+            except Exception as e:
+                logger.warning(f"Error getting total count, using 0: {e}")
+                total = 0
         
         # Apply sorting with safe attribute access
         sort_column = None
+        sort_value = None
         if sort_by == "overall_composite_score":
             sort_column = DBGrant.overall_composite_score
         elif sort_by == "deadline":
@@ -1089,25 +1315,45 @@ async def get_grants_list(
             sort_column = DBGrant.title
         elif sort_by == "priority_score":
             sort_column = DBGrant.priority_score
+        elif sort_by == "relevance" and relevance:
+            # Fused hybrid rank, best first
+            positions = {grant_id: position for position, grant_id in enumerate(relevance)}
+            sort_column = case(positions, value=DBGrant.id)
+            sort_value = lambda grant: positions.get(grant.id)
+            sort_order = "asc"
         else:
             # Default to overall_composite_score if invalid sort_by
+            sort_by = "overall_composite_score"
             sort_column = DBGrant.overall_composite_score
+        if sort_value is None:
+            sort_value = lambda grant, key=sort_column.key: getattr(grant, key)
         
-        if sort_order.lower() == "desc":
-            query = query.order_by(sort_column.desc())
-        else:
-            query = query.order_by(sort_column.asc())
-        
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
-        
-        # Execute query safely
+        # Execute query safely (keyset pagination)
         try:
-            result = await db.execute(query)
-            grant_models = result.scalars().all()
+            grant_models, next_cursor = await fetch_keyset_page(
+                db,
+                query,
+                sort_key=f"{sort_by}:{sort_order.lower()}",
+                sort_column=sort_column,
+                id_column=DBGrant.id,
+                descending=sort_order.lower() == "desc",
+                limit=limit,
+                sort_value=sort_value,
+                cursor=cursor,
+                offset=skip,
+                scalars=False,
+            )
+        except InvalidCursor:
+            raise
         except Exception as e:
             logger.error(f"Error executing grants query: {e}")
-            return [], 0
+            return Page(items=[], total=0)
+        
+        if fast_serialize:
+            from app.serialization import grant_rows_to_dicts
+            items = grant_rows_to_dicts(grant_models)
+            logger.info(f"Serialized {len(items)} grants out of {len(grant_models)} rows")
+            return Page(items=items, total=total, next_cursor=next_cursor)
         
         # Convert to EnrichedGrant objects with defensive programming
         enriched_grants = []
@@ -1121,11 +1367,13 @@ async def get_grants_list(
                 continue
         
         logger.info(f"Successfully converted {len(enriched_grants)} grants out of {len(grant_models)} models")
-        return enriched_grants, total
+        return Page(items=enriched_grants, total=total, next_cursor=next_cursor)
         
+    except InvalidCursor:
+        raise
     except Exception as e:
-        logger.error(f"Error in get_grants_list: {e}", exc_info=True)
-        return [], 0
+        logger.error(f"Error in get_grants_page: {e}", exc_info=True)
+        return Page(items=[], total=0)
 
 async def safe_update_model(db: AsyncSession, model_class, model_id: int, update_data: dict):
     """Safely update a SQLAlchemy model using UPDATE statement"""
@@ -5,86 +5,187 @@ Implements multiple strategies to identify duplicate grants:
 1. Exact URL matching (primary)
 2. Title + Deadline combination
 3. Fuzzy title matching (85% similarity)
+
+All strategies for a whole batch of incoming grants run in one query: each
+grant probes the source_url_key index, the title index and the trigram GiST
+index on grants.title_normalized (top-k nearest titles), and only those few
+fuzzy candidates are confirmed in Python. Cost per grant is a handful of index
+probes, independent of how many grants are stored.
+
+Grant identity is (owner, source_url_key): a hash of the normalized source URL,
+unique per user. Writers insert with grant_upsert_statement(), so two workers
+storing the same grant concurrently resolve to one row instead of racing a
+SELECT against an INSERT.
 """
+import hashlib
 import logging
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 from difflib import SequenceMatcher
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, literal_column, null, select, text, DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from database.models import Grant as DBGrant
 
 logger = logging.getLogger(__name__)
 
+FUZZY_MIN_TITLE_LENGTH = 30  # shorter titles are too generic to match fuzzily
+FUZZY_SIMILARITY_THRESHOLD = 0.85
+FUZZY_CANDIDATES = 5  # nearest titles confirmed per incoming grant
 
-async def check_duplicate_grant(
+# Mirrors the grants.title_normalized generated column
+NORMALIZE_TITLE_SQL = "btrim(regexp_replace(lower(coalesce({}, '')), '[^a-z0-9]+', ' ', 'g'))"
+
+BATCH_MATCH_SQL = text(f"""
+    SELECT i.idx, m.id, m.strategy, m.title
+    FROM unnest(:idxs, :url_keys, :titles, :deadlines) AS i(idx, url_key, title, deadline)
+    CROSS JOIN LATERAL (SELECT {NORMALIZE_TITLE_SQL.format('i.title')} AS norm) n
+    CROSS JOIN LATERAL (
+        (SELECT g.id, 1 AS strategy, g.title
+         FROM grants g
+         WHERE i.url_key IS NOT NULL AND g.source_url_key = i.url_key
+         LIMIT 1)
+        UNION ALL
+        (SELECT g.id, 2 AS strategy, g.title
+         FROM grants g
+         WHERE i.deadline IS NOT NULL AND g.title = i.title AND g.deadline = i.deadline
+         LIMIT 1)
+        UNION ALL
+        (SELECT g.id, 3 AS strategy, g.title
+         FROM grants g
+         WHERE length(i.title) > :min_length
+         ORDER BY g.title_normalized <-> n.norm
+         LIMIT :candidates)
+    ) m
+    ORDER BY i.idx, m.strategy
+""").bindparams(
+    bindparam("idxs", type_=ARRAY(Integer)),
+    bindparam("url_keys", type_=ARRAY(String)),
+    bindparam("titles", type_=ARRAY(String)),
+    bindparam("deadlines", type_=ARRAY(DateTime)),
+)
+
+
+def titles_match(title: str, other: str) -> bool:
+    """Fuzzy title comparison used to confirm trigram candidates."""
+    return SequenceMatcher(None, title.lower(), other.lower()).ratio() > FUZZY_SIMILARITY_THRESHOLD
+
+
+def _as_deadline(value) -> Optional[datetime]:
+    """Deadline as a naive UTC datetime (grants.deadline is timestamp without time zone)."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def find_duplicate_grants(
     db: AsyncSession,
-    grant_data: dict
-) -> Optional[DBGrant]:
+    grants: Sequence[dict]
+) -> List[Optional[DBGrant]]:
     """
-    Check for duplicate grants using multiple strategies.
+    Find the existing grant each incoming grant duplicates, for a whole batch.
 
-    Strategy 1: Exact URL match (most reliable)
-    Strategy 2: Title + Deadline match (for same grant on different sites)
-    Strategy 3: Fuzzy title matching for similar grants (85% threshold)
+    Strategies are applied in priority order per grant (URL, then
+    Title + Deadline, then fuzzy title). Matching is one query for the batch,
+    plus one to load the matched grants.
 
     Args:
         db: Database session
-        grant_data: Grant dictionary with title, source_url, deadline
+        grants: Grant dictionaries with title, source_url, deadline
 
     Returns:
-        Existing grant if duplicate found, None otherwise
+        For each input grant, the existing duplicate or None
     """
-    source_url = grant_data.get('source_url', '').strip()
-    title = grant_data.get('title', '').strip()
-    deadline = grant_data.get('deadline')
+    if not grants:
+        return []
 
-    # Strategy 1: Exact URL match (most reliable)
-    if source_url:
-        result = await db.execute(
-            select(DBGrant).where(DBGrant.source_url == source_url)
-        )
-        existing = result.scalar_one_or_none()
-        if existing:
-            logger.info(f"Duplicate detected via URL: {source_url}")
-            return existing
+    titles = [(g.get('title') or '').strip() for g in grants]
+    rows = await db.execute(BATCH_MATCH_SQL, {
+        "idxs": list(range(len(grants))),
+        "url_keys": [grant_url_key(g.get('source_url')) for g in grants],
+        "titles": titles,
+        "deadlines": [_as_deadline(g.get('deadline')) for g in grants],
+        "min_length": FUZZY_MIN_TITLE_LENGTH,
+        "candidates": FUZZY_CANDIDATES,
+    })
 
-    # Strategy 2: Title + Deadline match (for same grant on different sites)
-    if title and deadline:
-        result = await db.execute(
-            select(DBGrant).where(
-                DBGrant.title == title,
-                DBGrant.deadline == deadline
-            )
-        )
-        existing = result.scalar_one_or_none()
-        if existing:
-            logger.info(f"Duplicate detected via Title+Deadline: {title}")
-            return existing
-
-    # Strategy 3: Fuzzy title matching for similar grants
-    if title and len(title) > 30:  # Only for titles > 30 chars
-        # Search for grants with similar titles (first 30 chars)
-        result = await db.execute(
-            select(DBGrant).where(DBGrant.title.ilike(f"%{title[:30]}%"))
-        )
-        candidates = result.scalars().all()
+    matched_ids: Dict[int, int] = {}
+    for row in rows:
+        if row.idx in matched_ids:
+            continue
+        if row.strategy == 1:
+            logger.info(f"Duplicate detected via URL: {grants[row.idx].get('source_url')}")
+        elif row.strategy == 2:
+            logger.info(f"Duplicate detected via Title+Deadline: {titles[row.idx]}")
+        elif titles_match(titles[row.idx], row.title):
+            logger.info(f"Duplicate detected via fuzzy match: {titles[row.idx]} ~= {row.title}")
+        else:
+            continue
+        matched_ids[row.idx] = row.id
+
+    if not matched_ids:
+        return [None] * len(grants)
+
+    result = await db.execute(select(DBGrant).where(DBGrant.id.in_(set(matched_ids.values()))))
+    by_id = {grant.id: grant for grant in result.scalars().all()}
+    return [by_id.get(matched_ids.get(idx)) for idx in range(len(grants))]
 
-        for candidate in candidates:
-            similarity = SequenceMatcher(
-                None,
-                title.lower(),
-                candidate.title.lower()
-            ).ratio()
 
-            if similarity > 0.85:  # 85% similarity threshold
-                logger.info(
-                    f"Duplicate detected via fuzzy match ({similarity:.2%}): "
-                    f"{title} ~= {candidate.title}"
-                )
-                return candidate
+def dedupe_batch(grants: Sequence[dict]) -> List[dict]:
+    """
+    Drop incoming grants that duplicate an earlier grant in the same batch.
+
+    Uses the same strategies as find_duplicate_grants, so a batch can be
+    deduplicated before it is checked against the database.
+    """
+    kept: List[dict] = []
+    seen_urls = set()
+    seen_title_deadlines = set()
+    for grant in grants:
+        url = grant_url_key(grant.get('source_url'))
+        title = (grant.get('title') or '').strip()
+        deadline = _as_deadline(grant.get('deadline'))
+
+        if url and url in seen_urls:
+            continue
+        if title and deadline and (title, deadline) in seen_title_deadlines:
+            continue
+        if len(title) > FUZZY_MIN_TITLE_LENGTH and any(
+            titles_match(title, (other.get('title') or '').strip()) for other in kept
+        ):
+            continue
+
+        kept.append(grant)
+        if url:
+            seen_urls.add(url)
+        if title and deadline:
+            seen_title_deadlines.add((title, deadline))
+    return kept
+
+
+async def check_duplicate_grant(
+    db: AsyncSession,
+    grant_data: dict
+) -> Optional[DBGrant]:
+    """
+    Check a single grant for duplicates (see find_duplicate_grants).
 
-    # No duplicate found
-    return None
+    Args:
+        db: Database session
+        grant_data: Grant dictionary with title, source_url, deadline
+
+    Returns:
+        Existing grant if duplicate found, None otherwise
+    """
+    return (await find_duplicate_grants(db, [grant_data]))[0]
 
 
 def normalize_url(url: str) -> str:
@@ -94,17 +195,18 @@ def normalize_url(url: str) -> str:
     Removes:
     - Trailing slashes
     - www. prefix
-    - Query parameters (optional)
+    - utm_* tracking parameters (remaining query parameters are sorted)
     - Fragments (#)
 
+    The query string is kept because many grant portals identify the
+    opportunity there (e.g. ?oppId=123).
+
     Args:
         url: URL to normalize
 
     Returns:
         Normalized URL
     """
-    from urllib.parse import urlparse, urlunparse
-
     parsed = urlparse(url.lower().strip())
 
     # Remove www. prefix
@@ -112,26 +214,156 @@ def normalize_url(url: str) -> str:
     if netloc.startswith('www.'):
         netloc = netloc[4:]
 
-    # Remove query and fragment
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.startswith('utm_')
+    ))
+
+    # Remove params and fragment
     normalized = urlunparse((
         parsed.scheme,
         netloc,
         parsed.path.rstrip('/'),
         '',  # params
-        '',  # query (optional: can keep this for grant-specific URLs)
+        query,
         ''   # fragment
     ))
 
     return normalized
 
 
+def grant_url_key(source_url: Optional[str]) -> Optional[str]:
+    """
+    Identity key for a grant URL: sha256 of the normalized URL without scheme.
+
+    Returns None for missing or non-HTTP URLs (such grants have no URL identity).
+    """
+    source_url = (source_url or '').strip()
+    if not source_url.lower().startswith(('http://', 'https://')):
+        return None
+    normalized = normalize_url(source_url).split('://', 1)[-1]
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+# Conflict target matching the unique index ux_grants_source_url_key (the 0 must be
+# a literal, not a bind parameter, for Postgres to infer the expression index)
+GRANT_IDENTITY = dict(
+    index_elements=[DBGrant.source_url_key, func.coalesce(DBGrant.user_id, literal_column("0"))],
+    index_where=DBGrant.source_url_key.isnot(None),
+)
+
+
+def grant_upsert_statement(rows: Iterable[Dict[str, Any]], update: bool = True):
+    """
+    INSERT ... ON CONFLICT statement for grant rows, keyed on (user, source_url_key).
+
+    source_url_key is derived from each row's source_url. With update=True a
+    conflicting row is updated with the incoming non-NULL values (existing
+    values are kept where the incoming one is NULL), otherwise the incoming
+    row is skipped. All rows must have the same keys; add .returning(...) to
+    learn which rows were written.
+    """
+    rows = [dict(row, source_url_key=grant_url_key(row.get('source_url'))) for row in rows]
+    stmt = pg_insert(DBGrant).values(rows)
+    if not update:
+        return stmt.on_conflict_do_nothing(**GRANT_IDENTITY)
+
+    skip = {'id', 'created_at', 'source_url_key', 'user_id'}
+    columns = [key for key in rows[0] if key not in skip]
+    return stmt.on_conflict_do_update(
+        **GRANT_IDENTITY,
+        set_={
+            **{key: func.coalesce(stmt.excluded[key], DBGrant.__table__.c[key]) for key in columns},
+            'updated_at': func.now(),
+        },
+    )
+
+
+# Rows per multi-row upsert; keeps each statement well under Postgres' 32767 bind parameters
+BULK_UPSERT_BATCH_SIZE = 500
+
+
+async def bulk_upsert_grants(db: AsyncSession, rows: Sequence[Dict[str, Any]]) -> List[DBGrant]:
+    """
+    Upsert many grants with one multi-row INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+    per BULK_UPSERT_BATCH_SIZE rows.
+
+    Every row needs a URL identity and rows must not repeat one (run dedupe_batch
+    first). Rows may have different keys; missing values are sent as NULL,
+    which keeps the stored value on conflict. Returns the grants in row order.
+    """
+    if not rows:
+        return []
+    if any(grant_url_key(row.get('source_url')) is None for row in rows):
+        raise ValueError("bulk_upsert_grants requires a valid source_url on every row")
+
+    now = datetime.utcnow()
+    columns = sorted({key for row in rows for key in row} - {'id', 'source_url_key'})
+    full_rows = [
+        {
+            # SQL NULL rather than None, which JSON columns would store as a JSON null
+            **{key: null() if row.get(key) is None else row[key] for key in columns},
+            'record_status': row.get('record_status') or 'ACTIVE',
+            'created_at': row.get('created_at') or now,
+            'updated_at': now,
+        }
+        for row in rows
+    ]
+
+    by_key: Dict[str, DBGrant] = {}
+    for start in range(0, len(full_rows), BULK_UPSERT_BATCH_SIZE):
+        batch = full_rows[start:start + BULK_UPSERT_BATCH_SIZE]
+        result = await db.execute(
+            grant_upsert_statement(batch).returning(DBGrant),
+            execution_options={"populate_existing": True},
+        )
+        by_key.update({grant.source_url_key: grant for grant in result.scalars().all()})
+
+    # RETURNING order is not guaranteed; rows are matched back by their URL identity
+    return [by_key.get(grant_url_key(row['source_url'])) for row in rows]
+
+
+async def upsert_grant(db: AsyncSession, values: Dict[str, Any]) -> DBGrant:
+    """Insert a grant or update the one with the same URL identity; returns the row."""
+    stmt = grant_upsert_statement([values]).returning(DBGrant)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    return result.scalar_one()
+
+
+# Fields refreshed on a duplicate when the incoming value is more complete
+DUPLICATE_UPDATE_FIELDS = [
+    'description',
+    'eligibility',
+    'requirements',
+    'amount',
+    'deadline',
+    'application_url',
+    'contact_info'
+]
+
+
+def more_complete_fields(existing_grant: DBGrant, new_grant_data: dict) -> Dict[str, Any]:
+    """Incoming values that are more complete than the stored ones (longer or filling a gap)."""
+    changes = {}
+    for field in DUPLICATE_UPDATE_FIELDS:
+        if field not in DBGrant.__table__.c:
+            continue
+        new_value = new_grant_data.get(field)
+        existing_value = getattr(existing_grant, field, None)
+        if new_value and (not existing_value or len(str(new_value)) > len(str(existing_value))):
+            changes[field] = new_value
+    return changes
+
+
 async def update_duplicate_grant(
     db: AsyncSession,
     existing_grant: DBGrant,
     new_grant_data: dict
 ) -> DBGrant:
     """
-    Update existing grant with new data if it's more recent.
+    Update existing grant with new data if it's more complete.
+
+    Changes are flushed; committing is left to the caller.
 
     Args:
         db: Database session
@@ -141,30 +373,11 @@ async def update_duplicate_grant(
     Returns:
         Updated grant
     """
-    # Update fields if new data is more complete
-    fields_to_update = [
-        'description',
-        'eligibility',
-        'requirements',
-        'amount',
-        'deadline',
-        'application_url',
-        'contact_info'
-    ]
-
-    updated = False
-    for field in fields_to_update:
-        new_value = new_grant_data.get(field)
-        existing_value = getattr(existing_grant, field, None)
-
-        # Update if new value is more complete
-        if new_value and (not existing_value or len(str(new_value)) > len(str(existing_value))):
-            setattr(existing_grant, field, new_value)
-            updated = True
-
-    if updated:
+    changes = more_complete_fields(existing_grant, new_grant_data)
+    if changes:
+        for field, value in changes.items():
+            setattr(existing_grant, field, value)
         logger.info(f"Updated duplicate grant: {existing_grant.title}")
-        await db.commit()
-        await db.refresh(existing_grant)
+        await db.flush()
 
     return existing_grant
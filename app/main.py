@@ -89,6 +89,29 @@ async def health_check():
         }
     )
 
+@app.get("/health/ready", tags=["Health Check"])
+async def readiness_check():
+    """
+    Readiness gate: 503 until the embedding model has finished loading, so
+    traffic isn't routed to an instance that would stall on a cold model.
+    A failed load reports degraded but ready (embeddings fall back to neutral scores).
+    """
+    from services.embedding_service import get_model_status
+
+    model_status = get_model_status()
+    state = model_status["state"]
+    ready = state in ("ready", "failed")
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if state == "ready" else "degraded" if state == "failed" else "starting",
+            "timestamp": datetime.utcnow().isoformat(),
+            "database": "ok" if services.db_sessionmaker else "unavailable",
+            "embedding_model": model_status,
+        }
+    )
+
 @app.get("/health/detailed", tags=["Health Check"])
 async def detailed_health_check():
     """
@@ -289,6 +312,8 @@ async def shutdown_event():
         if services.db_engine:
             await services.db_engine.dispose()
             logger.info("Database connections closed")
+        from services.deepseek_client import close_http_client
+        await close_http_client()
     except Exception as e:
         logger.error(f"Error during shutdown: {str(e)}", exc_info=True)
 
@@ -0,0 +1,139 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Pages are addressed by an opaque cursor holding the (sort value, id) of the last
+row served, so fetching page N is an index range scan from that row instead of
+OFFSET skipping N * page_size rows. Totals are optional and cached briefly, so
+infinite scroll doesn't re-count the whole filtered join on every page.
+"""
+
+import base64
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token is malformed or was issued for a different sort."""
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(sort_key: str, value: Any, row_id: int) -> str:
+    """Opaque token for the position just after (value, row_id) in sort_key order."""
+    payload = json.dumps({"s": sort_key, "v": _encode_value(value), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort_key: str) -> Tuple[Any, int]:
+    """(sort value, id) from a cursor token; the token must have been issued for sort_key."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_key:
+            raise InvalidCursor(f"Cursor was issued for sort '{payload['s']}', not '{sort_key}'")
+        return _decode_value(payload["v"]), int(payload["id"])
+    except InvalidCursor:
+        raise
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+def keyset_order(sort_column, id_column, descending: bool) -> list:
+    """ORDER BY clauses for a keyset-paginated query (NULL sort values last, id tiebreak)."""
+    if descending:
+        return [sort_column.desc().nulls_last(), id_column.desc()]
+    return [sort_column.asc().nulls_last(), id_column.asc()]
+
+
+def keyset_condition(sort_column, id_column, value: Any, row_id: int, descending: bool):
+    """WHERE clause selecting rows after (value, row_id) in keyset_order."""
+    if value is None:
+        # Already in the NULLs tail: only the id tiebreak is left
+        return and_(sort_column.is_(None), id_column < row_id if descending else id_column > row_id)
+    after_value = sort_column < value if descending else sort_column > value
+    after_id = id_column < row_id if descending else id_column > row_id
+    return or_(after_value, and_(sort_column == value, after_id), sort_column.is_(None))
+
+
+async def fetch_keyset_page(
+    db: AsyncSession,
+    query,
+    *,
+    sort_key: str,
+    sort_column,
+    id_column,
+    descending: bool,
+    limit: int,
+    sort_value: Callable[[Any], Any],
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    scalars: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """Rows for one page plus the cursor for the next (None on the last page).
+
+    With a cursor the page starts after it; otherwise offset is applied (page-number
+    clients keep working and still receive a cursor to switch to). scalars=False
+    returns plain rows for column projections; each row must expose .id.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_key)
+        query = query.where(keyset_condition(sort_column, id_column, value, row_id, descending))
+    elif offset:
+        query = query.offset(offset)
+
+    query = query.order_by(*keyset_order(sort_column, id_column, descending)).limit(limit + 1)
+    result = await db.execute(query)
+    rows = list(result.scalars().all() if scalars else result.all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_key, sort_value(last), last.id)
+    return rows, next_cursor
+
+
+_count_cache: Dict[Hashable, Tuple[float, int]] = {}
+
+
+async def cached_count(db: AsyncSession, query, cache_key: Hashable) -> int:
+    """COUNT(*) of query, reused for PAGINATION_COUNT_CACHE_TTL_SECONDS per cache_key."""
+    now = time.monotonic()
+    hit = _count_cache.get(cache_key)
+    if hit and now - hit[0] < settings.PAGINATION_COUNT_CACHE_TTL_SECONDS:
+        return hit[1]
+
+    total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar() or 0
+    if len(_count_cache) > 1024:
+        _count_cache.clear()
+    _count_cache[cache_key] = (now, total)
+    return total
@@ -22,6 +22,9 @@ from app.dependencies import (
 )
 from app import crud
 from app.crud import safe_convert_to_enriched_grant
+from app.pagination import InvalidCursor, fetch_keyset_page
+from app.serialization import grant_rows_to_dicts, paginated_grants_response
+from services.response_cache import GRANTS, SEARCH_RUNS, cached_response, get_response_cache
 from app.payments import get_payment_service
 from app.auth import (
     get_current_user, hash_password, verify_password,
@@ -191,20 +194,26 @@ def log_audit_event(event_type: str, details: Dict[str, Any]):
     )
 
 @api_router.get("/dashboard/stats", response_model=APIResponse[DashboardStats])
-async def get_dashboard_stats(db: AsyncSession = Depends(get_db_session)):
+async def get_dashboard_stats(request: Request, db: AsyncSession = Depends(get_db_session)):
     """Get overview statistics for the dashboard"""
     try:
+        cached = await cached_response(request, GRANTS)
+        if cached.hit:
+            return cached.value
         stats = await crud.fetch_stats(db)
-        return APIResponse(data=stats)
+        return await cached.store(APIResponse(data=stats))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/analytics/distribution", response_model=APIResponse[DistributionData])
-async def get_analytics_distribution(db: AsyncSession = Depends(get_db_session)):
+async def get_analytics_distribution(request: Request, db: AsyncSession = Depends(get_db_session)):
     """Get grant distribution by category and deadline"""
     try:
+        cached = await cached_response(request, GRANTS)
+        if cached.hit:
+            return cached.value
         distribution = await crud.fetch_distribution(db)
-        return APIResponse(data=distribution)
+        return await cached.store(APIResponse(data=distribution))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -212,38 +221,40 @@ async def get_analytics_distribution(db: AsyncSession = Depends(get_db_session))
 async def list_grants(
     page: int = 1,
     page_size: int = 20,
-    sort_by: Optional[str] = "overall_composite_score",
+    sort_by: Optional[str] = None,  # Defaults to relevance when searching, else overall_composite_score
     sort_order: Optional[str] = "desc",
     status_filter: Optional[str] = None,
     min_overall_score: Optional[float] = Query(None, alias="minOverallScore"),
     max_overall_score: Optional[float] = Query(None, alias="maxOverallScore"),
     category: Optional[str] = None,
     searchText: Optional[str] = None, # Renamed from search_query to match frontend
+    cursor: Optional[str] = None,  # nextCursor from the previous page; takes precedence over page
+    include_total: bool = Query(True, alias="includeTotal"),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get grants with advanced filtering, sorting, and pagination, returning EnrichedGrant objects."""
     start_time_req = time.time()
     try:
-        grants, total = await crud.get_grants_list(
+        result = await crud.get_grants_page(
             db=db,
             skip=(page - 1) * page_size,
             limit=page_size,
-            sort_by=sort_by or "overall_composite_score",
+            sort_by=sort_by or ("relevance" if searchText else "overall_composite_score"),
             sort_order=sort_order or "desc",
             status_filter=status_filter,
             min_overall_score=min_overall_score,
             max_overall_score=max_overall_score,
             category=category,
-            search_query=searchText  # Pass searchText to the crud function
+            search_query=searchText,  # Pass searchText to the crud function
+            cursor=cursor,
+            include_total=include_total,
+            fast_serialize=True
         )
         duration_req = time.time() - start_time_req
-        log_api_metrics("/grants", duration_req, 200, page=page, page_size=page_size, total_items=total)
-        return PaginatedEnrichedGrantResponse(
-            items=grants,
-            total=total,
-            page=page,
-            pageSize=page_size
-        )
+        log_api_metrics("/grants", duration_req, 200, page=page, page_size=page_size, total_items=result.total)
+        return paginated_grants_response(result.items, result.total, page, page_size, result.next_cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         duration_req = time.time() - start_time_req
         log_api_metrics("/grants", duration_req, 500, error=str(e))
@@ -254,6 +265,8 @@ async def list_grants(
 async def get_saved_grants(
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,  # nextCursor from the previous page; takes precedence over page
+    include_total: bool = Query(True, alias="includeTotal"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db_session)
 ):
@@ -261,41 +274,41 @@ async def get_saved_grants(
     try:
         logger.info(f"Getting saved grants for user {current_user.id}, page {page}, page_size {page_size}")
 
-        # Query saved grants with join to get full grant data
-        query = (
-            select(DBGrant)
-            .join(SavedGrants, DBGrant.id == SavedGrants.grant_id)
+        # Lean listing projection of the saved grants (latest analysis per grant)
+        saved_filter = (
+            select(SavedGrants.grant_id)
             .where(SavedGrants.user_settings_id == current_user.id)
-            .options(selectinload(DBGrant.analyses))
+        )
+        query = crud.grant_listing_query().where(DBGrant.id.in_(saved_filter))
+        
+        # Get total count (optional)
+        total = None
+        if include_total:
+            total_result = await db.execute(select(func.count()).select_from(saved_filter.subquery()))
+            total = total_result.scalar() or 0
+        
+        # Keyset pagination, most recently added grants first
+        grant_models, next_cursor = await fetch_keyset_page(
+            db,
+            query,
+            sort_key="id",
+            sort_column=DBGrant.id,
+            id_column=DBGrant.id,
+            descending=True,
+            limit=page_size,
+            sort_value=lambda grant: grant.id,
+            cursor=cursor,
+            offset=(page - 1) * page_size,
+            scalars=False,
         )
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
-        
-        # Apply pagination
-        query = query.offset((page - 1) * page_size).limit(page_size)
-        
-        # Execute query
-        result = await db.execute(query)
-        grant_models = result.scalars().all()
-        
-        # Convert to EnrichedGrant objects
-        enriched_grants = []
-        for grant_model in grant_models:
-            enriched_grant = safe_convert_to_enriched_grant(grant_model)
-            if enriched_grant:
-                enriched_grants.append(enriched_grant)
+        enriched_grants = grant_rows_to_dicts(grant_models)
         
         logger.info(f"Successfully retrieved {len(enriched_grants)} saved grants")
-        return PaginatedEnrichedGrantResponse(
-            items=enriched_grants,
-            total=total,
-            page=page,
-            pageSize=page_size
-        )
+        return paginated_grants_response(enriched_grants, total, page, page_size, next_cursor)
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting saved grants: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -409,6 +422,8 @@ async def search_grants_endpoint(
     filters: GrantSearchFilters, # GrantSearchFilters might need update for EnrichedGrant fields
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,  # nextCursor from the previous page; takes precedence over page
+    include_total: bool = Query(True, alias="includeTotal"),
     db: AsyncSession = Depends(get_db_session)
     # research_agent=Depends(get_research_agent) # This endpoint should now use crud.get_grants_list
 ):
@@ -421,24 +436,24 @@ async def search_grants_endpoint(
         # Adapt GrantSearchFilters to the parameters of crud.get_grants_list
         # For now, we assume GrantSearchFilters contains fields like search_text, min_score (min_overall_score)
         # and potentially status_filter, sort_by, sort_order if added to GrantSearchFilters.
-        grants, total = await crud.get_grants_list(
+        result = await crud.get_grants_page(
             db=db,
             skip=(page - 1) * page_size,
             limit=page_size,
-            sort_by="overall_composite_score", # Default or from filters
+            sort_by="relevance" if filters.search_text else "overall_composite_score", # Hybrid rank when searching
             sort_order="desc", # Default or from filters
             status_filter=None, # Or from filters.category if mapped
             min_overall_score=filters.min_score,
-            search_query=filters.search_text
+            search_query=filters.search_text,
+            cursor=cursor,
+            include_total=include_total,
+            fast_serialize=True
         )
         duration_req = time.time() - start_time_req
-        log_api_metrics("/grants/search", duration_req, 200, page=page, page_size=page_size, total_items=total)
-        return PaginatedEnrichedGrantResponse(
-            items=grants,
-            total=total,
-            page=page,
-            pageSize=page_size
-        )
+        log_api_metrics("/grants/search", duration_req, 200, page=page, page_size=page_size, total_items=result.total)
+        return paginated_grants_response(result.items, result.total, page, page_size, result.next_cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         duration_req = time.time() - start_time_req
         log_api_metrics("/grants/search", duration_req, 500, error=str(e))
@@ -796,33 +811,40 @@ async def get_search_runs(
     run_type: Optional[str] = Query(None, description="Filter by run type: automated, manual, scheduled"),
     status: Optional[str] = Query(None, description="Filter by status: success, failed, partial, in_progress"),
     days_back: int = Query(30, ge=1, le=365),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; takes precedence over page"),
+    include_total: bool = Query(True),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get paginated search run history with optional filtering."""
     start_time = time.time()
     
     try:
-        runs_data, total = await crud.get_search_runs(
+        result = await crud.get_search_runs_page(
             db=db,
             page=page,
             page_size=page_size,
             run_type=run_type,
             status=status,
-            days_back=days_back
+            days_back=days_back,
+            cursor=cursor,
+            include_total=include_total
         )
         
         duration = time.time() - start_time
-        log_api_metrics("GET /search-runs", duration, 200, total_results=total)
+        log_api_metrics("GET /search-runs", duration, 200, total_results=result.total)
         
         return {
-            "items": runs_data,
-            "total": total,
+            "items": result.items,
+            "total": result.total,
             "page": page,
             "page_size": page_size,
-            "has_next": (page * page_size) < total,
-            "has_prev": page > 1
+            "next_cursor": result.next_cursor,
+            "has_next": result.next_cursor is not None,
+            "has_prev": page > 1 or cursor is not None
         }
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         duration = time.time() - start_time
         log_api_metrics("GET /search-runs", duration, 500, error=str(e))
@@ -868,6 +890,7 @@ async def get_latest_automated_run(db: AsyncSession = Depends(get_db_session)):
 
 @api_router.get("/search-runs/statistics", response_model=Dict[str, Any])
 async def get_search_run_statistics(
+    request: Request,
     days_back: int = Query(7, ge=1, le=90),
     db: AsyncSession = Depends(get_db_session)
 ):
@@ -875,16 +898,19 @@ async def get_search_run_statistics(
     start_time = time.time()
     
     try:
+        cached = await cached_response(request, SEARCH_RUNS)
+        if cached.hit:
+            return cached.value
         stats = await crud.get_search_run_statistics(db, days_back)
         
         duration = time.time() - start_time
         log_api_metrics("GET /search-runs/statistics", duration, 200)
         
-        return {
+        return await cached.store({
             "status": "success",
             "data": stats,
             "generated_at": datetime.now().isoformat()
-        }
+        })
     except Exception as e:
         duration = time.time() - start_time
         log_api_metrics("GET /search-runs/statistics", duration, 500, error=str(e))
@@ -965,9 +991,20 @@ async def get_search_run_live_status(
         
         status_value = search_run.status.value if hasattr(search_run.status, 'value') else str(search_run.status)
         
+        live_progress = search_run.progress or {}
+
         if status_value == "in_progress":
+            if live_progress.get("chunks_total"):
+                # Real progress reported by the streaming search pipeline
+                progress_percentage = min(
+                    95, (live_progress.get("chunks_done", 0) / live_progress["chunks_total"]) * 100
+                )
+                current_step = (
+                    f"Searching {live_progress.get('tier', '')} grants "
+                    f"({live_progress.get('grants_stored', 0)} stored so far)..."
+                )
             # Estimate progress based on elapsed time (rough estimate)
-            if search_run.timestamp is not None:
+            elif search_run.timestamp is not None:
                 elapsed = (datetime.now() - search_run.timestamp).total_seconds()
                 # Assume search takes ~60 seconds on average
                 progress_percentage = min(90, (elapsed / 60) * 100)
@@ -989,6 +1026,7 @@ async def get_search_run_live_status(
                 "status": search_run.status,
                 "progress_percentage": progress_percentage,
                 "current_step": current_step,
+                "progress": live_progress or None,
                 "grants_found": search_run.grants_found or 0,
                 "high_priority": search_run.high_priority or 0,
                 "duration_seconds": search_run.duration_seconds,
@@ -1008,6 +1046,7 @@ async def get_search_run_live_status(
 
 @api_router.get("/search-runs/analytics", response_model=Dict[str, Any])
 async def get_search_analytics(
+    request: Request,
     days_back: int = Query(30, ge=1, le=90),
     db: AsyncSession = Depends(get_db_session)
 ):
@@ -1015,6 +1054,9 @@ async def get_search_analytics(
     start_time = time.time()
     
     try:
+        cached = await cached_response(request, SEARCH_RUNS)
+        if cached.hit:
+            return cached.value
         from database.models import SearchRun
         from sqlalchemy import select, func
         from datetime import datetime, timedelta
@@ -1086,7 +1128,7 @@ async def get_search_analytics(
         duration = time.time() - start_time
         log_api_metrics("GET /search-runs/analytics", duration, 200)
         
-        return {
+        return await cached.store({
             "status": "success",
             "data": {
                 "period_days": days_back,
@@ -1104,7 +1146,7 @@ async def get_search_analytics(
                 "common_errors": common_errors
             },
             "generated_at": datetime.now().isoformat()
-        }
+        })
         
     except Exception as e:
         duration = time.time() - start_time
@@ -1112,11 +1154,14 @@ async def get_search_analytics(
         raise HTTPException(status_code=500, detail=f"Failed to fetch search analytics: {str(e)}")
 
 @api_router.get("/system/scheduler-status", response_model=Dict[str, Any])
-async def get_scheduler_status(db: AsyncSession = Depends(get_db_session)):
+async def get_scheduler_status(request: Request, db: AsyncSession = Depends(get_db_session)):
     """Check scheduler status and automated run health."""
     start_time = time.time()
     
     try:
+        cached = await cached_response(request, SEARCH_RUNS)
+        if cached.hit:
+            return cached.value
         from database.models import SearchRun
         from sqlalchemy import select, func
         from datetime import datetime, timedelta
@@ -1182,7 +1227,7 @@ async def get_scheduler_status(db: AsyncSession = Depends(get_db_session)):
         duration = time.time() - start_time
         log_api_metrics("GET /system/scheduler-status", duration, 200)
         
-        return {
+        return await cached.store({
             "status": "success",
             "scheduler_health": scheduler_health,
             "issues": issues,
@@ -1205,13 +1250,48 @@ async def get_scheduler_status(db: AsyncSession = Depends(get_db_session)):
                     "command": "python run_grant_search.py"
                 }
             }
-        }
+        })
         
     except Exception as e:
         duration = time.time() - start_time
         log_api_metrics("GET /system/scheduler-status", duration, 500, error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to fetch scheduler status: {str(e)}")
 
+@api_router.get("/system/llm-cache-stats", response_model=Dict[str, Any])
+async def get_llm_cache_stats():
+    """LLM response cache effectiveness (hits, misses, tokens saved)."""
+    start_time = time.time()
+
+    try:
+        from services.llm_cache import get_llm_cache
+
+        cache = get_llm_cache()
+        if cache is None:
+            return {"status": "success", "enabled": False, "data": None}
+
+        data = {
+            "process": cache.stats(),
+            # Aggregated over the API and all Celery workers when Redis is shared
+            "global": await cache.global_stats(),
+        }
+
+        duration = time.time() - start_time
+        log_api_metrics("GET /system/llm-cache-stats", duration, 200)
+        return {"status": "success", "enabled": True, "data": data}
+
+    except Exception as e:
+        duration = time.time() - start_time
+        log_api_metrics("GET /system/llm-cache-stats", duration, 500, error=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to fetch LLM cache stats: {str(e)}")
+
+@api_router.get("/system/response-cache-stats", response_model=Dict[str, Any])
+async def get_response_cache_stats():
+    """Dashboard response cache effectiveness for this API process."""
+    cache = get_response_cache()
+    if cache is None:
+        return {"status": "success", "enabled": False, "data": None}
+    return {"status": "success", "enabled": True, "data": cache.stats()}
+
 # User saved grants endpoints
 
 
@@ -217,9 +217,10 @@ class APIResponse(BaseModel, Generic[T]):
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    total: Optional[int]  # None when the client opted out of counting (includeTotal=false)
     page: int
     page_size: int = Field(..., alias="pageSize")
+    next_cursor: Optional[str] = Field(None, alias="nextCursor")  # Opaque keyset cursor for the next page
 
     class Config:
         populate_by_name = True
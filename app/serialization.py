@@ -0,0 +1,202 @@
+"""
+Fast serialization path for grant listings.
+
+safe_convert_to_enriched_grant builds four nested Pydantic models per grant, and
+FastAPI then re-validates them against the response model. For listings of
+trusted DB rows we instead convert each row straight to the JSON-ready dict that
+EnrichedGrant.model_dump(mode="json") would produce, using one field table that
+is compiled into per-field getters once at import, and render the page with orjson.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.schemas import EnrichedGrant
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+    _loads = orjson.loads
+except ImportError:  # orjson not installed: same output, stdlib speed
+    orjson = None
+    FastJSONResponse = JSONResponse
+    _loads = json.loads
+
+
+# ----------------------------------------------------------------------
+# Value converters (same semantics as the safe_* helpers in app.crud)
+# ----------------------------------------------------------------------
+
+def _float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _datetime(value: Any) -> Optional[datetime]:
+    return value if isinstance(value, datetime) else None
+
+
+def _json(value: Any) -> Any:
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    if not value:
+        return None
+    try:
+        return _loads(value)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Failed to parse JSON field: {e}")
+        return None
+
+
+def _str_list(value: Any) -> List[str]:
+    value = _json(value)
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return []
+
+
+def _dict(value: Any) -> Optional[Dict[str, Any]]:
+    value = _json(value)
+    return value if isinstance(value, dict) else None
+
+
+# ----------------------------------------------------------------------
+# Field table: output field -> (source attribute, converter)
+# ----------------------------------------------------------------------
+
+_COLUMN_FIELDS: Tuple[Tuple[str, str, Optional[Callable[[Any], Any]]], ...] = (
+    ("id", "id", str),
+    ("title", "title", None),
+    ("description", "description", None),
+    ("funding_amount", "funding_amount", _float),
+    ("deadline", "deadline", _datetime),
+    ("eligibility_criteria", "eligibility_summary_llm", None),
+    ("category", "identified_sector", None),
+    ("source_url", "source_url", None),
+    ("source_name", "source_name", None),
+    ("grant_id_external", "grant_id_external", None),
+    ("summary_llm", "summary_llm", None),
+    ("eligibility_summary_llm", "eligibility_summary_llm", None),
+    ("funder_name", "funder_name", None),
+    ("funding_amount_min", "funding_amount_min", _float),
+    ("funding_amount_max", "funding_amount_max", _float),
+    ("funding_amount_exact", "funding_amount_exact", _float),
+    ("funding_amount_display", "funding_amount_display", None),
+    ("deadline_date", "deadline_date", _datetime),
+    ("application_open_date", "application_open_date", _datetime),
+    ("keywords", "keywords_json", _str_list),
+    ("categories_project", "categories_project_json", _str_list),
+    ("identified_sector", "identified_sector", None),
+    ("identified_sub_sector", "identified_sub_sector", None),
+    ("geographic_scope", "geographic_scope", None),
+    ("specific_location_mentions", "specific_location_mentions_json", _str_list),
+    ("overall_composite_score", "overall_composite_score", None),
+    ("compliance_summary", "compliance_summary_json", _dict),
+    ("feasibility_score", "feasibility_score", _float),
+    ("risk_assessment", "risk_assessment_json", _dict),
+    ("raw_source_data", "raw_source_data_json", _dict),
+    ("enrichment_log", "enrichment_log_json", _str_list),
+)
+
+
+def _source_details(row) -> Dict[str, Any]:
+    return {
+        "source_name": row.source_name,
+        "source_url": row.source_url,
+        "retrieved_at": _datetime(row.retrieved_at),
+    }
+
+
+def _research_scores(row) -> Optional[Dict[str, Any]]:
+    # Analyses carry no research-context dimensions; the schema's 0.0 defaults apply
+    if row.analysis_id is None:
+        return None
+    return {"sector_relevance": 0.0, "geographic_relevance": 0.0, "operational_alignment": 0.0}
+
+
+def _compliance_scores(row) -> Optional[Dict[str, Any]]:
+    if row.analysis_id is None:
+        return None
+    return {
+        "business_logic_alignment": 0.0,
+        "feasibility_score": row.analysis_feasibility_score,
+        "strategic_synergy": 0.0,
+        "final_weighted_score": row.analysis_final_score,
+    }
+
+
+_COMPOSITE_FIELDS: Dict[str, Callable[[Any], Any]] = {
+    "source_details": _source_details,
+    "research_scores": _research_scores,
+    "compliance_scores": _compliance_scores,
+}
+
+
+def _compile_getters() -> List[Tuple[str, Callable[[Any], Any]]]:
+    """One getter per EnrichedGrant field, in schema order; unmapped fields are None."""
+    columns = {key: (attr, conv) for key, attr, conv in _COLUMN_FIELDS}
+    getters = []
+    for field in EnrichedGrant.model_fields:
+        if field in _COMPOSITE_FIELDS:
+            getters.append((field, _COMPOSITE_FIELDS[field]))
+        elif field in columns:
+            attr, conv = columns[field]
+            if conv is None:
+                getters.append((field, lambda row, attr=attr: getattr(row, attr)))
+            else:
+                getters.append((field, lambda row, attr=attr, conv=conv: conv(getattr(row, attr))))
+        else:
+            getters.append((field, lambda row: None))
+    return getters
+
+
+_GETTERS = _compile_getters()
+
+
+def grant_row_to_dict(row) -> Optional[Dict[str, Any]]:
+    """JSON-ready EnrichedGrant dict for a crud.grant_listing_query row.
+
+    Rows the Pydantic path would reject (no id/title/description) are skipped.
+    """
+    if row.id is None or row.title is None or row.description is None:
+        logger.warning(f"Skipping grant row {row.id} with missing required fields")
+        return None
+    return {field: getter(row) for field, getter in _GETTERS}
+
+
+def grant_rows_to_dicts(rows) -> List[Dict[str, Any]]:
+    items = []
+    for row in rows:
+        try:
+            item = grant_row_to_dict(row)
+            if item is not None:
+                items.append(item)
+        except Exception as e:
+            logger.warning(f"Skipping grant conversion due to error: {e}")
+    return items
+
+
+def paginated_grants_response(items: List[Dict[str, Any]], total: Optional[int], page: int,
+                              page_size: int, next_cursor: Optional[str] = None) -> JSONResponse:
+    """PaginatedEnrichedGrantResponse body rendered directly (no response-model re-validation)."""
+    content = {
+        "items": items,
+        "total": total,
+        "page": page,
+        "pageSize": page_size,
+        "nextCursor": next_cursor,
+    }
+    if orjson is None:
+        content = jsonable_encoder(content)  # stdlib json can't encode datetimes
+    return FastJSONResponse(content=content)
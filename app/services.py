@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass
 from typing import Optional, Any
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker, AsyncEngine
@@ -7,6 +8,7 @@ from services.deepseek_client import DeepSeekClient
 from services.resend_client import ResendEmailClient
 from fixes.services.fallback_clients import FallbackNotificationManager
 from config.settings import get_settings
+from database.vector import register_vector_codec
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +20,7 @@ class Services:
     vector_client: Optional[PgVectorClient] = None  # Postgres-backed vector store
     deepseek_client: Optional[DeepSeekClient] = None  # DeepSeek AI client
     notifier: Optional[Any] = None  # ResendEmailClient or FallbackNotificationManager
+    embedding_warmup: Optional[asyncio.Task] = None  # Background fastembed model warm-up
     start_time: Optional[float] = None
 
 services = Services()
@@ -45,6 +48,7 @@ async def init_services():
                 }
             }
         )
+        register_vector_codec(services.db_engine)
 
         services.db_sessionmaker = async_sessionmaker(
             services.db_engine,
@@ -63,6 +67,8 @@ async def init_services():
             async with services.db_engine.begin() as conn:
                 await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
             logger.info("pgvector extension ensured")
+            # Pooled connections opened before the extension existed lack the binary codec
+            await services.db_engine.dispose()
         except Exception as ext_err:
             logger.warning(f"Could not create pgvector extension: {ext_err}")
 
@@ -107,4 +113,13 @@ async def init_services():
         logger.warning(f"Resend initialization failed: {e}. Using fallback notifier.")
         services.notifier = FallbackNotificationManager()
 
+    # Pre-warm the embedding model off the event loop; /health/ready reports when it's done
+    if settings.EMBEDDING_WARMUP_ON_STARTUP:
+        try:
+            from services.embedding_service import warm_up_model
+            services.embedding_warmup = asyncio.create_task(asyncio.to_thread(warm_up_model))
+            logger.info("Embedding model warm-up started")
+        except Exception as e:
+            logger.warning(f"Embedding model warm-up could not start: {e}. Model will load on first use.")
+
     logger.info("Service initialization completed with graceful degradation")
\ No newline at end of file
@@ -6,6 +6,7 @@ Handles grant searches, application generation, and automated workflows.
 import logging
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown, worker_shutdown
 from config.settings import Settings
 
 logger = logging.getLogger(__name__)
@@ -114,6 +115,15 @@ celery_app.conf.update(
             "task": "tasks.cleanup_expired_grants.cleanup_expired_grants",
             "schedule": crontab(minute=0, hour=3, day_of_week=0),
         },
+
+        # DASHBOARD AGGREGATES - Hourly at :30
+        # Rationale: Triggers on grants keep grant_stats current; the hourly
+        # rebuild corrects drift (e.g. rows written while triggers were
+        # disabled) off the request path. :30 avoids the 6-hourly searches.
+        "refresh-dashboard-aggregates": {
+            "task": "tasks.maintenance.refresh_dashboard_aggregates",
+            "schedule": crontab(minute=30),
+        },
     },
 )
 
@@ -122,6 +132,68 @@ celery_app.conf.task_default_queue = "default"
 celery_app.conf.task_default_exchange = "default"
 celery_app.conf.task_default_routing_key = "default"
 
+
+
+def _is_prefork(worker) -> bool:
+    pool_cls = getattr(worker, "pool_cls", "")
+    return "prefork" in getattr(pool_cls, "__module__", str(pool_cls))
+
+
+@worker_init.connect
+def _init_worker(sender=None, **kwargs):
+    """Optionally load the embedding model before the pool forks (copy-on-write sharing).
+
+    Thread-based pools run every task in this process: start the shared event
+    loop and size the database pool for all of them here.
+    """
+    if settings.EMBEDDING_PRELOAD_IN_PARENT:
+        from services.embedding_service import warm_up_model
+        warm_up_model()
+    if sender is not None and not _is_prefork(sender):
+        from tasks.worker_runtime import init_worker_runtime
+        init_worker_runtime(concurrent_tasks=sender.concurrency or 1)
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    """Drop clients inherited from the parent, start the worker loop and warm the embedding model."""
+    import threading
+    from services.deepseek_client import reset_http_clients
+    from services.embedding_service import warm_up_model
+    from services.application_stream import get_application_stream
+    from services.llm_cache import get_llm_cache
+    from services.rate_limiter import get_rate_limiter
+    from services.response_cache import get_response_cache
+    from tasks.worker_runtime import init_worker_runtime
+    reset_http_clients()
+    get_rate_limiter().reset_connections()
+    for cache in (get_llm_cache(), get_response_cache(), get_application_stream()):
+        if cache:
+            cache.reset_connections()
+    # Prefork children run one task at a time
+    init_worker_runtime(concurrent_tasks=1)
+
+    # Background thread: worker_process_init must return within Celery's
+    # process-init timeout, and tasks needing embeddings wait on the model lock
+    threading.Thread(target=warm_up_model, name="embedding-warmup", daemon=True).start()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    """Release pooled HTTP clients and database connections when a worker child exits."""
+    from services.deepseek_client import reset_http_clients
+    from tasks.worker_runtime import shutdown_worker_runtime
+    reset_http_clients()
+    shutdown_worker_runtime()
+
+
+@worker_shutdown.connect
+def _shutdown_worker(**kwargs):
+    """Close the shared event loop of thread-based pools (no-op for prefork)."""
+    from tasks.worker_runtime import shutdown_worker_runtime
+    shutdown_worker_runtime()
+
+
 logger.info("Celery application configured with Redis broker")
 logger.info(f"Broker URL: {settings.REDIS_URL}")
 logger.info(f"Result backend: {settings.celery_backend}")
@@ -51,6 +51,18 @@ class Settings(BaseSettings):
     db_pass: str = Field(default="", env="DB_PASSWORD")
     db_name: str = Field(default="grantfinder", env="DB_NAME")
     database_url: Optional[str] = Field(default=None, env="DATABASE_URL")
+    # Connection pool of the shared engine (database/session.py). Celery worker
+    # processes resize it to DB_CONNECTIONS_PER_TASK x tasks run concurrently.
+    DB_POOL_SIZE: int = Field(default=5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=5, env="DB_MAX_OVERFLOW")
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=1800, env="DB_POOL_RECYCLE_SECONDS")
+    DB_POOL_TIMEOUT_SECONDS: int = Field(default=30, env="DB_POOL_TIMEOUT_SECONDS")
+    DB_CONNECTIONS_PER_TASK: int = Field(default=2, env="DB_CONNECTIONS_PER_TASK")
+
+    # Maintenance jobs update/delete rows in chunks, one short transaction each
+    MAINTENANCE_BATCH_SIZE: int = Field(default=5000, env="MAINTENANCE_BATCH_SIZE")
+    MAINTENANCE_LOCK_TIMEOUT_MS: int = Field(default=2000, env="MAINTENANCE_LOCK_TIMEOUT_MS")  # per batch
+    MAINTENANCE_LOCK_RETRIES: int = Field(default=3, env="MAINTENANCE_LOCK_RETRIES")
 
     # Legacy Auth0 (kept for migration compatibility, no longer used)
     AUTH0_DOMAIN: str = Field(default="", env="AUTH0_DOMAIN")
@@ -77,6 +89,50 @@ class Settings(BaseSettings):
     DEEPSEEK_API_BASE: str = Field(default="https://api.deepseek.com", env="DEEPSEEK_API_BASE")
     AGENTQL_API_KEY: str = Field(default="", env="AGENTQL_API_KEY")  # Web scraping for grant discovery
 
+    # DeepSeek HTTP transport (pooled keep-alive client, one per event loop)
+    DEEPSEEK_HTTP2: bool = Field(default=True, env="DEEPSEEK_HTTP2")
+    DEEPSEEK_MAX_CONNECTIONS: int = Field(default=20, env="DEEPSEEK_MAX_CONNECTIONS")
+    DEEPSEEK_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=10, env="DEEPSEEK_MAX_KEEPALIVE_CONNECTIONS")
+    DEEPSEEK_KEEPALIVE_EXPIRY: float = Field(default=60.0, env="DEEPSEEK_KEEPALIVE_EXPIRY")  # seconds
+
+    # DeepSeek rate limiting (adaptive token bucket shared by all agents in a process)
+    DEEPSEEK_RATE_LIMIT_RPS: float = Field(default=5.0, env="DEEPSEEK_RATE_LIMIT_RPS")  # starting rate
+    DEEPSEEK_RATE_LIMIT_MAX_RPS: float = Field(default=20.0, env="DEEPSEEK_RATE_LIMIT_MAX_RPS")
+    DEEPSEEK_RATE_LIMIT_BURST: int = Field(default=10, env="DEEPSEEK_RATE_LIMIT_BURST")
+    DEEPSEEK_MAX_CONCURRENCY: int = Field(default=10, env="DEEPSEEK_MAX_CONCURRENCY")
+    DEEPSEEK_MAX_RETRIES: int = Field(default=3, env="DEEPSEEK_MAX_RETRIES")  # retries on 429
+    DEEPSEEK_RATE_LIMIT_USE_REDIS: bool = Field(default=False, env="DEEPSEEK_RATE_LIMIT_USE_REDIS")  # share budget across workers
+
+    # LLM response cache (identical chat completions served from cache)
+    LLM_CACHE_ENABLED: bool = Field(default=True, env="LLM_CACHE_ENABLED")
+    LLM_CACHE_TTL_SECONDS: int = Field(default=21600, env="LLM_CACHE_TTL_SECONDS")  # one scheduled-search cycle
+    LLM_CACHE_MAX_ENTRIES: int = Field(default=1024, env="LLM_CACHE_MAX_ENTRIES")
+    LLM_CACHE_USE_REDIS: bool = Field(default=False, env="LLM_CACHE_USE_REDIS")  # share cache across workers via REDIS_URL
+
+    # Embedding inference (fastembed, micro-batched in worker threads)
+    EMBEDDING_MAX_BATCH_SIZE: int = Field(default=64, env="EMBEDDING_MAX_BATCH_SIZE")  # texts per model call
+    EMBEDDING_MAX_WAIT_MS: float = Field(default=10.0, env="EMBEDDING_MAX_WAIT_MS")  # wait for more callers
+    EMBEDDING_WORKERS: int = Field(default=1, env="EMBEDDING_WORKERS")  # ONNX already uses several cores
+    EMBEDDING_CACHE_DIR: str = Field(default="", env="EMBEDDING_CACHE_DIR")  # optional local .npy tier for the embedding cache
+    EMBEDDING_MODEL_CACHE_DIR: str = Field(default="", env="EMBEDDING_MODEL_CACHE_DIR")  # persistent fastembed model dir (default: system temp)
+    EMBEDDING_WARMUP_ON_STARTUP: bool = Field(default=True, env="EMBEDDING_WARMUP_ON_STARTUP")
+    # Load the model once in the Celery parent so forked children share it copy-on-write.
+    # Off by default: onnxruntime thread pools are not always fork-safe.
+    EMBEDDING_PRELOAD_IN_PARENT: bool = Field(default=False, env="EMBEDDING_PRELOAD_IN_PARENT")
+
+    # Hybrid grant search (full-text + vector, reciprocal-rank fusion)
+    HYBRID_SEARCH_CANDIDATES: int = Field(default=200, env="HYBRID_SEARCH_CANDIDATES")  # per retriever
+    HYBRID_SEARCH_RRF_K: int = Field(default=60, env="HYBRID_SEARCH_RRF_K")
+
+    # Listing pagination (filtered COUNT(*) results are reused for this long)
+    PAGINATION_COUNT_CACHE_TTL_SECONDS: int = Field(default=30, env="PAGINATION_COUNT_CACHE_TTL_SECONDS")
+
+    # Response cache for polled read endpoints (invalidated when grants/search runs change)
+    RESPONSE_CACHE_ENABLED: bool = Field(default=True, env="RESPONSE_CACHE_ENABLED")
+    RESPONSE_CACHE_TTL_SECONDS: int = Field(default=60, env="RESPONSE_CACHE_TTL_SECONDS")  # upper bound on staleness
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=2048, env="RESPONSE_CACHE_MAX_ENTRIES")
+    RESPONSE_CACHE_USE_REDIS: bool = Field(default=False, env="RESPONSE_CACHE_USE_REDIS")  # share entries and invalidations with workers
+
     # Authentication (simple JWT)
     SECRET_KEY: str = Field(default="change-me-in-production", env="SECRET_KEY")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=60, env="ACCESS_TOKEN_EXPIRE_MINUTES")
@@ -95,6 +151,15 @@ class Settings(BaseSettings):
     # Grant search configuration
     MAX_GRANTS_PER_SEARCH: int = Field(default=20, env="MAX_GRANTS_PER_SEARCH")
 
+    # Application generation (sections are generated concurrently)
+    APPLICATION_SECTION_CONCURRENCY: int = Field(default=6, env="APPLICATION_SECTION_CONCURRENCY")  # per task
+    APPLICATION_SECTION_TIMEOUT_SECONDS: float = Field(default=90.0, env="APPLICATION_SECTION_TIMEOUT_SECONDS")  # per attempt
+    APPLICATION_SECTION_RETRIES: int = Field(default=1, env="APPLICATION_SECTION_RETRIES")
+    # Streaming mode: section tokens relayed to SSE clients through Redis pub/sub (REDIS_URL)
+    APPLICATION_STREAMING_ENABLED: bool = Field(default=True, env="APPLICATION_STREAMING_ENABLED")
+    APPLICATION_STREAM_REPLAY_TTL_SECONDS: int = Field(default=3600, env="APPLICATION_STREAM_REPLAY_TTL_SECONDS")
+    APPLICATION_STREAM_HEARTBEAT_SECONDS: float = Field(default=15.0, env="APPLICATION_STREAM_HEARTBEAT_SECONDS")
+
     @property
     def celery_broker(self) -> str:
         """Get Celery broker URL, defaults to REDIS_URL."""
@@ -7,11 +7,12 @@ from datetime import datetime
 from enum import Enum as PyEnum
 from typing import List, Optional
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, JSON, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, JSON, Boolean, Text, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy.orm import relationship, deferred, Mapped, mapped_column
 from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
+from database.vector import Vector
 
 Base = declarative_base()
 
@@ -144,6 +145,8 @@ class BusinessProfile(Base):
     # Vector embeddings reference
     vector_embeddings_id = Column(String, nullable=True)  # pgvector embedding reference
     embeddings_generated_at = Column(DateTime, nullable=True)
+    # Mean of this profile's chunk embeddings (deferred: only loaded when asked for)
+    embedding_centroid = deferred(Column(Vector(384), nullable=True))
 
     # Timestamps
     created_at = Column(DateTime, server_default=func.now())
@@ -243,6 +246,9 @@ class GeneratedApplication(Base):
     # Structured sections (JSON)
     sections = Column(JSON, nullable=True)  # {executive_summary, needs_statement, etc.}
 
+    # RAG context the sections were written from, reused when regenerating
+    generation_context = Column(JSON, nullable=True)  # {business_context, context_chunks}
+
     # Application metadata
     generation_date = Column(DateTime, server_default=func.now())
     last_edited = Column(DateTime, nullable=True)
@@ -320,6 +326,7 @@ class Grant(Base):
     # Source information
     source_name = Column(String, nullable=True)
     source_url = Column(String, nullable=True)
+    source_url_key = Column(String(64), nullable=True)  # hash of the normalized URL; unique per user (see app/duplicate_detection.py)
     retrieved_at = Column(DateTime, nullable=True)
     
     # Contextual layers
@@ -346,7 +353,30 @@ class Grant(Base):
     raw_source_data_json = Column(JSON, nullable=True)
     enrichment_log_json = Column(JSON, nullable=True)
     last_enriched_at = Column(DateTime, nullable=True)
-    
+
+    # Mean of this grant's chunk embeddings for one-query relevance scoring
+    # (deferred: only loaded when asked for)
+    embedding_centroid = deferred(Column(Vector(384), nullable=True))
+
+    # Full-text search document (generated by Postgres, GIN-indexed; see services/hybrid_search.py)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+
+    # Normalized title for fuzzy duplicate detection (trigram-indexed; see app/duplicate_detection.py)
+    title_normalized = deferred(Column(
+        Text,
+        Computed(
+            "btrim(regexp_replace(lower(coalesce(title, '')), '[^a-z0-9]+', ' ', 'g'))",
+            persisted=True,
+        ),
+    ))
+
     # Grant lifecycle tracking
     record_status = Column(String, nullable=True, default="ACTIVE")
 
@@ -500,6 +530,10 @@ class SearchRun(Base):
     api_calls_made = Column(Integer, default=0)
     processing_time_ms = Column(Integer, nullable=True)
 
+    # Live progress from the streaming search pipeline
+    # {"tier", "chunks_done", "chunks_total", "grants_stored"}
+    progress = Column(JSON, nullable=True)
+
     # Relationships
     user = relationship("User", back_populates="search_runs")
 
@@ -516,6 +550,7 @@ class GrantEmbedding(Base):
     grant_id = Column(Integer, ForeignKey('grants.id', ondelete='CASCADE'), nullable=False, index=True)
     embedding = Column(Vector(384), nullable=False)  # 384-dim for BAAI/bge-small-en-v1.5
     text_content = Column(Text, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # sha256 of model + chunk text
     chunk_index = Column(Integer, default=0)
     created_at = Column(DateTime, server_default=func.now())
 
@@ -531,8 +566,19 @@ class ProfileEmbedding(Base):
     business_profile_id = Column(Integer, ForeignKey('business_profiles.id', ondelete='CASCADE'), nullable=False, index=True)
     embedding = Column(Vector(384), nullable=False)
     text_content = Column(Text, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # sha256 of model + chunk text
     chunk_index = Column(Integer, default=0)
     created_at = Column(DateTime, server_default=func.now())
 
     user = relationship("User")
-    business_profile = relationship("BusinessProfile")
\ No newline at end of file
+    business_profile = relationship("BusinessProfile")
+
+
+class EmbeddingCacheEntry(Base):
+    """Content-addressed embedding vectors, shared by every grant/profile chunk with the same text."""
+    __tablename__ = 'embedding_cache'
+
+    content_hash = Column(String(64), primary_key=True)  # sha256 of model + chunk text
+    model = Column(String(100), nullable=False)
+    embedding = Column(Vector(384), nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
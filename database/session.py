@@ -1,25 +1,42 @@
 """
 Database session management and connection handling.
+
+One pooled engine per process. asyncpg connections belong to the event loop
+that opened them, so the pool must only be used from a single loop: the
+server's loop in the API, and the persistent worker loop in Celery worker
+processes (see tasks/worker_runtime.py), which also resizes the pool with
+configure_pool().
 """
 
 import logging
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 
 from config.settings import get_settings
+from database.vector import register_vector_codec
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+def _create_engine(pool_size: int, max_overflow: int) -> AsyncEngine:
+    engine = create_async_engine(
+        settings.db_url,  # Corrected: Use the db_url property
+        echo=settings.app_debug,  # Corrected: Use app_debug
+        future=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+    )
+    register_vector_codec(engine)
+    return engine
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.db_url,  # Corrected: Use the db_url property
-    echo=settings.app_debug,  # Corrected: Use app_debug
-    future=True,
-    poolclass=NullPool
-)
+engine = _create_engine(settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -30,6 +47,30 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+
+def configure_pool(pool_size: int, max_overflow: Optional[int] = None) -> AsyncEngine:
+    """Replace the shared engine with one using the given pool size.
+
+    AsyncSessionLocal is rebound in place, so modules that imported it pick up
+    the new engine. Connections inherited from a parent process are dropped
+    without being closed (the parent still owns those sockets).
+    """
+    global engine
+    old_engine = engine
+    if max_overflow is None:
+        max_overflow = settings.DB_MAX_OVERFLOW
+    engine = _create_engine(pool_size, max_overflow)
+    AsyncSessionLocal.configure(bind=engine)
+    old_engine.sync_engine.dispose(close=False)
+    logger.info(f"Database pool configured: size={pool_size}, max_overflow={max_overflow}")
+    return engine
+
+
+async def dispose_engine() -> None:
+    """Close every pooled connection (on shutdown of the loop that owns them)."""
+    await engine.dispose()
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting async database sessions."""
     async with AsyncSessionLocal() as session:
@@ -0,0 +1,42 @@
+"""
+pgvector column type and asyncpg codec wiring.
+
+On asyncpg connections vectors travel in pgvector's binary format (big-endian
+float4 arrays) instead of '[0.1,0.2,...]' text that Python has to format and
+Postgres has to parse. Query parameters and results are float32 NumPy arrays.
+"""
+
+import logging
+
+from pgvector.asyncpg import register_vector
+from pgvector.sqlalchemy import Vector as _PgVector
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class Vector(_PgVector):
+    """pgvector column type that leaves asyncpg values to the binary codec.
+
+    Other drivers (Alembic / sync scripts) keep pgvector's text conversion.
+    """
+
+    cache_ok = True
+
+    def bind_processor(self, dialect):
+        if dialect.driver == "asyncpg":
+            return None
+        return super().bind_processor(dialect)
+
+
+def register_vector_codec(engine: AsyncEngine) -> None:
+    """Register pgvector's binary codec on every new asyncpg connection of engine."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _register(dbapi_connection, connection_record):
+        try:
+            dbapi_connection.run_async(register_vector)
+        except Exception as e:
+            # Extension not installed yet; vector columns can't be used on this connection
+            logger.warning(f"pgvector codec not registered: {e}")
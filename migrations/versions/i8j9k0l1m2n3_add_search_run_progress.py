@@ -0,0 +1,32 @@
+"""Add progress column to search_runs
+
+Revision ID: i8j9k0l1m2n3
+Revises: h7i8j9k0l1m2
+Create Date: 2026-10-16 00:00:00.000000
+
+This migration adds a JSON progress column to search_runs. The streaming
+search pipeline updates it as chunks resolve and grants are stored, so the
+live-status endpoint can report real progress instead of a time estimate.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'i8j9k0l1m2n3'
+down_revision: Union[str, None] = 'h7i8j9k0l1m2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('search_runs', sa.Column('progress', sa.JSON(), nullable=True))
+
+    print("✅ Added progress column to search_runs table")
+
+
+def downgrade() -> None:
+    op.drop_column('search_runs', 'progress')
+
+    print("✅ Removed progress column from search_runs table")
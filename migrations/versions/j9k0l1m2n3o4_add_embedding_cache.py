@@ -0,0 +1,46 @@
+"""Add content-hash embedding cache
+
+Revision ID: j9k0l1m2n3o4
+Revises: i8j9k0l1m2n3
+Create Date: 2026-10-16 00:00:00.000000
+
+This migration creates:
+- embedding_cache table keyed by sha256(model + chunk text), so unchanged
+  chunks reuse their vectors instead of being re-inferred
+- content_hash column on grant_embeddings and profile_embeddings, so
+  re-embedding only rewrites chunks whose text changed
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = 'j9k0l1m2n3o4'
+down_revision: Union[str, None] = 'i8j9k0l1m2n3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'embedding_cache',
+        sa.Column('content_hash', sa.String(64), primary_key=True),
+        sa.Column('model', sa.String(100), nullable=False),
+        sa.Column('embedding', Vector(384), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+
+    op.add_column('grant_embeddings', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.add_column('profile_embeddings', sa.Column('content_hash', sa.String(64), nullable=True))
+
+    print("✅ Created embedding_cache table and content_hash columns")
+
+
+def downgrade() -> None:
+    op.drop_column('profile_embeddings', 'content_hash')
+    op.drop_column('grant_embeddings', 'content_hash')
+    op.drop_table('embedding_cache')
+
+    print("✅ Dropped embedding_cache table and content_hash columns")
@@ -0,0 +1,50 @@
+"""Add centroid embeddings to grants and business_profiles
+
+Revision ID: k0l1m2n3o4p5
+Revises: j9k0l1m2n3o4
+Create Date: 2026-10-16 00:00:00.000000
+
+This migration adds embedding_centroid Vector(384) columns holding the mean
+of each grant's / profile's chunk embeddings, so relevance scoring is one
+cosine distance per grant in SQL instead of re-averaging chunks in Python.
+Existing rows are backfilled with pgvector's avg(vector) aggregate.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = 'k0l1m2n3o4p5'
+down_revision: Union[str, None] = 'j9k0l1m2n3o4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('grants', sa.Column('embedding_centroid', Vector(384), nullable=True))
+    op.add_column('business_profiles', sa.Column('embedding_centroid', Vector(384), nullable=True))
+
+    # Backfill from existing chunk embeddings
+    op.execute("""
+        UPDATE grants g
+        SET embedding_centroid = c.centroid
+        FROM (SELECT grant_id, avg(embedding) AS centroid FROM grant_embeddings GROUP BY grant_id) c
+        WHERE c.grant_id = g.id
+    """)
+    op.execute("""
+        UPDATE business_profiles bp
+        SET embedding_centroid = c.centroid
+        FROM (SELECT user_id, avg(embedding) AS centroid FROM profile_embeddings GROUP BY user_id) c
+        WHERE c.user_id = bp.user_id
+    """)
+
+    print("✅ Added and backfilled embedding_centroid columns")
+
+
+def downgrade() -> None:
+    op.drop_column('business_profiles', 'embedding_centroid')
+    op.drop_column('grants', 'embedding_centroid')
+
+    print("✅ Removed embedding_centroid columns")
@@ -0,0 +1,43 @@
+"""Add generated tsvector column and GIN index to grants
+
+Revision ID: l1m2n3o4p5q6
+Revises: k0l1m2n3o4p5
+Create Date: 2026-10-16 00:00:00.000000
+
+This migration adds a stored generated search_vector column (title weighted
+above description) with a GIN index, so text search on /grants and
+/grants/search is an index lookup instead of an ILIKE sequential scan.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'l1m2n3o4p5q6'
+down_revision: Union[str, None] = 'k0l1m2n3o4p5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        ALTER TABLE grants ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+    """)
+    op.execute("""
+        CREATE INDEX ix_grants_search_vector
+        ON grants
+        USING gin (search_vector)
+    """)
+
+    print("✅ Added grants.search_vector with GIN index")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_grants_search_vector")
+    op.drop_column('grants', 'search_vector')
+
+    print("✅ Removed grants.search_vector")
@@ -0,0 +1,34 @@
+"""Add (grant_id, analysis_date) index on analyses
+
+Revision ID: m2n3o4p5q6r7
+Revises: l1m2n3o4p5q6
+Create Date: 2026-10-16 00:00:00.000000
+
+Grant listings fetch each grant's latest analysis with a LATERAL
+ORDER BY analysis_date DESC LIMIT 1; this index turns that into a single
+index probe per grant (analyses.grant_id had no index at all).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'm2n3o4p5q6r7'
+down_revision: Union[str, None] = 'l1m2n3o4p5q6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_analyses_grant_id_analysis_date
+        ON analyses (grant_id, analysis_date DESC, id DESC)
+    """)
+
+    print("✅ Added ix_analyses_grant_id_analysis_date")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_analyses_grant_id_analysis_date")
+
+    print("✅ Removed ix_analyses_grant_id_analysis_date")
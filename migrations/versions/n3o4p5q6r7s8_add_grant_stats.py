@@ -0,0 +1,123 @@
+"""Add grant_stats aggregates table maintained by triggers
+
+Revision ID: n3o4p5q6r7s8
+Revises: m2n3o4p5q6r7
+Create Date: 2026-10-16 00:00:00.000000
+
+This migration adds grant_stats, one row per (dimension, bucket) holding grant
+counts and score sums, so the dashboard endpoints read a handful of rows
+instead of scanning grants. Statement-level triggers on grants apply the net
+change of every INSERT/UPDATE/DELETE (via transition tables, so bulk upserts
+cost one aggregate per statement); the Celery task
+tasks.maintenance.refresh_dashboard_aggregates rebuilds it periodically.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'n3o4p5q6r7s8'
+down_revision: Union[str, None] = 'm2n3o4p5q6r7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Buckets each grant contributes to; keep in sync with services/dashboard_stats.py
+BUCKETS_SQL = """
+    LATERAL (VALUES
+        ('all', ''),
+        ('created_month', to_char(c.created_at, 'YYYY-MM')),
+        ('deadline_day', to_char(c.deadline, 'YYYY-MM-DD')),
+        ('deadline_month', to_char(c.deadline, 'YYYY-MM')),
+        ('sector', c.identified_sector),
+        ('score_bucket', floor(c.overall_composite_score / 10.0)::int::text)
+    ) AS b(dimension, bucket)
+"""
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE grant_stats (
+            dimension VARCHAR(32) NOT NULL,
+            bucket VARCHAR(255) NOT NULL,
+            grant_count BIGINT NOT NULL DEFAULT 0,
+            score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            score_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, bucket)
+        )
+    """)
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION grant_stats_apply() RETURNS trigger AS $$
+        DECLARE
+            changes TEXT;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                changes := 'SELECT 1 AS sign, * FROM new_rows';
+            ELSIF TG_OP = 'DELETE' THEN
+                changes := 'SELECT -1 AS sign, * FROM old_rows';
+            ELSE
+                changes := 'SELECT 1 AS sign, * FROM new_rows UNION ALL SELECT -1 AS sign, * FROM old_rows';
+            END IF;
+
+            EXECUTE format($sql$
+                INSERT INTO grant_stats AS s (dimension, bucket, grant_count, score_sum, score_count)
+                SELECT b.dimension, b.bucket,
+                       sum(c.sign),
+                       coalesce(sum(c.sign * c.overall_composite_score), 0),
+                       sum(c.sign * (c.overall_composite_score IS NOT NULL)::int)
+                FROM (%s) c, {BUCKETS_SQL}
+                WHERE b.bucket IS NOT NULL
+                GROUP BY b.dimension, b.bucket
+                HAVING sum(c.sign) <> 0
+                    OR coalesce(sum(c.sign * c.overall_composite_score), 0) <> 0
+                    OR sum(c.sign * (c.overall_composite_score IS NOT NULL)::int) <> 0
+                ON CONFLICT (dimension, bucket) DO UPDATE SET
+                    grant_count = s.grant_count + EXCLUDED.grant_count,
+                    score_sum = s.score_sum + EXCLUDED.score_sum,
+                    score_count = s.score_count + EXCLUDED.score_count
+            $sql$, changes);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Transition tables need one trigger per event
+    op.execute("""
+        CREATE TRIGGER grant_stats_insert AFTER INSERT ON grants
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION grant_stats_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER grant_stats_update AFTER UPDATE ON grants
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION grant_stats_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER grant_stats_delete AFTER DELETE ON grants
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION grant_stats_apply()
+    """)
+
+    # Backfill from existing grants
+    op.execute(f"""
+        INSERT INTO grant_stats (dimension, bucket, grant_count, score_sum, score_count)
+        SELECT b.dimension, b.bucket, count(*),
+               coalesce(sum(c.overall_composite_score), 0),
+               count(c.overall_composite_score)
+        FROM grants c, {BUCKETS_SQL}
+        WHERE b.bucket IS NOT NULL
+        GROUP BY b.dimension, b.bucket
+    """)
+
+    print("✅ Added grant_stats aggregates with maintenance triggers")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS grant_stats_delete ON grants")
+    op.execute("DROP TRIGGER IF EXISTS grant_stats_update ON grants")
+    op.execute("DROP TRIGGER IF EXISTS grant_stats_insert ON grants")
+    op.execute("DROP FUNCTION IF EXISTS grant_stats_apply()")
+    op.execute("DROP TABLE IF EXISTS grant_stats")
+
+    print("✅ Removed grant_stats aggregates")
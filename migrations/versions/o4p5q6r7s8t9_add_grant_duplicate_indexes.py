@@ -0,0 +1,48 @@
+"""Add normalized title trigram index and source_url index for duplicate detection
+
+Revision ID: o4p5q6r7s8t9
+Revises: n3o4p5q6r7s8
+Create Date: 2026-10-16 00:00:00.000000
+
+This migration adds a stored generated title_normalized column (lowercased,
+punctuation collapsed to single spaces) with a pg_trgm GiST index, so the fuzzy
+duplicate check is a nearest-neighbour index probe (ORDER BY <-> LIMIT k)
+instead of an unanchored ILIKE scan compared in Python, and a btree index on
+source_url for the exact-URL check.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'o4p5q6r7s8t9'
+down_revision: Union[str, None] = 'n3o4p5q6r7s8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("""
+        ALTER TABLE grants ADD COLUMN title_normalized text
+        GENERATED ALWAYS AS (
+            btrim(regexp_replace(lower(coalesce(title, '')), '[^a-z0-9]+', ' ', 'g'))
+        ) STORED
+    """)
+    # GiST rather than GIN: only GiST supports the <-> distance ordering used for top-k lookups
+    op.execute("""
+        CREATE INDEX ix_grants_title_normalized_trgm
+        ON grants
+        USING gist (title_normalized gist_trgm_ops)
+    """)
+    op.execute("CREATE INDEX ix_grants_source_url ON grants (source_url)")
+
+    print("✅ Added grants.title_normalized trigram index and source_url index")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_grants_source_url")
+    op.execute("DROP INDEX IF EXISTS ix_grants_title_normalized_trgm")
+    op.execute("ALTER TABLE grants DROP COLUMN IF EXISTS title_normalized")
+
+    print("✅ Removed grant duplicate-detection indexes")
@@ -0,0 +1,75 @@
+"""Add grants.source_url_key with a per-user unique index
+
+Revision ID: p5q6r7s8t9u0
+Revises: o4p5q6r7s8t9
+Create Date: 2026-10-16 00:00:00.000000
+
+This migration adds source_url_key (sha256 of the normalized source URL) and a
+unique partial index on (source_url_key, coalesce(user_id, 0)), which grant
+writers use as their INSERT ... ON CONFLICT target. Existing rows are
+backfilled; when several rows already share a key only the oldest keeps it.
+The key index replaces ix_grants_source_url for duplicate lookups.
+"""
+import hashlib
+from typing import Sequence, Union
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'p5q6r7s8t9u0'
+down_revision: Union[str, None] = 'o4p5q6r7s8t9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _url_key(url):
+    # Frozen copy of app.duplicate_detection.grant_url_key at the time of this migration
+    url = (url or '').strip()
+    if not url.lower().startswith(('http://', 'https://')):
+        return None
+    parsed = urlparse(url.lower())
+    netloc = parsed.netloc[4:] if parsed.netloc.startswith('www.') else parsed.netloc
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.startswith('utm_')
+    ))
+    normalized = urlunparse((parsed.scheme, netloc, parsed.path.rstrip('/'), '', query, ''))
+    return hashlib.sha256(normalized.split('://', 1)[-1].encode('utf-8')).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column('grants', sa.Column('source_url_key', sa.String(length=64), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT id, user_id, source_url FROM grants WHERE source_url IS NOT NULL ORDER BY id"
+    ))
+    seen = set()
+    updates = []
+    for row in rows:
+        key = _url_key(row.source_url)
+        if key is None or (key, row.user_id or 0) in seen:
+            continue
+        seen.add((key, row.user_id or 0))
+        updates.append({"id": row.id, "key": key})
+    if updates:
+        conn.execute(sa.text("UPDATE grants SET source_url_key = :key WHERE id = :id"), updates)
+
+    op.execute("""
+        CREATE UNIQUE INDEX ux_grants_source_url_key
+        ON grants (source_url_key, coalesce(user_id, 0))
+        WHERE source_url_key IS NOT NULL
+    """)
+    op.execute("DROP INDEX IF EXISTS ix_grants_source_url")
+
+    print(f"✅ Added grants.source_url_key ({len(updates)} rows keyed) with unique index")
+
+
+def downgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_grants_source_url ON grants (source_url)")
+    op.execute("DROP INDEX IF EXISTS ux_grants_source_url_key")
+    op.drop_column('grants', 'source_url_key')
+
+    print("✅ Removed grants.source_url_key")
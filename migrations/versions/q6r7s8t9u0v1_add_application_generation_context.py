@@ -0,0 +1,33 @@
+"""Add generated_applications.generation_context
+
+Revision ID: q6r7s8t9u0v1
+Revises: p5q6r7s8t9u0
+Create Date: 2026-10-16 00:00:00.000000
+
+This migration adds generation_context, the RAG context an application was
+written from (retrieved context chunks and the business context built from
+them). Section regeneration and resumed generation reuse it instead of
+embedding the grant query and searching profile embeddings again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'q6r7s8t9u0v1'
+down_revision: Union[str, None] = 'p5q6r7s8t9u0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('generated_applications', sa.Column('generation_context', sa.JSON(), nullable=True))
+
+    print("✅ Added generated_applications.generation_context")
+
+
+def downgrade() -> None:
+    op.drop_column('generated_applications', 'generation_context')
+
+    print("✅ Removed generated_applications.generation_context")
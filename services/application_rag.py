@@ -4,7 +4,7 @@ Uses fastembed for real vector embeddings and pgvector for semantic retrieval.
 """
 
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -51,16 +51,20 @@ class ApplicationRAGService:
         db: AsyncSession,
         user_id: int,
         query: str,
-        top_k: int = 5
+        top_k: int = 5,
+        grant_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant business context for a grant application query
         using real semantic similarity via pgvector.
+
+        With grant_id, the grant's stored embeddings are used as the query
+        and query is only embedded if the grant has none.
         """
         try:
             from services.embedding_service import get_embedding_service
             svc = get_embedding_service()
-            chunks = await svc.retrieve_relevant_context(db, user_id, query, top_k)
+            chunks = await svc.retrieve_relevant_context(db, user_id, query, top_k, grant_id=grant_id)
 
             if not chunks:
                 # Fallback: return raw profile text chunks
@@ -0,0 +1,180 @@
+"""
+Live progress of application generation, relayed from Celery to SSE clients.
+
+In streaming mode the generator task publishes one event per token and per
+section milestone to a Redis pub/sub channel named after the user and task:
+
+    application    {"application_id"}              draft row holding the sections
+    section_started {"section", "attempt"}         (re)start: drop buffered tokens
+    token          {"section", "text"}
+    section_completed {"section", "content"}       also saved in the draft row
+    section_failed {"section", "error"}
+    retrying       {"error"}                       Celery will run the task again
+    completed      {"result"} / failed {"error"}   terminal
+
+Pub/sub keeps nothing for late subscribers, so every event except tokens is
+also appended to a short-lived replay list; the SSE endpoint subscribes first,
+then replays that list, and then forwards live events. A client that connects
+mid-section therefore gets every finished section plus the tokens from the
+moment it subscribed (section_completed always carries the full text).
+"""
+
+import asyncio
+import json
+import logging
+import time
+import weakref
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Optional
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+settings = Settings()
+
+CHANNEL_PREFIX = "appstream:v1:"
+REPLAY_SUFFIX = ":replay"
+TERMINAL_EVENTS = {"completed", "failed"}
+
+
+def stream_channel(user_id: int, task_id: str) -> str:
+    """Channel for one generation task; scoped by user so clients only see their own."""
+    return f"{CHANNEL_PREFIX}{user_id}:{task_id}"
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event as a server-sent event frame."""
+    data = {k: v for k, v in event.items() if k not in ("id", "event")}
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class ApplicationStream:
+    """Redis pub/sub relay between generator tasks and SSE endpoints."""
+
+    def __init__(self, redis_url: str, replay_ttl_seconds: int = 3600, heartbeat_seconds: float = 15.0):
+        self.redis_url = redis_url
+        self.replay_ttl_seconds = replay_ttl_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        # redis.asyncio clients are bound to the loop they connect on
+        self._redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+    def _get_redis(self):
+        if not self.redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._redis_clients.get(loop)
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                logger.warning("redis package not installed - application streaming disabled")
+                self.redis_url = None
+                return None
+            client = aioredis.from_url(self.redis_url, socket_timeout=5, socket_connect_timeout=2)
+            self._redis_clients[loop] = client
+        return client
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> bool:
+        """Publish one event (and keep non-token events for replay). False if Redis failed."""
+        client = self._get_redis()
+        if client is None:
+            return False
+        payload = json.dumps(event, default=str)
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                if event["event"] != "token":
+                    pipe.rpush(channel + REPLAY_SUFFIX, payload)
+                    pipe.expire(channel + REPLAY_SUFFIX, self.replay_ttl_seconds)
+                pipe.publish(channel, payload)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Application stream publish failed on {channel}: {str(e)}")
+            return False
+
+    async def subscribe(
+        self,
+        channel: str,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> AsyncGenerator[Optional[Dict[str, Any]], None]:
+        """Replayed then live events until a terminal one; yields None as a heartbeat."""
+        client = self._get_redis()
+        if client is None:
+            raise RuntimeError("Application streaming requires Redis")
+
+        pubsub = client.pubsub()
+        try:
+            # Subscribe before reading the replay list so nothing falls in between
+            await pubsub.subscribe(channel)
+            replayed = set()
+            for raw in await client.lrange(channel + REPLAY_SUFFIX, 0, -1):
+                event = json.loads(raw)
+                replayed.add(event["id"])
+                yield event
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+
+            last_sent = time.monotonic()
+            while True:
+                if is_disconnected is not None and await is_disconnected():
+                    return
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    if time.monotonic() - last_sent >= self.heartbeat_seconds:
+                        last_sent = time.monotonic()
+                        yield None
+                    continue
+                event = json.loads(message["data"])
+                if event["id"] in replayed:
+                    continue
+                last_sent = time.monotonic()
+                yield event
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            try:
+                await pubsub.unsubscribe(channel)
+                await pubsub.close()
+            except Exception as e:
+                logger.debug(f"Closing application stream subscription failed: {str(e)}")
+
+    def reset_connections(self) -> None:
+        """Forget Redis clients, e.g. after fork."""
+        self._redis_clients.clear()
+
+
+class StreamPublisher:
+    """Worker-side publisher for one task attempt; stops publishing after a Redis failure."""
+
+    def __init__(self, stream: ApplicationStream, channel: str, attempt: int = 0):
+        self.stream = stream
+        self.channel = channel
+        self.attempt = attempt
+        self.sent = 0
+        self.enabled = True
+
+    async def __call__(self, event: str, **data: Any) -> None:
+        if not self.enabled:
+            return
+        self.sent += 1
+        # Ids stay unique across Celery retries, which reuse the channel
+        payload = {"id": f"{self.attempt}.{self.sent}", "event": event, **data}
+        if not await self.stream.publish(self.channel, payload):
+            self.enabled = False
+
+
+# Singleton instance
+_application_stream = None
+
+
+def get_application_stream() -> Optional[ApplicationStream]:
+    """Get the shared stream relay, or None when streaming is disabled or Redis is not configured."""
+    global _application_stream
+    if not settings.APPLICATION_STREAMING_ENABLED or not settings.REDIS_URL:
+        return None
+    if _application_stream is None:
+        _application_stream = ApplicationStream(
+            redis_url=settings.REDIS_URL,
+            replay_ttl_seconds=settings.APPLICATION_STREAM_REPLAY_TTL_SECONDS,
+            heartbeat_seconds=settings.APPLICATION_STREAM_HEARTBEAT_SECONDS,
+        )
+    return _application_stream
@@ -0,0 +1,120 @@
+"""
+Dashboard aggregates read from the grant_stats summary table.
+
+grant_stats holds one row per (dimension, bucket) with grant counts and score
+sums. Triggers on grants keep it current (see migration n3o4p5q6r7s8) and
+rebuild_grant_stats() recomputes it on a Celery schedule to correct any drift,
+so /dashboard/stats and /analytics/distribution each read a few rows in one
+query regardless of how many grants exist.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Buckets each grant contributes to; keep in sync with the grant_stats migration
+BUCKETS_SQL = """
+    LATERAL (VALUES
+        ('all', ''),
+        ('created_month', to_char(c.created_at, 'YYYY-MM')),
+        ('deadline_day', to_char(c.deadline, 'YYYY-MM-DD')),
+        ('deadline_month', to_char(c.deadline, 'YYYY-MM')),
+        ('sector', c.identified_sector),
+        ('score_bucket', floor(c.overall_composite_score / 10.0)::int::text)
+    ) AS b(dimension, bucket)
+"""
+
+UPCOMING_DEADLINE_DAYS = 30
+
+
+async def read_stats(db: AsyncSession) -> Dict[str, Any]:
+    """DashboardStats payload from grant_stats (upcoming deadlines at day granularity)."""
+    now = datetime.now()
+    rows = await db.execute(
+        text("""
+            SELECT dimension, sum(grant_count) AS grant_count,
+                   sum(score_sum) AS score_sum, sum(score_count) AS score_count
+            FROM grant_stats
+            WHERE dimension = 'all'
+               OR (dimension = 'created_month' AND bucket = :month)
+               OR (dimension = 'deadline_day' AND bucket BETWEEN :today AND :horizon)
+            GROUP BY dimension
+        """),
+        {
+            "month": now.strftime("%Y-%m"),
+            "today": now.strftime("%Y-%m-%d"),
+            "horizon": (now + timedelta(days=UPCOMING_DEADLINE_DAYS)).strftime("%Y-%m-%d"),
+        },
+    )
+    by_dimension = {row.dimension: row for row in rows}
+
+    overall = by_dimension.get("all")
+    if overall is None:
+        raise LookupError("grant_stats is empty; run refresh_dashboard_aggregates")
+
+    score_count = int(overall.score_count or 0)
+    average_score = float(overall.score_sum) / score_count if score_count else 0.0
+    monthly = by_dimension.get("created_month")
+    upcoming = by_dimension.get("deadline_day")
+    return {
+        "totalGrants": int(overall.grant_count),
+        "averageScore": round(average_score, 2),
+        "grantsThisMonth": int(monthly.grant_count) if monthly else 0,
+        "upcomingDeadlines": int(upcoming.grant_count) if upcoming else 0,
+    }
+
+
+async def read_distribution(db: AsyncSession) -> Dict[str, List[Dict[str, Any]]]:
+    """DistributionData payload from grant_stats."""
+    rows = await db.execute(
+        text("""
+            SELECT dimension, bucket, grant_count
+            FROM grant_stats
+            WHERE dimension IN ('sector', 'deadline_month', 'score_bucket')
+              AND grant_count > 0
+        """)
+    )
+
+    categories, deadlines, scores = [], [], []
+    for row in rows:
+        if row.dimension == "sector":
+            categories.append({"name": row.bucket or "Uncategorized", "value": int(row.grant_count)})
+        elif row.dimension == "deadline_month":
+            deadlines.append({"name": row.bucket, "count": int(row.grant_count)})
+        else:
+            scores.append((int(row.bucket), int(row.grant_count)))
+
+    deadlines.sort(key=lambda item: item["name"])
+    return {
+        "categories": categories,
+        "deadlines": deadlines,
+        "scores": [
+            {"name": f"{start * 10}-{start * 10 + 9}", "count": count}
+            for start, count in sorted(scores)
+        ],
+    }
+
+
+async def rebuild_grant_stats(db: AsyncSession) -> int:
+    """Recompute grant_stats from grants in one transaction; returns the bucket count.
+
+    Grant writes wait on the table lock until the rebuild commits, so trigger
+    deltas can't interleave with the recount.
+    """
+    await db.execute(text("LOCK TABLE grant_stats IN EXCLUSIVE MODE"))
+    await db.execute(text("DELETE FROM grant_stats"))
+    result = await db.execute(text(f"""
+        INSERT INTO grant_stats (dimension, bucket, grant_count, score_sum, score_count)
+        SELECT b.dimension, b.bucket, count(*),
+               coalesce(sum(c.overall_composite_score), 0),
+               count(c.overall_composite_score)
+        FROM grants c, {BUCKETS_SQL}
+        WHERE b.bucket IS NOT NULL
+        GROUP BY b.dimension, b.bucket
+    """))
+    return result.rowcount
@@ -5,15 +5,89 @@ Replaces Perplexity and serves as primary AI provider.
 
 import logging
 import asyncio
+import copy
+import weakref
+from contextlib import AsyncExitStack
 from typing import List, Dict, Any, Optional, AsyncGenerator
 import httpx
 from datetime import datetime
 
 from config.settings import Settings
+from services.llm_cache import get_llm_cache, make_cache_key
+from services.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 settings = Settings()
 
+# Pooled HTTP transport. An httpx.AsyncClient is bound to the event loop it first
+# runs on, so we keep one client per loop: the FastAPI process shares a single
+# keep-alive pool, and each Celery task loop gets its own.
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+CONNECT_TIMEOUT_SECONDS = 10.0
+
+
+def _request_timeout(read_seconds: float) -> httpx.Timeout:
+    """Per-request timeout; a bare float would also stretch the connect timeout to read_seconds."""
+    return httpx.Timeout(read_seconds, connect=CONNECT_TIMEOUT_SECONDS)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the pooled DeepSeek HTTP client for the running event loop.
+
+    Connections are kept alive between calls, so chunked searches and
+    application generation skip the TCP+TLS handshake after the first request.
+    """
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        use_http2 = settings.DEEPSEEK_HTTP2 and _http2_available()
+        if settings.DEEPSEEK_HTTP2 and not use_http2:
+            logger.warning("h2 not installed - DeepSeek transport falling back to HTTP/1.1")
+        client = httpx.AsyncClient(
+            http2=use_http2,
+            timeout=_request_timeout(60.0),
+            limits=httpx.Limits(
+                max_connections=settings.DEEPSEEK_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DEEPSEEK_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.DEEPSEEK_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _http_clients[loop] = client
+        logger.info(
+            f"Created pooled DeepSeek HTTP client (http2={use_http2}, "
+            f"max_connections={settings.DEEPSEEK_MAX_CONNECTIONS})"
+        )
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the pooled client for the running event loop (app/worker shutdown)."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("Closed pooled DeepSeek HTTP client")
+
+
+def reset_http_clients() -> None:
+    """
+    Forget all pooled clients without awaiting them.
+
+    Used after fork (a child must never reuse the parent's sockets) and on worker
+    shutdown, when the loops owning the clients may already be closed.
+    """
+    _http_clients.clear()
+
 
 class DeepSeekClient:
     """
@@ -42,6 +116,34 @@ class DeepSeekClient:
         self.default_model = "deepseek-chat"  # Main reasoning model
         self.embedding_model = "deepseek-embeddings-v1"  # For embeddings
 
+    async def _post(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        timeout: httpx.Timeout
+    ) -> httpx.Response:
+        """
+        POST through the shared rate limiter on the pooled client.
+
+        429 responses are retried up to DEEPSEEK_MAX_RETRIES times; the limiter
+        holds every caller back for the Retry-After period before the next try.
+
+        Raises:
+            httpx.HTTPStatusError: On non-2xx responses once retries are exhausted
+        """
+        client = get_http_client()
+        limiter = get_rate_limiter()
+        for attempt in range(settings.DEEPSEEK_MAX_RETRIES + 1):
+            async with limiter.acquire():
+                response = await client.post(url, json=payload, headers=headers, timeout=timeout)
+            retry_after = await limiter.observe(response)
+            if retry_after is None or attempt == settings.DEEPSEEK_MAX_RETRIES:
+                break
+            logger.info(f"Retrying DeepSeek request after 429 (attempt {attempt + 1})")
+        response.raise_for_status()
+        return response
+
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -49,17 +151,22 @@ class DeepSeekClient:
         temperature: float = 0.7,
         max_tokens: int = 2000,
         stream: bool = False,
+        use_cache: bool = True,
         **kwargs
     ) -> Dict[str, Any]:
         """
         Send chat completion request to DeepSeek.
 
+        Identical requests are served from the LLM response cache unless
+        `use_cache` is False (e.g. when the caller wants a fresh sample).
+
         Args:
             messages: List of message dicts with 'role' and 'content'
             model: Model to use (defaults to deepseek-chat)
             temperature: Sampling temperature (0-2)
             max_tokens: Maximum tokens to generate
             stream: Whether to stream the response
+            use_cache: Read/write the response cache for this call
             **kwargs: Additional API parameters
 
         Returns:
@@ -84,19 +191,24 @@ class DeepSeekClient:
             "Content-Type": "application/json"
         }
 
+        cache = get_llm_cache() if use_cache and not stream else None
+        cache_key = make_cache_key(payload) if cache else None
+        if cache:
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"DeepSeek chat completion served from cache: {cached.get('usage', {})}")
+                return copy.deepcopy(cached)
+
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.chat_endpoint,
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
+            response = await self._post(self.chat_endpoint, payload, headers, timeout=_request_timeout(60.0))
 
-                result = response.json()
-                logger.info(f"DeepSeek chat completion: {result.get('usage', {})}")
+            result = response.json()
+            logger.info(f"DeepSeek chat completion: {result.get('usage', {})}")
 
-                return result
+            if cache:
+                await cache.set(cache_key, copy.deepcopy(result))
+
+            return result
 
         except httpx.HTTPStatusError as e:
             logger.error(f"DeepSeek API error: {e.response.status_code} - {e.response.text}")
@@ -143,8 +255,20 @@ class DeepSeekClient:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                async with client.stream("POST", self.chat_endpoint, json=payload, headers=headers) as response:
+            client = get_http_client()
+            limiter = get_rate_limiter()
+            for attempt in range(settings.DEEPSEEK_MAX_RETRIES + 1):
+                async with AsyncExitStack() as stack:
+                    # The concurrency slot covers the request up to the response
+                    # headers; holding it while tokens trickle out would starve
+                    # every other DeepSeek call in the process
+                    async with limiter.acquire():
+                        response = await stack.enter_async_context(client.stream(
+                            "POST", self.chat_endpoint, json=payload, headers=headers, timeout=_request_timeout(120.0)
+                        ))
+                        retry_after = await limiter.observe(response)
+                    if retry_after is not None and attempt < settings.DEEPSEEK_MAX_RETRIES:
+                        continue
                     response.raise_for_status()
 
                     async for line in response.aiter_lines():
@@ -162,6 +286,7 @@ class DeepSeekClient:
                                         yield delta["content"]
                             except json.JSONDecodeError:
                                 continue
+                    return
 
         except Exception as e:
             logger.error(f"DeepSeek streaming error: {str(e)}")
@@ -281,19 +406,13 @@ class DeepSeekClient:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.embeddings_endpoint,
-                    json=payload,
-                    headers=headers
-                )
-                response.raise_for_status()
-
-                result = response.json()
-                embeddings = [item["embedding"] for item in result["data"]]
-
-                logger.info(f"Generated {len(embeddings)} embeddings")
-                return embeddings
+            response = await self._post(self.embeddings_endpoint, payload, headers, timeout=_request_timeout(60.0))
+
+            result = response.json()
+            embeddings = [item["embedding"] for item in result["data"]]
+
+            logger.info(f"Generated {len(embeddings)} embeddings")
+            return embeddings
 
         except httpx.HTTPStatusError as e:
             logger.error(f"DeepSeek embeddings error: {e.response.status_code}")
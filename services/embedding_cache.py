@@ -0,0 +1,136 @@
+"""
+Content-addressed embedding cache.
+
+Vectors are keyed by sha256(model name + chunk text), so any chunk produced by
+_chunk_text that has been embedded before - for any grant or profile - is
+reused instead of re-inferred. Tiers:
+- Postgres embedding_cache table (shared by the API and all workers)
+- Optional local disk tier of memory-mapped .npy files (EMBEDDING_CACHE_DIR)
+"""
+
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import EmbeddingCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(model_name: str, text: str) -> str:
+    """Cache key for a chunk of text embedded with a given model."""
+    return hashlib.sha256(f"{model_name}\n{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Postgres-backed embedding cache with an optional memory-mapped disk tier."""
+
+    def __init__(self, model_name: str, disk_dir: Optional[str] = None):
+        self.model_name = model_name
+        self.disk_dir = disk_dir
+        if disk_dir:
+            try:
+                os.makedirs(disk_dir, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Embedding disk cache unavailable at {disk_dir}: {e}")
+                self.disk_dir = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def hash(self, text: str) -> str:
+        return content_hash(self.model_name, text)
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.npy")
+
+    def _disk_get(self, key: str) -> Optional[np.ndarray]:
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, mmap_mode="r")
+        except Exception as e:
+            logger.debug(f"Unreadable embedding cache file {path}: {e}")
+            return None
+
+    def _disk_put(self, key: str, vector: Sequence[float]) -> None:
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.asarray(vector, dtype=np.float32))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Failed to write embedding cache file {path}: {e}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get_many(self, db: AsyncSession, keys: Sequence[str]) -> Dict[str, Sequence[float]]:
+        """Look up cached vectors for the given hashes (disk first, then Postgres)."""
+        found: Dict[str, Sequence[float]] = {}
+        wanted = list(dict.fromkeys(keys))
+
+        if self.disk_dir:
+            for key in wanted:
+                vector = self._disk_get(key)
+                if vector is not None:
+                    found[key] = vector
+                    self.disk_hits += 1
+
+        remaining = [k for k in wanted if k not in found]
+        if remaining:
+            try:
+                # Savepoint: a failed lookup must not abort the caller's transaction
+                async with db.begin_nested():
+                    rows = (await db.execute(
+                        select(EmbeddingCacheEntry.content_hash, EmbeddingCacheEntry.embedding)
+                        .where(EmbeddingCacheEntry.content_hash.in_(remaining))
+                    )).all()
+                for key, vector in rows:
+                    found[key] = vector
+                    if self.disk_dir:
+                        self._disk_put(key, vector)
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed: {e}")
+
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        return found
+
+    async def put_many(self, db: AsyncSession, vectors: Dict[str, Sequence[float]]) -> None:
+        """Store freshly inferred vectors; concurrent writers of the same hash are ignored."""
+        if not vectors:
+            return
+        if self.disk_dir:
+            for key, vector in vectors.items():
+                self._disk_put(key, vector)
+        try:
+            async with db.begin_nested():
+                await db.execute(
+                    pg_insert(EmbeddingCacheEntry)
+                    .values([
+                        {"content_hash": key, "model": self.model_name, "embedding": vector}
+                        for key, vector in vectors.items()
+                    ])
+                    .on_conflict_do_nothing(index_elements=["content_hash"])
+                )
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
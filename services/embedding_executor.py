@@ -0,0 +1,138 @@
+"""
+Micro-batching executor for embedding inference.
+
+Async callers submit texts and await a future; worker threads collect requests
+from concurrent callers into one batch (up to max_batch_size texts or
+max_wait_ms), run the ONNX model off the event loop, and resolve each caller's
+future with its slice of the vectors.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[List[str]], Optional[List[List[float]]]]
+
+_STOP = object()
+
+
+class EmbeddingExecutor:
+    """Batches embedding requests across callers and runs them in worker threads."""
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 10.0,
+        workers: int = 1,
+    ):
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.workers = workers
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+        self.batches = 0
+        self.texts_embedded = 0
+        self.requests = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Threads don't survive fork; start fresh in the child
+                self._queue = queue.Queue()
+                self._threads = []
+                self._pid = os.getpid()
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"embedding-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, texts: List[str]) -> "concurrent.futures.Future":
+        """Queue texts for embedding; the future resolves to vectors (or None if the model is unavailable)."""
+        self._ensure_started()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._queue.put((texts, future))
+        self.requests += 1
+        return future
+
+    async def embed(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Embed texts without blocking the event loop."""
+        if not texts:
+            return []
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _collect_batch(self, first) -> List[Tuple[List[str], "concurrent.futures.Future"]]:
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = self._collect_batch(item)
+            texts = [text for request_texts, _ in batch for text in request_texts]
+
+            try:
+                vectors = self.embed_fn(texts)
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(texts)} texts failed: {e}")
+                vectors = None
+
+            self.batches += 1
+            self.texts_embedded += len(texts)
+
+            offset = 0
+            for request_texts, future in batch:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(
+                        None if vectors is None else vectors[offset:offset + len(request_texts)]
+                    )
+                offset += len(request_texts)
+
+    def shutdown(self) -> None:
+        """Stop worker threads after they drain queued requests."""
+        with self._lock:
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            self._threads = []
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts_embedded": self.texts_embedded,
+            "avg_batch_size": round(self.texts_embedded / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "workers": self.workers,
+        }
@@ -4,42 +4,92 @@ Generates 384-dim vectors via BAAI/bge-small-en-v1.5 and stores them in pgvector
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import math
+import threading
+import time
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
 import numpy as np
-from sqlalchemy import select, delete, text
+from sqlalchemy import bindparam, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from config.settings import Settings
 from database.models import GrantEmbedding, ProfileEmbedding, BusinessProfile
+from database.vector import Vector
+from services.embedding_cache import EmbeddingCache
+from services.embedding_executor import EmbeddingExecutor
 
 logger = logging.getLogger(__name__)
+settings = Settings()
 
-# Lazy-loaded fastembed model (downloads ~50MB on first use)
+# fastembed model, loaded by warm_up_model() at startup or lazily on first use
+# (downloads ~50MB unless EMBEDDING_MODEL_CACHE_DIR already holds it)
 _embedding_model = None
 _model_load_failed = False
+_model_lock = threading.Lock()
+_model_status: Dict[str, Any] = {"state": "not_loaded", "error": None, "load_seconds": None, "loaded_at": None}
 
+EMBEDDING_MODEL_NAME = "BAAI/bge-small-en-v1.5"
 EMBEDDING_DIM = 384
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 50
 
 
 def _get_model():
-    """Lazy-load the fastembed model."""
+    """Lazy-load the fastembed model (thread-safe; concurrent callers wait for one load)."""
     global _embedding_model, _model_load_failed
-    if _model_load_failed:
-        return None
-    if _embedding_model is None:
-        try:
-            from fastembed import TextEmbedding
-            _embedding_model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")
-            logger.info("Loaded fastembed model BAAI/bge-small-en-v1.5 (384-dim)")
-        except Exception as e:
-            _model_load_failed = True
-            logger.error(f"Failed to load fastembed model: {e}. Falling back to neutral scores.")
-            return None
+    if _embedding_model is not None or _model_load_failed:
+        return _embedding_model
+    with _model_lock:
+        if _embedding_model is None and not _model_load_failed:
+            _model_status["state"] = "loading"
+            start = time.monotonic()
+            try:
+                from fastembed import TextEmbedding
+                kwargs = {"model_name": EMBEDDING_MODEL_NAME}
+                if settings.EMBEDDING_MODEL_CACHE_DIR:
+                    kwargs["cache_dir"] = settings.EMBEDDING_MODEL_CACHE_DIR
+                _embedding_model = TextEmbedding(**kwargs)
+                _model_status["load_seconds"] = round(time.monotonic() - start, 2)
+                logger.info(
+                    f"Loaded fastembed model {EMBEDDING_MODEL_NAME} (384-dim) "
+                    f"in {_model_status['load_seconds']}s"
+                )
+            except Exception as e:
+                _model_load_failed = True
+                _model_status.update(state="failed", error=str(e))
+                logger.error(f"Failed to load fastembed model: {e}. Falling back to neutral scores.")
     return _embedding_model
 
 
+def warm_up_model() -> bool:
+    """
+    Load the model and run one inference so the ONNX session is fully initialised.
+    Blocking - call from a thread (app startup) or before forking (Celery).
+    """
+    if _model_status["state"] == "ready":
+        return True
+    model = _get_model()
+    if model is None:
+        return False
+    try:
+        list(model.embed(["warm-up"]))
+    except Exception as e:
+        _model_status.update(state="failed", error=str(e))
+        logger.error(f"Embedding model warm-up failed: {e}")
+        return False
+    from datetime import datetime
+    _model_status.update(state="ready", loaded_at=datetime.utcnow().isoformat())
+    logger.info("Embedding model warmed up and ready")
+    return True
+
+
+def get_model_status() -> Dict[str, Any]:
+    """Model load state for readiness checks: not_loaded | loading | ready | failed."""
+    return {"model": EMBEDDING_MODEL_NAME, **_model_status}
+
+
 def _chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
     """Split text into overlapping chunks at sentence boundaries."""
     if not text or len(text.strip()) == 0:
@@ -66,8 +116,23 @@ def _chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OV
 class EmbeddingService:
     """Central embedding service wrapping fastembed + pgvector storage."""
 
-    def generate_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
-        """Generate 384-dim embeddings for a list of texts.
+    def __init__(self):
+        # Inference runs in worker threads, micro-batched across concurrent callers
+        self.executor = EmbeddingExecutor(
+            self.generate_embeddings,
+            max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+            max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+            workers=settings.EMBEDDING_WORKERS,
+        )
+        # Content-hash cache: unchanged chunks reuse their vectors
+        self.cache = EmbeddingCache(EMBEDDING_MODEL_NAME, disk_dir=settings.EMBEDDING_CACHE_DIR or None)
+
+    async def agenerate_embeddings(self, texts: List[str]) -> Optional[List[np.ndarray]]:
+        """Async, batched version of generate_embeddings that keeps the event loop free."""
+        return await self.executor.embed(texts)
+
+    def generate_embeddings(self, texts: List[str]) -> Optional[List[np.ndarray]]:
+        """Generate 384-dim float32 embeddings for a list of texts (blocking).
         Returns None if fastembed is unavailable.
         """
         if not texts:
@@ -77,41 +142,216 @@ class EmbeddingService:
             return None
         try:
             embeddings = list(model.embed(texts))
-            return [e.tolist() if isinstance(e, np.ndarray) else list(e) for e in embeddings]
+            # Kept as float32 arrays: the asyncpg codec sends them to pgvector as binary
+            return [np.asarray(e, dtype=np.float32) for e in embeddings]
         except Exception as e:
             logger.error(f"Embedding generation failed: {e}")
             return None
 
+    async def _resolve_vectors(
+        self, db: AsyncSession, chunks: List[str], hashes: List[str]
+    ) -> Optional[List[Any]]:
+        """Vectors for chunks: cached by content hash where possible, inferred otherwise."""
+        vectors = await self.cache.get_many(db, hashes)
+        missing = [i for i, h in enumerate(hashes) if h not in vectors]
+        if missing:
+            fresh = await self.agenerate_embeddings([chunks[i] for i in missing])
+            if fresh is None:
+                return None
+            fresh_by_hash = {hashes[i]: vec for i, vec in zip(missing, fresh)}
+            await self.cache.put_many(db, fresh_by_hash)
+            vectors.update(fresh_by_hash)
+        return [vectors[h] for h in hashes]
+
+    async def _sync_chunk_rows(
+        self, db: AsyncSession, model, owner_filter: List[Any], owner_fields: Dict[str, Any], chunks: List[str]
+    ) -> Optional[Dict[str, int]]:
+        """Diff chunks against stored embedding rows; only changed chunks are re-embedded and rewritten.
+        Returns None if vectors were needed but the model is unavailable.
+        """
+        rows = await db.execute(select(model).options(defer(model.embedding)).where(*owner_filter))
+        plan = self._plan_chunk_sync(list(rows.scalars()), chunks)
+
+        if plan["changed"]:
+            vectors = await self._resolve_vectors(
+                db, [chunks[i] for i in plan["changed"]], [plan["hashes"][i] for i in plan["changed"]]
+            )
+            if vectors is None:
+                return None
+            self._apply_chunk_sync(db, model, owner_fields, chunks, plan, vectors)
+
+        for row in plan["stale"]:
+            await db.delete(row)
+        await db.flush()
+        return {
+            "written": len(plan["changed"]),
+            "unchanged": len(chunks) - len(plan["changed"]),
+            "deleted": len(plan["stale"]),
+        }
+
+    def _plan_chunk_sync(self, rows: List[Any], chunks: List[str]) -> Dict[str, Any]:
+        """Match stored chunk rows to chunks: which indexes changed and which rows are stale."""
+        existing = {}
+        stale = []
+        for row in rows:
+            if row.chunk_index in existing or row.chunk_index >= len(chunks):
+                stale.append(row)
+            else:
+                existing[row.chunk_index] = row
+
+        hashes = [self.cache.hash(chunk) for chunk in chunks]
+        changed = [
+            i for i, h in enumerate(hashes)
+            if i not in existing or existing[i].content_hash != h
+        ]
+        return {"existing": existing, "stale": stale, "hashes": hashes, "changed": changed}
+
+    def _apply_chunk_sync(
+        self, db: AsyncSession, model, owner_fields: Dict[str, Any], chunks: List[str],
+        plan: Dict[str, Any], vectors: List[Any]
+    ) -> None:
+        """Write vectors for the changed chunks of one owner (new rows or in-place updates)."""
+        for i, vec in zip(plan["changed"], vectors):
+            row = plan["existing"].get(i)
+            if row is None:
+                db.add(model(
+                    **owner_fields,
+                    embedding=vec,
+                    text_content=chunks[i],
+                    content_hash=plan["hashes"][i],
+                    chunk_index=i,
+                ))
+            else:
+                row.embedding = vec
+                row.text_content = chunks[i]
+                row.content_hash = plan["hashes"][i]
+
+    async def _refresh_centroid(
+        self,
+        db: AsyncSession,
+        table: str,
+        owner_where: str,
+        centroid_sql: str,
+        params: Dict[str, Any],
+        changed: bool,
+    ) -> None:
+        """Store the mean chunk vector on the owner row so scoring never re-averages.
+
+        Skipped when no chunk changed and a centroid is already stored.
+        """
+        where = owner_where if changed else f"{owner_where} AND embedding_centroid IS NULL"
+        try:
+            async with db.begin_nested():
+                await db.execute(
+                    text(f"UPDATE {table} SET embedding_centroid = ({centroid_sql}) WHERE {where}"),
+                    params,
+                )
+        except Exception as e:
+            logger.warning(f"Failed to refresh {table} centroid for {params}: {e}")
+
     async def embed_grant(
         self, db: AsyncSession, grant_id: int, title: str, description: str
     ) -> bool:
-        """Generate and store embeddings for a grant."""
+        """Generate and store embeddings for a grant (unchanged chunks are left as-is)."""
         text = f"{title}\n\n{description}" if description else title
         chunks = _chunk_text(text)
         if not chunks:
             return False
 
-        vectors = self.generate_embeddings(chunks)
-        if vectors is None:
+        counts = await self._sync_chunk_rows(
+            db,
+            GrantEmbedding,
+            [GrantEmbedding.grant_id == grant_id],
+            {"grant_id": grant_id},
+            chunks,
+        )
+        if counts is None:
             logger.warning(f"Skipping grant {grant_id} embedding (model unavailable)")
             return False
 
-        # Delete old embeddings for this grant
-        await db.execute(
-            delete(GrantEmbedding).where(GrantEmbedding.grant_id == grant_id)
+        await self._refresh_centroid(
+            db,
+            "grants",
+            "id = :owner_id",
+            "SELECT avg(embedding) FROM grant_embeddings WHERE grant_id = :owner_id",
+            {"owner_id": grant_id},
+            changed=bool(counts["written"] or counts["deleted"]),
         )
 
-        for idx, (chunk, vec) in enumerate(zip(chunks, vectors)):
-            db.add(GrantEmbedding(
-                grant_id=grant_id,
-                embedding=vec,
-                text_content=chunk,
-                chunk_index=idx,
-            ))
-        await db.flush()
-        logger.info(f"Stored {len(vectors)} embeddings for grant {grant_id}")
+        logger.info(
+            f"Embeddings for grant {grant_id}: {counts['written']} written, "
+            f"{counts['unchanged']} unchanged, {counts['deleted']} removed"
+        )
         return True
 
+    async def embed_grants(
+        self, db: AsyncSession, grants: Sequence[Tuple[int, str, str]]
+    ) -> int:
+        """Embed many grants at once: one chunk query, one model batch, one flush.
+
+        grants holds (grant_id, title, description) tuples. Returns how many
+        grants have up-to-date embeddings (0 if the model is unavailable).
+        """
+        chunks_by_grant = {}
+        for grant_id, title, description in grants:
+            chunks = _chunk_text(f"{title}\n\n{description}" if description else title)
+            if chunks:
+                chunks_by_grant[grant_id] = chunks
+        if not chunks_by_grant:
+            return 0
+
+        rows = await db.execute(
+            select(GrantEmbedding)
+            .options(defer(GrantEmbedding.embedding))
+            .where(GrantEmbedding.grant_id.in_(list(chunks_by_grant)))
+        )
+        rows_by_grant: Dict[int, List[Any]] = {}
+        for row in rows.scalars():
+            rows_by_grant.setdefault(row.grant_id, []).append(row)
+
+        plans = {
+            grant_id: self._plan_chunk_sync(rows_by_grant.get(grant_id, []), chunks)
+            for grant_id, chunks in chunks_by_grant.items()
+        }
+        pending = [
+            (grant_id, i) for grant_id, plan in plans.items() for i in plan["changed"]
+        ]
+        if pending:
+            vectors = await self._resolve_vectors(
+                db,
+                [chunks_by_grant[grant_id][i] for grant_id, i in pending],
+                [plans[grant_id]["hashes"][i] for grant_id, i in pending],
+            )
+            if vectors is None:
+                logger.warning(f"Skipping embeddings for {len(plans)} grants (model unavailable)")
+                return 0
+            offset = 0
+            for grant_id, plan in plans.items():
+                count = len(plan["changed"])
+                self._apply_chunk_sync(
+                    db, GrantEmbedding, {"grant_id": grant_id}, chunks_by_grant[grant_id],
+                    plan, vectors[offset:offset + count],
+                )
+                offset += count
+
+        for plan in plans.values():
+            for row in plan["stale"]:
+                await db.delete(row)
+        await db.flush()
+
+        changed_ids = [grant_id for grant_id, plan in plans.items() if plan["changed"] or plan["stale"]]
+        if changed_ids:
+            await self._refresh_centroid(
+                db,
+                "grants",
+                "id = ANY(:owner_ids)",
+                "SELECT avg(embedding) FROM grant_embeddings WHERE grant_id = grants.id",
+                {"owner_ids": changed_ids},
+                changed=True,
+            )
+        logger.info(f"Embeddings for {len(plans)} grants: {len(pending)} chunks written")
+        return len(plans)
+
     async def embed_business_profile(
         self, db: AsyncSession, user_id: int, business_profile_id: int
     ) -> Dict[str, Any]:
@@ -128,38 +368,43 @@ class EmbeddingService:
         if not chunks:
             return {"success": False, "error": "No text content to embed"}
 
-        vectors = self.generate_embeddings(chunks)
-        if vectors is None:
-            logger.warning(f"Skipping profile embedding for user {user_id} (model unavailable)")
-            return {"success": False, "error": "Embedding model unavailable"}
-
-        # Delete old profile embeddings
-        await db.execute(
-            delete(ProfileEmbedding).where(
+        counts = await self._sync_chunk_rows(
+            db,
+            ProfileEmbedding,
+            [
                 ProfileEmbedding.user_id == user_id,
                 ProfileEmbedding.business_profile_id == business_profile_id,
-            )
+            ],
+            {"user_id": user_id, "business_profile_id": business_profile_id},
+            chunks,
         )
-
-        for idx, (chunk, vec) in enumerate(zip(chunks, vectors)):
-            db.add(ProfileEmbedding(
-                user_id=user_id,
-                business_profile_id=business_profile_id,
-                embedding=vec,
-                text_content=chunk,
-                chunk_index=idx,
-            ))
+        if counts is None:
+            logger.warning(f"Skipping profile embedding for user {user_id} (model unavailable)")
+            return {"success": False, "error": "Embedding model unavailable"}
 
         profile.vector_embeddings_id = f"pg_user_{user_id}"
         from datetime import datetime
         profile.embeddings_generated_at = datetime.utcnow()
 
         await db.flush()
-        logger.info(f"Stored {len(vectors)} profile embeddings for user {user_id}")
+        await self._refresh_centroid(
+            db,
+            "business_profiles",
+            "id = :owner_id",
+            "SELECT avg(embedding) FROM profile_embeddings "
+            "WHERE user_id = :user_id AND business_profile_id = :owner_id",
+            {"owner_id": business_profile_id, "user_id": user_id},
+            changed=bool(counts["written"] or counts["deleted"]),
+        )
+        logger.info(
+            f"Profile embeddings for user {user_id}: {counts['written']} written, "
+            f"{counts['unchanged']} unchanged, {counts['deleted']} removed"
+        )
         return {
             "success": True,
             "chunks_created": len(chunks),
-            "embeddings_stored": len(vectors),
+            "embeddings_stored": counts["written"],
+            "embeddings_unchanged": counts["unchanged"],
         }
 
     async def find_similar_grants(
@@ -170,20 +415,18 @@ class EmbeddingService:
         top_k: int = 10,
     ) -> List[Dict[str, Any]]:
         """Find grants most similar to query_embedding using pgvector cosine distance."""
-        vec_str = "[" + ",".join(str(v) for v in query_embedding) + "]"
-
         sql = text(f"""
             SELECT ge.grant_id, ge.text_content, ge.chunk_index,
-                   1 - (ge.embedding <=> :qvec::vector) AS similarity
+                   1 - (ge.embedding <=> :qvec) AS similarity
             FROM grant_embeddings ge
             JOIN grants g ON g.id = ge.grant_id
             WHERE g.record_status = 'ACTIVE'
             {"AND g.user_id = :uid" if user_id else ""}
-            ORDER BY ge.embedding <=> :qvec::vector
+            ORDER BY ge.embedding <=> :qvec
             LIMIT :topk
-        """)
+        """).bindparams(bindparam("qvec", type_=Vector(EMBEDDING_DIM)))
 
-        params = {"qvec": vec_str, "topk": top_k}
+        params = {"qvec": np.asarray(query_embedding, dtype=np.float32), "topk": top_k}
         if user_id:
             params["uid"] = user_id
 
@@ -198,46 +441,107 @@ class EmbeddingService:
             })
         return results
 
+    async def score_grants_for_user(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        grant_ids: Optional[List[int]] = None,
+        top_k: Optional[int] = None,
+    ) -> Dict[int, float]:
+        """Score many grants against a user's business profile in one query.
+
+        Uses the stored centroids (falling back to averaging chunks in SQL for rows
+        embedded before centroids existed). With grant_ids, every requested grant
+        gets a score (0.5 when embeddings are unavailable); without, the user's
+        active grants are ranked. Either way top_k keeps only the best top_k,
+        best first. Scores are cosine similarity mapped to 0.0-1.0.
+        """
+        if grant_ids is not None and not grant_ids:
+            return {}
+
+        if grant_ids is not None:
+            grant_where = "g.id IN :ids"
+        else:
+            grant_where = "g.user_id = :uid AND g.record_status = 'ACTIVE'"
+
+        sql = text(f"""
+            WITH profile AS (
+                SELECT COALESCE(
+                    bp.embedding_centroid,
+                    (SELECT avg(pe.embedding) FROM profile_embeddings pe WHERE pe.user_id = bp.user_id)
+                ) AS centroid
+                FROM business_profiles bp
+                WHERE bp.user_id = :uid
+            ),
+            scored AS (
+                SELECT g.id AS grant_id,
+                       COALESCE(
+                           g.embedding_centroid,
+                           (SELECT avg(ge.embedding) FROM grant_embeddings ge WHERE ge.grant_id = g.id)
+                       ) <=> profile.centroid AS distance
+                FROM grants g
+                CROSS JOIN profile
+                WHERE profile.centroid IS NOT NULL
+                  AND {grant_where}
+            )
+            SELECT grant_id, 1 - distance AS similarity
+            FROM scored
+            {"" if grant_ids is not None else "WHERE distance IS NOT NULL"}
+            ORDER BY distance NULLS LAST
+            {"LIMIT :topk" if top_k else ""}
+        """)
+
+        params: Dict[str, Any] = {"uid": user_id}
+        if grant_ids is not None:
+            sql = sql.bindparams(bindparam("ids", expanding=True))
+            params["ids"] = list(grant_ids)
+        if top_k:
+            params["topk"] = top_k
+
+        scores: Dict[int, float] = {}
+        for row in await db.execute(sql, params):
+            similarity = row.similarity
+            if similarity is None or math.isnan(similarity):
+                scores[row.grant_id] = 0.5  # Zero vector or no chunks: neutral
+            else:
+                # Clamp to 0-1 range
+                scores[row.grant_id] = max(0.0, min(1.0, (float(similarity) + 1) / 2))
+
+        if grant_ids is not None and not top_k:
+            for grant_id in grant_ids:
+                scores.setdefault(grant_id, 0.5)  # Neutral fallback
+        return scores
+
     async def score_grant_relevance(
         self, db: AsyncSession, grant_id: int, user_id: int
     ) -> float:
         """Compute similarity between a grant and a user's business profile.
         Returns 0.0-1.0 score. Falls back to 0.5 if embeddings unavailable.
         """
-        # Get grant embedding (average of chunks)
-        grant_rows = await db.execute(
-            select(GrantEmbedding.embedding).where(GrantEmbedding.grant_id == grant_id)
-        )
-        grant_vecs = [row[0] for row in grant_rows]
-
-        # Get profile embeddings
-        profile_rows = await db.execute(
-            select(ProfileEmbedding.embedding).where(ProfileEmbedding.user_id == user_id)
-        )
-        profile_vecs = [row[0] for row in profile_rows]
-
-        if not grant_vecs or not profile_vecs:
-            return 0.5  # Neutral fallback
-
-        # Average vectors
-        grant_avg = np.mean([np.array(v) for v in grant_vecs], axis=0)
-        profile_avg = np.mean([np.array(v) for v in profile_vecs], axis=0)
-
-        # Cosine similarity
-        dot = np.dot(grant_avg, profile_avg)
-        norm = np.linalg.norm(grant_avg) * np.linalg.norm(profile_avg)
-        if norm == 0:
-            return 0.5
-
-        similarity = float(dot / norm)
-        # Clamp to 0-1 range
-        return max(0.0, min(1.0, (similarity + 1) / 2))
+        scores = await self.score_grants_for_user(db, user_id, [grant_id])
+        return scores.get(grant_id, 0.5)
 
     async def retrieve_relevant_context(
-        self, db: AsyncSession, user_id: int, query: str, top_k: int = 5
+        self,
+        db: AsyncSession,
+        user_id: int,
+        query: str,
+        top_k: int = 5,
+        grant_id: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        """RAG retrieval: find profile chunks most relevant to a query."""
-        query_vecs = self.generate_embeddings([query])
+        """RAG retrieval: find profile chunks most relevant to a query.
+
+        With grant_id, the grant's stored chunk vectors and centroid are the
+        query (see _retrieve_by_grant_vectors), so no inference runs; the query
+        text is embedded only when the grant has no stored vectors. Query text
+        embeddings go through the content-hash cache like chunk embeddings.
+        """
+        if grant_id is not None:
+            chunks = await self._retrieve_by_grant_vectors(db, user_id, grant_id, top_k)
+            if chunks is not None:
+                return chunks
+
+        query_vecs = await self._resolve_vectors(db, [query], [self.cache.hash(query)])
         if query_vecs is None or not query_vecs:
             # Fallback: return profile chunks ordered by index
             rows = await db.execute(
@@ -251,18 +555,60 @@ class EmbeddingService:
                 for r in rows.scalars()
             ]
 
-        qvec = query_vecs[0]
-        vec_str = "[" + ",".join(str(v) for v in qvec) + "]"
+        sql = text("""
+            SELECT pe.text_content, pe.chunk_index,
+                   1 - (pe.embedding <=> :qvec) AS similarity
+            FROM profile_embeddings pe
+            WHERE pe.user_id = :uid
+            ORDER BY pe.embedding <=> :qvec
+            LIMIT :topk
+        """).bindparams(bindparam("qvec", type_=Vector(EMBEDDING_DIM)))
+        qvec = np.asarray(query_vecs[0], dtype=np.float32)
+        rows = await db.execute(sql, {"qvec": qvec, "uid": user_id, "topk": top_k})
+        return [
+            {
+                "text": row.text_content,
+                "score": float(row.similarity),
+                "chunk_index": row.chunk_index,
+            }
+            for row in rows
+        ]
+
+    async def _retrieve_by_grant_vectors(
+        self, db: AsyncSession, user_id: int, grant_id: int, top_k: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Multi-vector retrieval using the grant's stored embeddings as queries.
 
+        Every grant chunk vector plus the centroid is a query; each profile chunk
+        scores its best (max-sim) match, so a profile chunk relevant to one part
+        of a long grant is not diluted by the rest. Returns None when the grant
+        has no stored vectors.
+        """
         sql = text("""
+            WITH q AS (
+                SELECT ge.embedding FROM grant_embeddings ge WHERE ge.grant_id = :gid
+                UNION ALL
+                SELECT g.embedding_centroid FROM grants g
+                WHERE g.id = :gid AND g.embedding_centroid IS NOT NULL
+            )
             SELECT pe.text_content, pe.chunk_index,
-                   1 - (pe.embedding <=> :qvec::vector) AS similarity
+                   max(1 - (pe.embedding <=> q.embedding)) AS similarity,
+                   (SELECT count(*) FROM q) AS query_vectors
             FROM profile_embeddings pe
+            CROSS JOIN q
             WHERE pe.user_id = :uid
-            ORDER BY pe.embedding <=> :qvec::vector
+            GROUP BY pe.id, pe.text_content, pe.chunk_index
+            ORDER BY similarity DESC
             LIMIT :topk
         """)
-        rows = await db.execute(sql, {"qvec": vec_str, "uid": user_id, "topk": top_k})
+        rows = (await db.execute(sql, {"gid": grant_id, "uid": user_id, "topk": top_k})).all()
+        if not rows:
+            has_vectors = await db.scalar(
+                select(GrantEmbedding.id).where(GrantEmbedding.grant_id == grant_id).limit(1)
+            )
+            return [] if has_vectors is not None else None
+
+        logger.info(f"Retrieved {len(rows)} profile chunks for grant {grant_id} from {rows[0].query_vectors} stored vectors")
         return [
             {
                 "text": row.text_content,
@@ -0,0 +1,96 @@
+"""
+Hybrid grant search: Postgres full-text + pgvector ANN, fused with reciprocal-rank fusion.
+
+Both retrievers are index-bound top-N queries (GIN on grants.search_vector,
+HNSW on grant_embeddings.embedding), so latency stays flat as the grants table
+grows. The fused candidate ids are then filtered/sorted/paged by the caller.
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import get_settings
+from database.vector import Vector
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> Dict[int, float]:
+    """Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank). Best first."""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, grant_id in enumerate(ranking, start=1):
+            scores[grant_id] = scores.get(grant_id, 0.0) + 1.0 / (k + rank)
+    return dict(sorted(scores.items(), key=lambda item: item[1], reverse=True))
+
+
+async def lexical_candidates(db: AsyncSession, query: str, limit: int) -> List[int]:
+    """Grant ids matching query in the GIN-indexed search_vector, best ts_rank first."""
+    rows = await db.execute(
+        text("""
+            SELECT g.id
+            FROM grants g, websearch_to_tsquery('english', :q) AS tsq
+            WHERE g.search_vector @@ tsq
+            ORDER BY ts_rank_cd(g.search_vector, tsq) DESC
+            LIMIT :lim
+        """),
+        {"q": query, "lim": limit},
+    )
+    return [row.id for row in rows]
+
+
+async def semantic_candidates(db: AsyncSession, query: str, limit: int) -> List[int]:
+    """Grant ids whose chunks are nearest to the query embedding (HNSW), closest first."""
+    from services.embedding_service import EMBEDDING_DIM, get_embedding_service
+
+    query_vecs = await get_embedding_service().agenerate_embeddings([query])
+    if not query_vecs:
+        return []
+
+    # ANN over chunks first so the HNSW index is used, then collapse to grants
+    sql = text("""
+        SELECT nn.grant_id
+        FROM (
+            SELECT ge.grant_id, ge.embedding <=> :qvec AS distance
+            FROM grant_embeddings ge
+            ORDER BY ge.embedding <=> :qvec
+            LIMIT :lim
+        ) nn
+        GROUP BY nn.grant_id
+        ORDER BY min(nn.distance)
+    """).bindparams(bindparam("qvec", type_=Vector(EMBEDDING_DIM)))
+    rows = await db.execute(sql, {"qvec": np.asarray(query_vecs[0], dtype=np.float32), "lim": limit})
+    return [row.grant_id for row in rows]
+
+
+async def hybrid_grant_candidates(
+    db: AsyncSession, query: str, limit: Optional[int] = None
+) -> Optional[Dict[int, float]]:
+    """Fused {grant_id: rrf_score} for a text query, best first.
+
+    Returns None when full-text search is unavailable (search_vector not migrated),
+    so the caller can fall back to ILIKE. Vector retrieval failing only drops
+    the semantic half.
+    """
+    limit = limit or settings.HYBRID_SEARCH_CANDIDATES
+    try:
+        async with db.begin_nested():
+            lexical = await lexical_candidates(db, query, limit)
+    except Exception as e:
+        logger.warning(f"Full-text grant search unavailable, falling back to ILIKE: {e}")
+        return None
+
+    try:
+        async with db.begin_nested():
+            semantic = await semantic_candidates(db, query, limit)
+    except Exception as e:
+        logger.warning(f"Vector grant search failed, using full-text results only: {e}")
+        semantic = []
+
+    logger.debug(f"Hybrid search '{query}': {len(lexical)} lexical, {len(semantic)} semantic candidates")
+    return reciprocal_rank_fusion([lexical, semantic], k=settings.HYBRID_SEARCH_RRF_K)
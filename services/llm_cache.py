@@ -0,0 +1,226 @@
+"""
+Content-addressed response cache for DeepSeek chat completions.
+
+Identical requests (same model, messages, temperature, max_tokens and extra
+parameters) are answered from cache instead of the API. Two tiers:
+- In-process LRU with TTL (always on when the cache is enabled)
+- Optional Redis tier shared by the API process and all Celery workers
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+settings = Settings()
+
+REDIS_KEY_PREFIX = "llmcache:v1:"
+REDIS_STATS_KEY = "llmcache:v1:stats"
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """
+    Hash a chat completion payload into a cache key.
+
+    The `stream` flag is ignored; everything else that reaches the API
+    (model, messages, temperature, max_tokens, extra kwargs) is part of the key.
+    """
+    keyed = {k: v for k, v in payload.items() if k != "stream"}
+    canonical = json.dumps(keyed, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _usage_tokens(response: Dict[str, Any]) -> int:
+    usage = response.get("usage") or {}
+    return int(usage.get("total_tokens") or 0)
+
+
+class LLMResponseCache:
+    """TTL + LRU cache for chat completion responses with hit/miss/token-savings counters."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 21600,
+        redis_url: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # redis.asyncio clients are bound to the loop they connect on
+        self._redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.tokens_saved = 0
+
+    # ------------------------------------------------------------------
+    # Redis tier
+    # ------------------------------------------------------------------
+
+    def _get_redis(self):
+        if not self.redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._redis_clients.get(loop)
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                logger.warning("redis package not installed - LLM cache running in-process only")
+                self.redis_url = None
+                return None
+            client = aioredis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+            self._redis_clients[loop] = client
+        return client
+
+    async def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(REDIS_KEY_PREFIX + key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"LLM cache Redis read failed: {str(e)}")
+            return None
+
+    async def _redis_set(self, key: str, response: Dict[str, Any]) -> None:
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.set(REDIS_KEY_PREFIX + key, json.dumps(response), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"LLM cache Redis write failed: {str(e)}")
+
+    async def _redis_count(self, **counts: int) -> None:
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for field, amount in counts.items():
+                if amount:
+                    pipe.hincrby(REDIS_STATS_KEY, field, amount)
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"LLM cache Redis stats update failed: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # In-process tier
+    # ------------------------------------------------------------------
+
+    def _local_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _local_set(self, key: str, response: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response, promoting Redis hits into the local tier."""
+        response = self._local_get(key)
+        if response is None:
+            response = await self._redis_get(key)
+            if response is not None:
+                self.redis_hits += 1
+                self._local_set(key, response)
+
+        if response is None:
+            self.misses += 1
+            await self._redis_count(misses=1)
+            return None
+
+        saved = _usage_tokens(response)
+        self.hits += 1
+        self.tokens_saved += saved
+        await self._redis_count(hits=1, tokens_saved=saved)
+        return response
+
+    async def set(self, key: str, response: Dict[str, Any]) -> None:
+        """Store a successful response in both tiers."""
+        self._local_set(key, response)
+        self.stores += 1
+        await self._redis_set(key, response)
+
+    def clear(self) -> None:
+        """Drop the in-process tier (Redis entries expire on their own)."""
+        self._entries.clear()
+
+    def reset_connections(self) -> None:
+        """Forget Redis clients, e.g. after fork."""
+        self._redis_clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "tokens_saved": self.tokens_saved,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "redis_enabled": bool(self.redis_url),
+        }
+
+    async def global_stats(self) -> Optional[Dict[str, int]]:
+        """Counters aggregated across every process sharing the Redis tier."""
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            raw = await client.hgetall(REDIS_STATS_KEY)
+            return {k.decode() if isinstance(k, bytes) else k: int(v) for k, v in raw.items()}
+        except Exception as e:
+            logger.warning(f"LLM cache Redis stats read failed: {str(e)}")
+            return None
+
+
+# Singleton instance
+_llm_cache = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get the shared LLM response cache, or None when caching is disabled."""
+    global _llm_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            redis_url=settings.REDIS_URL if settings.LLM_CACHE_USE_REDIS else None,
+        )
+    return _llm_cache
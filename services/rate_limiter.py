@@ -0,0 +1,240 @@
+"""
+Adaptive rate limiter for DeepSeek API calls.
+
+A token bucket plus a concurrency cap, shared by every DeepSeekClient in the
+process. The refill rate adapts to the provider: it backs off multiplicatively
+on 429s (honouring Retry-After) and on exhausted rate-limit headers, and
+creeps back up additively while calls succeed. With a Redis URL configured,
+backoffs and a per-second request budget are also shared across workers.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+settings = Settings()
+
+REDIS_BLOCK_KEY = "ratelimit:deepseek:blocked_until"
+REDIS_WINDOW_KEY = "ratelimit:deepseek:window:"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After / reset header (seconds, '1.5s'/'200ms', or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        if value.endswith("ms"):
+            return max(float(value[:-2]) / 1000.0, 0.0)
+        if value.endswith("s"):
+            return max(float(value[:-1]), 0.0)
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """Token bucket + concurrency governor that adapts to 429s and rate-limit headers."""
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        max_rate: float = 20.0,
+        min_rate: float = 0.2,
+        burst: int = 10,
+        max_concurrency: int = 10,
+        redis_url: Optional[str] = None,
+    ):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.redis_url = redis_url
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0  # monotonic deadline set by 429 / exhausted headers
+
+        # asyncio primitives and redis clients are bound to one event loop
+        self._loop_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Per-loop state
+    # ------------------------------------------------------------------
+
+    def _state(self) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            state = {
+                "lock": asyncio.Lock(),
+                "semaphore": asyncio.Semaphore(self.max_concurrency),
+                "redis": None,
+            }
+            if self.redis_url:
+                try:
+                    import redis.asyncio as aioredis
+                    state["redis"] = aioredis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+                except ImportError:
+                    logger.warning("redis package not installed - DeepSeek rate limiting is per-process only")
+                    self.redis_url = None
+            self._loop_state[loop] = state
+        return state
+
+    def reset_connections(self) -> None:
+        """Forget loop-bound primitives and Redis clients, e.g. after fork."""
+        self._loop_state.clear()
+
+    # ------------------------------------------------------------------
+    # Acquisition
+    # ------------------------------------------------------------------
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def _wait_for_token(self, state: Dict[str, Any]) -> None:
+        async with state["lock"]:
+            while True:
+                now = time.monotonic()
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                self.waited_seconds += wait
+                await asyncio.sleep(wait)
+
+    async def _wait_for_shared_budget(self, state: Dict[str, Any]) -> None:
+        """Respect backoffs and the per-second budget shared via Redis (fails open)."""
+        client = state["redis"]
+        if client is None:
+            return
+        try:
+            while True:
+                blocked_until = await client.get(REDIS_BLOCK_KEY)
+                wait = float(blocked_until) - time.time() if blocked_until else 0.0
+                if wait <= 0:
+                    window = int(time.time())
+                    key = f"{REDIS_WINDOW_KEY}{window}"
+                    pipe = client.pipeline(transaction=False)
+                    pipe.incr(key)
+                    pipe.expire(key, 2)
+                    count, _ = await pipe.execute()
+                    if count <= max(int(self.rate), 1):
+                        return
+                    wait = window + 1 - time.time()
+                self.waited_seconds += wait
+                await asyncio.sleep(max(wait, 0.01))
+        except Exception as e:
+            logger.debug(f"Shared DeepSeek rate limit unavailable: {str(e)}")
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Wait for a token and a concurrency slot; release the slot on exit."""
+        state = self._state()
+        async with state["semaphore"]:
+            await self._wait_for_token(state)
+            await self._wait_for_shared_budget(state)
+            yield
+
+    # ------------------------------------------------------------------
+    # Feedback
+    # ------------------------------------------------------------------
+
+    async def observe(self, response: httpx.Response) -> Optional[float]:
+        """
+        Adapt to a provider response.
+
+        Returns the number of seconds the caller should wait before retrying
+        when the response was a 429, otherwise None.
+        """
+        headers = response.headers
+
+        if response.status_code == 429:
+            retry_after = parse_retry_after(headers.get("retry-after")) or max(1.0 / self.rate, 1.0)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.throttled += 1
+            await self._block_for(retry_after)
+            logger.warning(f"DeepSeek rate limited; backing off {retry_after:.1f}s, rate now {self.rate:.2f}/s")
+            return retry_after
+
+        remaining = headers.get("x-ratelimit-remaining-requests") or headers.get("x-ratelimit-remaining")
+        reset = parse_retry_after(
+            headers.get("x-ratelimit-reset-requests") or headers.get("x-ratelimit-reset")
+        )
+        limit = headers.get("x-ratelimit-limit-requests") or headers.get("x-ratelimit-limit")
+
+        try:
+            if remaining is not None and int(remaining) <= 0 and reset:
+                await self._block_for(reset)
+                return None
+            if remaining is not None and limit is not None and reset:
+                # Spread what's left of the window evenly over its remaining time
+                self.rate = min(self.max_rate, max(self.min_rate, int(remaining) / reset))
+                return None
+        except ValueError:
+            pass
+
+        if response.is_success and self.rate < self.max_rate:
+            # Additive increase while the provider keeps accepting calls
+            self.rate = min(self.max_rate, self.rate + 0.1)
+        return None
+
+    async def _block_for(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        client = self._state()["redis"]
+        if client is None:
+            return
+        try:
+            await client.set(REDIS_BLOCK_KEY, time.time() + seconds, px=int(seconds * 1000) + 1)
+        except Exception as e:
+            logger.debug(f"Failed to share DeepSeek backoff: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_second": round(self.rate, 3),
+            "max_rate_per_second": self.max_rate,
+            "burst": self.burst,
+            "max_concurrency": self.max_concurrency,
+            "throttled": self.throttled,
+            "waited_seconds": round(self.waited_seconds, 2),
+            "redis_enabled": bool(self.redis_url),
+        }
+
+
+# Singleton instance
+_rate_limiter = None
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Get the process-wide DeepSeek rate limiter."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = AdaptiveRateLimiter(
+            rate=settings.DEEPSEEK_RATE_LIMIT_RPS,
+            max_rate=settings.DEEPSEEK_RATE_LIMIT_MAX_RPS,
+            burst=settings.DEEPSEEK_RATE_LIMIT_BURST,
+            max_concurrency=settings.DEEPSEEK_MAX_CONCURRENCY,
+            redis_url=settings.REDIS_URL if settings.DEEPSEEK_RATE_LIMIT_USE_REDIS else None,
+        )
+    return _rate_limiter
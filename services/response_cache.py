@@ -0,0 +1,268 @@
+"""
+Response cache for frequently polled read endpoints.
+
+Responses are keyed by route + query params + user and by the current
+generation of the data they depend on ("grants", "search_runs"). Writers call
+invalidate() with the tags they touched, which bumps those generations so every
+cached response built from older data stops matching. Two tiers:
+- In-process LRU with TTL (always on when the cache is enabled)
+- Optional Redis tier; generations then live in Redis too, so invalidations
+  fired from Celery workers reach the API process. Without Redis, worker-side
+  writes show up once the TTL expires.
+
+Writers that leave the commit to their caller use invalidate_after_commit(),
+which defers the invalidation to the session's after_commit event so no
+response is ever rebuilt from the uncommitted write.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+settings = Settings()
+
+REDIS_ENTRY_PREFIX = "respcache:v1:entry:"
+REDIS_GENERATION_PREFIX = "respcache:v1:gen:"
+
+GRANTS = "grants"
+SEARCH_RUNS = "search_runs"
+
+PENDING_TAGS_KEY = "response_cache_pending_tags"
+
+
+class ResponseCache:
+    """TTL + LRU cache of JSON-ready endpoint responses with tag-generation invalidation."""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: int = 60,
+        redis_url: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        # redis.asyncio clients are bound to the loop they connect on
+        self._redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _get_redis(self):
+        if not self.redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._redis_clients.get(loop)
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                logger.warning("redis package not installed - response cache running in-process only")
+                self.redis_url = None
+                return None
+            client = aioredis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+            self._redis_clients[loop] = client
+        return client
+
+    async def _current_generations(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        client = self._get_redis()
+        if client is not None:
+            try:
+                values = await client.mget([REDIS_GENERATION_PREFIX + tag for tag in tags])
+                return tuple(int(v or 0) for v in values)
+            except Exception as e:
+                logger.warning(f"Response cache Redis generation read failed: {str(e)}")
+        return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    async def make_key(self, route_key: Any, tags: Sequence[str]) -> str:
+        """Storage key for route_key under the current generations of tags."""
+        generations = await self._current_generations(tags)
+        canonical = json.dumps([route_key, list(tags), generations], sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] >= time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        value = None
+        client = self._get_redis()
+        if client is not None:
+            try:
+                raw = await client.get(REDIS_ENTRY_PREFIX + key)
+                value = json.loads(raw) if raw else None
+            except Exception as e:
+                logger.warning(f"Response cache Redis read failed: {str(e)}")
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._local_set(key, value)
+        return value
+
+    def _local_set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def set(self, key: str, value: Any) -> None:
+        self._local_set(key, value)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                await client.set(REDIS_ENTRY_PREFIX + key, json.dumps(value), ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Response cache Redis write failed: {str(e)}")
+
+    async def invalidate(self, *tags: str) -> None:
+        """Make every cached response depending on any of tags stale."""
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        self.invalidations += 1
+        client = self._get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for tag in tags:
+                    pipe.incr(REDIS_GENERATION_PREFIX + tag)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Response cache Redis invalidation failed: {str(e)}")
+
+    def reset_connections(self) -> None:
+        """Forget Redis clients, e.g. after fork."""
+        self._redis_clients.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "redis_enabled": bool(self.redis_url),
+        }
+
+
+class CachedResponse:
+    """Lookup result for one request: return .value on a hit, else build and store()."""
+
+    def __init__(self, cache: Optional[ResponseCache], key: Optional[str], value: Any = None):
+        self.cache = cache
+        self.key = key
+        self.value = value
+
+    @property
+    def hit(self) -> bool:
+        return self.value is not None
+
+    async def store(self, response: Any) -> Any:
+        """Cache response (as JSON-ready data) and return it."""
+        if self.cache is None:
+            return response
+        encoded = jsonable_encoder(response)
+        await self.cache.set(self.key, encoded)
+        return encoded
+
+
+def _user_scope(request: Request) -> str:
+    """Cache scope from the bearer token's subject (anonymous if absent or invalid)."""
+    auth = request.headers.get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return "anon"
+    try:
+        from app.auth import decode_token
+        return f"user:{decode_token(auth[7:]).get('sub')}"
+    except Exception:
+        return "anon"
+
+
+async def cached_response(request: Request, *tags: str) -> CachedResponse:
+    """Look up the cached response for request (route + query params + user)."""
+    cache = get_response_cache()
+    if cache is None:
+        return CachedResponse(None, None)
+    route_key = [request.url.path, sorted(request.query_params.multi_items()), _user_scope(request)]
+    key = await cache.make_key(route_key, tags)
+    return CachedResponse(cache, key, await cache.get(key))
+
+
+async def invalidate_responses(*tags: str) -> None:
+    """Invalidation hook for writers; never raises."""
+    cache = get_response_cache()
+    if cache is None:
+        return
+    try:
+        await cache.invalidate(*tags)
+    except Exception as e:
+        logger.warning(f"Response cache invalidation failed: {str(e)}")
+
+
+def invalidate_after_commit(db: Any, *tags: str) -> None:
+    """Invalidate tags once db (a Session or AsyncSession) commits; dropped on rollback."""
+    session = getattr(db, "sync_session", db)
+    session.info.setdefault(PENDING_TAGS_KEY, set()).update(tags)
+
+
+# Invalidations scheduled from after_commit; kept referenced until they finish
+_pending_invalidations: set = set()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    tags = session.info.pop(PENDING_TAGS_KEY, None)
+    if not tags:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        logger.debug(f"No event loop after commit - response cache for {sorted(tags)} expires by TTL")
+        return
+    task = loop.create_task(invalidate_responses(*sorted(tags)))
+    _pending_invalidations.add(task)
+    task.add_done_callback(_pending_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_uncommitted(session: Session) -> None:
+    session.info.pop(PENDING_TAGS_KEY, None)
+
+
+# Singleton instance
+_response_cache = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the shared response cache, or None when caching is disabled."""
+    global _response_cache
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            redis_url=settings.REDIS_URL if settings.RESPONSE_CACHE_USE_REDIS else None,
+        )
+    return _response_cache
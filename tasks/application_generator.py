@@ -3,20 +3,20 @@ Celery task for AI-powered grant application generation using RAG.
 Generates comprehensive grant applications tailored to business profiles.
 """
 
-import logging
 import asyncio
+import logging
 import time
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from celery import Task
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from celery_app import celery_app
 from config.settings import Settings
+from database.session import AsyncSessionLocal
 from database.models import (
     User,
     BusinessProfile,
@@ -26,15 +26,13 @@ from database.models import (
 )
 from services.application_rag import get_rag_service
 from services.deepseek_client import get_deepseek_client
+from services.application_stream import StreamPublisher, get_application_stream, stream_channel
 from services.resend_client import get_resend_client
+from tasks.worker_runtime import run_async
 
 logger = logging.getLogger(__name__)
 settings = Settings()
 
-# Create async engine for database operations
-engine = create_async_engine(settings.db_url, echo=False)
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
 
 class ApplicationGeneratorTask(Task):
     """Base task class for application generation with error handling."""
@@ -60,7 +58,8 @@ def generate_grant_application(
     self,
     user_id: int,
     grant_id: int,
-    business_profile_id: int
+    business_profile_id: int,
+    stream: bool = False
 ) -> Dict[str, Any]:
     """
     Generate AI-powered grant application using RAG.
@@ -69,26 +68,38 @@ def generate_grant_application(
         user_id: User ID
         grant_id: Grant ID
         business_profile_id: Business profile ID
+        stream: Publish section tokens and progress for the SSE endpoint
 
     Returns:
         Dict with generation results
     """
+    publish = None
+    application_stream = get_application_stream() if stream else None
+    if application_stream is not None and self.request.id:
+        publish = StreamPublisher(
+            application_stream,
+            stream_channel(user_id, self.request.id),
+            attempt=self.request.retries
+        )
+
     try:
-        # Run async code in event loop
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # If loop is already running, create a new one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        result = loop.run_until_complete(
-            _generate_application_async(user_id, grant_id, business_profile_id)
+        # Run async code on the worker's event loop
+        result = run_async(
+            _generate_application_async(user_id, grant_id, business_profile_id, publish=publish)
         )
 
+        if publish is not None:
+            run_async(publish("completed", result=result))
         return result
 
     except Exception as e:
         logger.error(f"Task failed for user {user_id}, grant {grant_id}: {str(e)}")
+        final = self.request.retries >= self.max_retries
+        if final:
+            # No retry will resume the draft; drop it so the user can generate again
+            run_async(_discard_draft(user_id, grant_id))
+        if publish is not None:
+            run_async(publish("failed" if final else "retrying", error=str(e)))
         # Retry on failure
         raise self.retry(exc=e)
 
@@ -96,7 +107,8 @@ def generate_grant_application(
 async def _generate_application_async(
     user_id: int,
     grant_id: int,
-    business_profile_id: int
+    business_profile_id: int,
+    publish: Optional[StreamPublisher] = None
 ) -> Dict[str, Any]:
     """
     Async implementation of application generation.
@@ -105,12 +117,12 @@ async def _generate_application_async(
         user_id: User ID
         grant_id: Grant ID
         business_profile_id: Business profile ID
+        publish: Stream publisher for this attempt (streaming mode only)
 
     Returns:
         Generation results dict
     """
     start_time = time.time()
-    tokens_used = 0
 
     async with AsyncSessionLocal() as db:
         try:
@@ -128,61 +140,81 @@ async def _generate_application_async(
             if not business_profile:
                 raise ValueError(f"Business profile {business_profile_id} not found")
 
-            # 3. Query RAG system for relevant business context
-            rag_service = get_rag_service()
-            grant_description = _build_grant_query(grant)
-
-            context_chunks = await rag_service.retrieve_relevant_context(
-                user_id=user_id,
-                query=grant_description,
-                top_k=5
-            )
+            # 3. Completed sections are saved on a draft as they finish, so a
+            # retried task only regenerates what is still missing
+            application = await _load_or_create_draft(db, user_id, grant_id)
 
-            # 4. Build context from RAG results
-            business_context = _build_business_context(context_chunks, business_profile)
+            # 4. Query RAG system for relevant business context (kept on the
+            # application, so resumed runs and section regeneration reuse it)
+            if not application.generation_context:
+                application.generation_context = await _build_generation_context(
+                    db, user_id, grant, business_profile
+                )
+                await db.commit()
+            business_context = application.generation_context["business_context"]
 
             # 5. Generate application sections using DeepSeek
             deepseek_client = get_deepseek_client()
-
-            sections = {}
-            section_generators = {
-                "executive_summary": _generate_executive_summary,
-                "needs_statement": _generate_needs_statement,
-                "project_description": _generate_project_description,
-                "budget_narrative": _generate_budget_narrative,
-                "organizational_capacity": _generate_organizational_capacity,
-                "impact_statement": _generate_impact_statement
-            }
-
-            for section_name, generator_func in section_generators.items():
+            section_generators = SECTION_GENERATORS
+
+            completed = dict(application.sections or {})
+            tokens_used = application.tokens_used or 0
+            failed = {}
+            semaphore = asyncio.Semaphore(max(1, settings.APPLICATION_SECTION_CONCURRENCY))
+            persist_lock = asyncio.Lock()
+
+            async def run_section(section_name, generator_func):
+                nonlocal tokens_used
+                if publish is not None:
+                    generator_func = _streaming(generator_func, section_name, publish)
                 try:
-                    section_result = await generator_func(
+                    section_result = await _generate_section(
+                        section_name,
+                        generator_func,
+                        semaphore,
                         deepseek_client=deepseek_client,
                         grant=grant,
                         business_context=business_context
                     )
-                    sections[section_name] = section_result["content"]
-                    tokens_used += section_result.get("tokens_used", 0)
                 except Exception as e:
                     logger.error(f"Failed to generate {section_name}: {str(e)}")
-                    sections[section_name] = f"[Generation failed: {str(e)}]"
+                    failed[section_name] = f"[Generation failed: {str(e)}]"
+                    if publish is not None:
+                        await publish("section_failed", section=section_name, error=str(e))
+                    return
+
+                async with persist_lock:
+                    completed[section_name] = section_result["content"]
+                    tokens_used += section_result.get("tokens_used", 0)
+                    await _save_draft_sections(application.id, completed, tokens_used)
+                if publish is not None:
+                    await publish("section_completed", section=section_name, content=section_result["content"])
+
+            if completed:
+                logger.info(f"Resuming application {application.id} with sections: {list(completed)}")
+            if publish is not None:
+                await publish("application", application_id=application.id)
+            await asyncio.gather(*(
+                run_section(section_name, generator_func)
+                for section_name, generator_func in section_generators.items()
+                if section_name not in completed
+            ))
+
+            sections = {
+                section_name: completed.get(section_name, failed.get(section_name))
+                for section_name in section_generators
+            }
 
             # 6. Combine into full application
             full_content = _format_full_application(sections, grant)
 
             # 7. Save to database
-            application = GeneratedApplication(
-                user_id=user_id,
-                grant_id=grant_id,
-                generated_content=full_content,
-                sections=sections,
-                status=ApplicationGenerationStatus.GENERATED,
-                model_used="deepseek-chat",
-                generation_time_seconds=time.time() - start_time,
-                tokens_used=tokens_used
-            )
-
-            db.add(application)
+            application.generated_content = full_content
+            application.sections = sections
+            application.status = ApplicationGenerationStatus.GENERATED
+            application.model_used = "deepseek-chat"
+            application.generation_time_seconds = time.time() - start_time
+            application.tokens_used = tokens_used
 
             # 8. Update usage counter
             user.applications_used += 1
@@ -244,6 +276,120 @@ async def _load_business_profile(db: AsyncSession, profile_id: int) -> Optional[
     return result.scalar_one_or_none()
 
 
+async def _load_or_create_draft(db: AsyncSession, user_id: int, grant_id: int) -> GeneratedApplication:
+    """Unfinished draft left by an earlier attempt of this task, or a new one."""
+    result = await db.execute(
+        select(GeneratedApplication).where(
+            GeneratedApplication.user_id == user_id,
+            GeneratedApplication.grant_id == grant_id,
+            GeneratedApplication.status == ApplicationGenerationStatus.DRAFT,
+            GeneratedApplication.generated_content.is_(None)
+        ).order_by(GeneratedApplication.id.desc()).limit(1)
+    )
+    application = result.scalar_one_or_none()
+    if application is None:
+        application = GeneratedApplication(
+            user_id=user_id,
+            grant_id=grant_id,
+            sections={},
+            status=ApplicationGenerationStatus.DRAFT,
+            model_used="deepseek-chat",
+            tokens_used=0
+        )
+        db.add(application)
+        await db.commit()
+    return application
+
+
+async def _discard_draft(user_id: int, grant_id: int) -> None:
+    """Delete the unfinished draft of a generation that will not be retried."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(GeneratedApplication).where(
+                    GeneratedApplication.user_id == user_id,
+                    GeneratedApplication.grant_id == grant_id,
+                    GeneratedApplication.status == ApplicationGenerationStatus.DRAFT,
+                    GeneratedApplication.generated_content.is_(None)
+                )
+            )
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Could not discard draft application for user {user_id}, grant {grant_id}: {str(e)}")
+
+
+async def _save_draft_sections(application_id: int, sections: Dict[str, str], tokens_used: int) -> None:
+    """Persist the sections generated so far (own session: the task's session stays untouched)."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(GeneratedApplication)
+                .where(GeneratedApplication.id == application_id)
+                .values(sections=dict(sections), tokens_used=tokens_used)
+            )
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Could not save partial sections for application {application_id}: {str(e)}")
+
+
+def _streaming(generator_func, section_name: str, publish: StreamPublisher):
+    """Wrap a section generator so every attempt streams its tokens through publish."""
+    attempt = 0
+
+    async def generate(**kwargs):
+        nonlocal attempt
+        attempt += 1
+        # Tells clients to drop tokens buffered from a failed attempt
+        await publish("section_started", section=section_name, attempt=attempt)
+
+        async def on_token(text: str) -> None:
+            await publish("token", section=section_name, text=text)
+
+        return await generator_func(on_token=on_token, **kwargs)
+
+    return generate
+
+
+async def _generate_section(section_name: str, generator_func, semaphore: asyncio.Semaphore, **kwargs) -> Dict[str, Any]:
+    """Run one section generator with a per-attempt timeout, retrying failures."""
+    attempts = max(0, settings.APPLICATION_SECTION_RETRIES) + 1
+    timeout = settings.APPLICATION_SECTION_TIMEOUT_SECONDS
+    for attempt in range(1, attempts + 1):
+        try:
+            async with semaphore:
+                return await asyncio.wait_for(generator_func(**kwargs), timeout=timeout)
+        except asyncio.TimeoutError:
+            error = RuntimeError(f"timed out after {timeout:.0f}s")
+        except Exception as e:
+            error = e
+        logger.warning(f"Section {section_name} attempt {attempt}/{attempts} failed: {str(error)}")
+        if attempt < attempts:
+            await asyncio.sleep(attempt)
+    raise error
+
+
+async def _build_generation_context(
+    db: AsyncSession,
+    user_id: int,
+    grant: Grant,
+    business_profile: BusinessProfile
+) -> Dict[str, Any]:
+    """Retrieve RAG chunks for the grant and build the business context the prompts use."""
+    rag_service = get_rag_service()
+    context_chunks = await rag_service.retrieve_relevant_context(
+        db=db,
+        user_id=user_id,
+        query=_build_grant_query(grant),
+        top_k=5,
+        grant_id=grant.id
+    )
+    return {
+        # Stored as JSON on the application
+        "context_chunks": json.loads(json.dumps(context_chunks, default=str)),
+        "business_context": _build_business_context(context_chunks, business_profile)
+    }
+
+
 def _build_grant_query(grant: Grant) -> str:
     """Build query text for RAG retrieval."""
     parts = [grant.title]
@@ -300,10 +446,45 @@ def _build_business_context(context_chunks: list, business_profile: BusinessProf
     return "\n".join(parts)
 
 
+async def _complete_section(
+    deepseek_client,
+    messages,
+    max_tokens: int,
+    on_token=None,
+    followup: Optional[List[Dict[str, str]]] = None,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """Run a section prompt; with on_token, stream it and hand each delta to on_token.
+
+    followup messages are appended after the section prompt, which keeps the
+    prompt prefix identical to the original generation (DeepSeek serves a
+    repeated prefix from its context cache).
+    """
+    if followup:
+        messages = messages + followup
+    if on_token is None:
+        response = await deepseek_client.chat_completion(
+            messages, temperature=0.7, max_tokens=max_tokens, use_cache=use_cache
+        )
+        return {
+            "content": response["choices"][0]["message"]["content"],
+            "tokens_used": response.get("usage", {}).get("total_tokens", 0)
+        }
+
+    parts = []
+    async for delta in deepseek_client.chat_completion_stream(messages, temperature=0.7, max_tokens=max_tokens):
+        parts.append(delta)
+        await on_token(delta)
+    # The stream does not report usage
+    return {"content": "".join(parts), "tokens_used": 0}
+
+
 async def _generate_executive_summary(
     deepseek_client,
     grant: Grant,
-    business_context: str
+    business_context: str,
+    on_token=None,
+    **options
 ) -> Dict[str, Any]:
     """Generate executive summary section."""
     system_prompt = """You are an expert grant writer specializing in executive summaries.
@@ -336,18 +517,15 @@ async def _generate_executive_summary(
         {"role": "user", "content": user_prompt}
     ]
 
-    response = await deepseek_client.chat_completion(messages, temperature=0.7, max_tokens=800)
-
-    return {
-        "content": response["choices"][0]["message"]["content"],
-        "tokens_used": response.get("usage", {}).get("total_tokens", 0)
-    }
+    return await _complete_section(deepseek_client, messages, max_tokens=800, on_token=on_token, **options)
 
 
 async def _generate_needs_statement(
     deepseek_client,
     grant: Grant,
-    business_context: str
+    business_context: str,
+    on_token=None,
+    **options
 ) -> Dict[str, Any]:
     """Generate needs statement section."""
     system_prompt = """You are an expert grant writer specializing in needs statements.
@@ -379,18 +557,15 @@ async def _generate_needs_statement(
         {"role": "user", "content": user_prompt}
     ]
 
-    response = await deepseek_client.chat_completion(messages, temperature=0.7, max_tokens=1000)
-
-    return {
-        "content": response["choices"][0]["message"]["content"],
-        "tokens_used": response.get("usage", {}).get("total_tokens", 0)
-    }
+    return await _complete_section(deepseek_client, messages, max_tokens=1000, on_token=on_token, **options)
 
 
 async def _generate_project_description(
     deepseek_client,
     grant: Grant,
-    business_context: str
+    business_context: str,
+    on_token=None,
+    **options
 ) -> Dict[str, Any]:
     """Generate project description section."""
     system_prompt = """You are an expert grant writer specializing in project descriptions.
@@ -423,18 +598,15 @@ async def _generate_project_description(
         {"role": "user", "content": user_prompt}
     ]
 
-    response = await deepseek_client.chat_completion(messages, temperature=0.7, max_tokens=1500)
-
-    return {
-        "content": response["choices"][0]["message"]["content"],
-        "tokens_used": response.get("usage", {}).get("total_tokens", 0)
-    }
+    return await _complete_section(deepseek_client, messages, max_tokens=1500, on_token=on_token, **options)
 
 
 async def _generate_budget_narrative(
     deepseek_client,
     grant: Grant,
-    business_context: str
+    business_context: str,
+    on_token=None,
+    **options
 ) -> Dict[str, Any]:
     """Generate budget narrative section."""
     system_prompt = """You are an expert grant writer specializing in budget narratives.
@@ -467,18 +639,15 @@ async def _generate_budget_narrative(
         {"role": "user", "content": user_prompt}
     ]
 
-    response = await deepseek_client.chat_completion(messages, temperature=0.7, max_tokens=1000)
-
-    return {
-        "content": response["choices"][0]["message"]["content"],
-        "tokens_used": response.get("usage", {}).get("total_tokens", 0)
-    }
+    return await _complete_section(deepseek_client, messages, max_tokens=1000, on_token=on_token, **options)
 
 
 async def _generate_organizational_capacity(
     deepseek_client,
     grant: Grant,
-    business_context: str
+    business_context: str,
+    on_token=None,
+    **options
 ) -> Dict[str, Any]:
     """Generate organizational capacity section."""
     system_prompt = """You are an expert grant writer specializing in organizational capacity statements.
@@ -510,18 +679,15 @@ async def _generate_organizational_capacity(
         {"role": "user", "content": user_prompt}
     ]
 
-    response = await deepseek_client.chat_completion(messages, temperature=0.7, max_tokens=1000)
-
-    return {
-        "content": response["choices"][0]["message"]["content"],
-        "tokens_used": response.get("usage", {}).get("total_tokens", 0)
-    }
+    return await _complete_section(deepseek_client, messages, max_tokens=1000, on_token=on_token, **options)
 
 
 async def _generate_impact_statement(
     deepseek_client,
     grant: Grant,
-    business_context: str
+    business_context: str,
+    on_token=None,
+    **options
 ) -> Dict[str, Any]:
     """Generate impact statement section."""
     system_prompt = """You are an expert grant writer specializing in impact statements.
@@ -554,12 +720,80 @@ async def _generate_impact_statement(
         {"role": "user", "content": user_prompt}
     ]
 
-    response = await deepseek_client.chat_completion(messages, temperature=0.7, max_tokens=1000)
+    return await _complete_section(deepseek_client, messages, max_tokens=1000, on_token=on_token, **options)
 
-    return {
-        "content": response["choices"][0]["message"]["content"],
-        "tokens_used": response.get("usage", {}).get("total_tokens", 0)
-    }
+
+SECTION_GENERATORS = {
+    "executive_summary": _generate_executive_summary,
+    "needs_statement": _generate_needs_statement,
+    "project_description": _generate_project_description,
+    "budget_narrative": _generate_budget_narrative,
+    "organizational_capacity": _generate_organizational_capacity,
+    "impact_statement": _generate_impact_statement
+}
+
+
+async def regenerate_application_section(
+    db: AsyncSession,
+    application: GeneratedApplication,
+    section_name: str,
+    feedback: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Regenerate one section of an existing application.
+
+    Uses the RAG context stored with the application, so this is a single LLM
+    call: the original section prompt followed by the previous text and the
+    rewrite request. Applications generated before the context was stored get
+    it built (and stored) once.
+
+    Args:
+        db: Database session
+        application: Application to update in place (the caller commits)
+        section_name: Key from SECTION_GENERATORS
+        feedback: Optional guidance for the rewrite
+
+    Returns:
+        Dict with the new content and tokens used
+    """
+    grant = await _load_grant(db, application.grant_id)
+    if not grant:
+        raise ValueError(f"Grant {application.grant_id} not found")
+
+    if not application.generation_context:
+        result = await db.execute(
+            select(BusinessProfile).where(BusinessProfile.user_id == application.user_id)
+        )
+        business_profile = result.scalar_one_or_none()
+        if not business_profile:
+            raise ValueError(f"Business profile for user {application.user_id} not found")
+        application.generation_context = await _build_generation_context(
+            db, application.user_id, grant, business_profile
+        )
+
+    request = "Rewrite this section as a fresh, improved version."
+    if feedback:
+        request = f"Rewrite this section, addressing this feedback:\n{feedback}"
+    previous = (application.sections or {}).get(section_name)
+    followup = [{"role": "user", "content": request}]
+    if previous:
+        followup.insert(0, {"role": "assistant", "content": previous})
+
+    section_result = await SECTION_GENERATORS[section_name](
+        deepseek_client=get_deepseek_client(),
+        grant=grant,
+        business_context=application.generation_context["business_context"],
+        followup=followup,
+        use_cache=False
+    )
+
+    sections = dict(application.sections or {})
+    sections[section_name] = section_result["content"]
+    application.sections = sections
+    application.generated_content = _format_full_application(sections, grant)
+    application.tokens_used = (application.tokens_used or 0) + section_result.get("tokens_used", 0)
+    application.last_edited = datetime.utcnow()
+    return section_result
 
 
 def _format_full_application(sections: Dict[str, str], grant: Grant) -> str:
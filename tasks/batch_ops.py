@@ -0,0 +1,127 @@
+"""
+Chunked, set-based UPDATE/DELETE for maintenance tasks.
+
+Maintenance jobs used to SELECT every matching ORM object and then modify or
+db.delete() them one at a time, which loads whole tables (plus relationship
+cascades) into worker memory and holds row locks for one long transaction.
+run_batched() instead issues
+
+    UPDATE/DELETE ... WHERE id IN (SELECT id ... WHERE <filter> AND id > :last
+                                   ORDER BY id LIMIT :batch_size)
+    RETURNING id
+
+repeatedly, committing after every chunk. Each chunk runs with a short
+lock_timeout so a job never queues behind (or blocks) user traffic for long;
+a chunk that cannot get its locks is retried a few times before giving up.
+Child rows are removed by the ON DELETE CASCADE foreign keys, not the ORM.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import Table, delete, select, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+settings = Settings()
+
+# Postgres SQLSTATE for lock_timeout expiry
+LOCK_NOT_AVAILABLE = "55P03"
+
+ProgressCallback = Callable[[str, int, int], None]  # (label, rows, batches)
+
+
+def _is_lock_timeout(error: DBAPIError) -> bool:
+    orig = getattr(error, "orig", None)
+    code = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    return code == LOCK_NOT_AVAILABLE
+
+
+async def run_batched(
+    db: AsyncSession,
+    table: Table,
+    where: Iterable[Any],
+    *,
+    values: Optional[Dict[str, Any]] = None,
+    label: str,
+    batch_size: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """UPDATE (with values) or DELETE (without) the rows of table matching where.
+
+    Rows are visited in primary key order, so rows that still match after being
+    updated are not revisited. Returns the number of rows affected.
+    """
+    batch_size = batch_size or settings.MAINTENANCE_BATCH_SIZE
+    lock_timeout_ms = int(settings.MAINTENANCE_LOCK_TIMEOUT_MS)
+    where = list(where)
+    pk = table.c.id
+
+    last_id = None
+    total = 0
+    batches = 0
+    while True:
+        chunk = select(pk).where(*where).order_by(pk).limit(batch_size)
+        if last_id is not None:
+            chunk = chunk.where(pk > last_id)
+        if values is None:
+            statement = delete(table).where(pk.in_(chunk))
+        else:
+            statement = update(table).where(pk.in_(chunk)).values(**values)
+        statement = statement.returning(pk)
+
+        for attempt in range(settings.MAINTENANCE_LOCK_RETRIES + 1):
+            try:
+                await db.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout_ms}ms'"))
+                ids = (await db.execute(statement)).scalars().all()
+                await db.commit()
+                break
+            except DBAPIError as e:
+                await db.rollback()
+                if not _is_lock_timeout(e) or attempt >= settings.MAINTENANCE_LOCK_RETRIES:
+                    raise
+                logger.warning(
+                    f"{label}: batch {batches + 1} hit lock timeout, retrying "
+                    f"({attempt + 1}/{settings.MAINTENANCE_LOCK_RETRIES})"
+                )
+                await asyncio.sleep(0.5 * (attempt + 1))
+
+        if not ids:
+            break
+        total += len(ids)
+        batches += 1
+        last_id = max(ids)
+        logger.info(f"{label}: batch {batches} affected {len(ids)} rows ({total} so far)")
+        if progress is not None:
+            progress(label, total, batches)
+        if len(ids) < batch_size:
+            break
+
+    return total
+
+
+def task_progress(task: Any) -> Optional[ProgressCallback]:
+    """Progress callback publishing PROGRESS state for a bound Celery task.
+
+    Call it in the task body itself: task.request is thread-local, and the
+    batches run on the worker loop thread.
+    """
+    task_id = getattr(task.request, "id", None)
+    if not task_id:
+        return None
+
+    def report(label: str, rows: int, batches: int) -> None:
+        try:
+            task.update_state(
+                task_id=task_id,
+                state="PROGRESS",
+                meta={"step": label, "rows": rows, "batches": batches},
+            )
+        except Exception as e:
+            logger.debug(f"Could not publish progress for task {task_id}: {str(e)}")
+
+    return report
@@ -6,16 +6,17 @@ Runs weekly on Sunday at 3 AM.
 from celery_app import celery_app
 from database.models import Grant
 from database.session import get_db
+from services.response_cache import GRANTS, invalidate_responses
+from tasks.batch_ops import run_batched, task_progress
+from tasks.worker_runtime import run_async
 from datetime import datetime, timedelta
-from sqlalchemy import select
 import logging
-import asyncio
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task
-def cleanup_expired_grants():
+@celery_app.task(bind=True)
+def cleanup_expired_grants(self):
     """
     Mark or delete grants past their deadline.
 
@@ -27,50 +28,44 @@ def cleanup_expired_grants():
         Dict with cleanup statistics
     """
     try:
-        result = asyncio.run(_cleanup_expired_grants_async())
+        result = run_async(_cleanup_expired_grants_async(task_progress(self)))
         return result
     except Exception as e:
         logger.error(f"Failed to cleanup expired grants: {str(e)}", exc_info=True)
         raise
 
 
-async def _cleanup_expired_grants_async():
-    """Clean up expired grants asynchronously."""
+async def _cleanup_expired_grants_async(progress=None):
+    """Clean up expired grants in batches."""
     async for db in get_db():
         try:
             now = datetime.utcnow()
             expire_threshold = now - timedelta(days=30)  # 30 days past deadline
             delete_threshold = now - timedelta(days=90)  # 90 days past deadline
+            grants = Grant.__table__
 
             # Mark grants as EXPIRED (30 days past deadline)
-            result = await db.execute(
-                select(Grant).where(
-                    Grant.deadline < expire_threshold,
-                    Grant.record_status == "ACTIVE"
-                )
+            expired_count = await run_batched(
+                db,
+                grants,
+                [Grant.deadline < expire_threshold, Grant.record_status == "ACTIVE"],
+                values={"record_status": "EXPIRED"},
+                label="Expire grants",
+                progress=progress,
             )
-            grants_to_expire = result.scalars().all()
 
-            expired_count = 0
-            for grant in grants_to_expire:
-                grant.record_status = "EXPIRED"
-                expired_count += 1
-
-            # Delete old expired grants (90 days past deadline)
-            result = await db.execute(
-                select(Grant).where(
-                    Grant.deadline < delete_threshold,
-                    Grant.record_status == "EXPIRED"
-                )
+            # Delete old expired grants (90 days past deadline); analyses,
+            # history and applications go with them via ON DELETE CASCADE
+            deleted_count = await run_batched(
+                db,
+                grants,
+                [Grant.deadline < delete_threshold, Grant.record_status == "EXPIRED"],
+                label="Delete expired grants",
+                progress=progress,
             )
-            grants_to_delete = result.scalars().all()
-
-            deleted_count = 0
-            for grant in grants_to_delete:
-                await db.delete(grant)
-                deleted_count += 1
 
-            await db.commit()
+            if expired_count or deleted_count:
+                await invalidate_responses(GRANTS)
 
             logger.info(
                 f"Cleanup complete: {expired_count} marked expired, "
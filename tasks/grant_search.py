@@ -4,20 +4,24 @@ Implements thermodynamic prompting for comprehensive grant discovery.
 """
 
 import logging
-import asyncio
-from typing import Dict, Any, List
+from typing import Any, AsyncGenerator, Dict, List, Optional
 from datetime import datetime
 from celery import Task
 
 from celery_app import celery_app
 from database.session import get_db, AsyncSessionLocal
+from tasks.worker_runtime import run_async
 from database.models import User, Grant, SearchRun, SearchRunType, SearchRunStatus
 from services.deepseek_client import get_deepseek_client
 from services.resend_client import get_resend_client
 from services.embedding_service import get_embedding_service
+from services.response_cache import GRANTS, SEARCH_RUNS, invalidate_responses
+from app.duplicate_detection import grant_upsert_statement, grant_url_key
 from agents.integrated_research_agent import IntegratedResearchAgent
 from app.models import GrantFilter
+from app.schemas import EnrichedGrant
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
@@ -46,7 +50,7 @@ def scheduled_grant_search(self, user_id: int, search_params: Dict[str, Any] = N
         Dict with search results and statistics
     """
     try:
-        result = asyncio.run(_scheduled_search_async(user_id, search_params))
+        result = run_async(_scheduled_search_async(user_id, search_params))
         return result
     except Exception as e:
         logger.error(f"Scheduled search failed for user {user_id}: {str(e)}")
@@ -66,7 +70,7 @@ def manual_grant_search(self, user_id: int, search_params: Dict[str, Any]):
         Dict with search results
     """
     try:
-        result = asyncio.run(_manual_search_async(user_id, search_params))
+        result = run_async(_manual_search_async(user_id, search_params))
         return result
     except Exception as e:
         logger.error(f"Manual search failed for user {user_id}: {str(e)}")
@@ -80,7 +84,7 @@ def run_scheduled_searches():
     Called by Celery Beat every 6 hours.
     """
     try:
-        result = asyncio.run(_run_all_scheduled_searches())
+        result = run_async(_run_all_scheduled_searches())
         return result
     except Exception as e:
         logger.error(f"Failed to run scheduled searches: {str(e)}")
@@ -88,12 +92,21 @@ def run_scheduled_searches():
 
 
 async def _run_all_scheduled_searches() -> Dict[str, Any]:
-    """Run searches for all active users who are due for a search."""
+    """
+    Run searches for all active users who are due for a search.
+
+    The chunk searches are planned across all users first: every distinct
+    SearchChunk is sent to DeepSeek once for the whole beat cycle, and each
+    user's share of the results is handed to their scheduled_grant_search task
+    for storage, embedding and notifications.
+    """
     async for db in get_db():
         try:
             # Get all active users with subscriptions
             result = await db.execute(
-                select(User).where(
+                select(User)
+                .options(selectinload(User.business_profile))
+                .where(
                     User.is_active == True,
                     User.subscription_status.in_(["active", "trialing"])
                 )
@@ -104,6 +117,7 @@ async def _run_all_scheduled_searches() -> Dict[str, Any]:
             searches_triggered = 0
             searches_skipped = 0
 
+            eligible_users = []
             for user in users:
                 # Check if user has searches remaining
                 if user.searches_used >= user.searches_limit:
@@ -113,8 +127,28 @@ async def _run_all_scheduled_searches() -> Dict[str, Any]:
 
                 # Check user settings for search frequency
                 # For now, run for all active users
+                eligible_users.append(user)
+
+            # Plan and execute the shared chunk searches once for all users
+            grants_by_user: Dict[int, List[EnrichedGrant]] = {}
+            if eligible_users:
+                try:
+                    research_agent = IntegratedResearchAgent(AsyncSessionLocal)
+                    grants_by_user = await research_agent.search_grants_for_filters({
+                        user.id: _build_grant_filter(user, {}) for user in eligible_users
+                    })
+                except Exception as e:
+                    # Fall back to independent per-user searches
+                    logger.error(f"Planned search failed, users will search individually: {e}", exc_info=True)
+
+            for user in eligible_users:
+                search_params = {}
+                if user.id in grants_by_user:
+                    search_params["prefetched_grants"] = [
+                        g.model_dump(mode="json") for g in grants_by_user[user.id]
+                    ]
                 try:
-                    scheduled_grant_search.delay(user.id)
+                    scheduled_grant_search.delay(user.id, search_params)
                     searches_triggered += 1
                 except Exception as e:
                     logger.error(f"Failed to trigger search for user {user.id}: {e}")
@@ -125,6 +159,7 @@ async def _run_all_scheduled_searches() -> Dict[str, Any]:
                 "total_users": total_users,
                 "searches_triggered": searches_triggered,
                 "searches_skipped": searches_skipped,
+                "planned_search": bool(grants_by_user),
                 "timestamp": datetime.utcnow().isoformat()
             }
 
@@ -146,12 +181,16 @@ async def _scheduled_search_async(user_id: int, search_params: Dict[str, Any] =
     Returns:
         Search results dict
     """
+    search_params = search_params or {}
+
     async for db in get_db():
         try:
             start_time = datetime.utcnow()
 
             # Load user
-            result = await db.execute(select(User).where(User.id == user_id))
+            result = await db.execute(
+                select(User).options(selectinload(User.business_profile)).where(User.id == user_id)
+            )
             user = result.scalar_one_or_none()
 
             if not user:
@@ -166,7 +205,7 @@ async def _scheduled_search_async(user_id: int, search_params: Dict[str, Any] =
                 user_id=user_id,
                 run_type=SearchRunType.SCHEDULED,
                 status=SearchRunStatus.IN_PROGRESS,
-                search_filters=search_params or {}
+                search_filters={k: v for k, v in search_params.items() if k != "prefetched_grants"}
             )
             db.add(search_run)
             await db.commit()
@@ -199,7 +238,8 @@ async def _scheduled_search_async(user_id: int, search_params: Dict[str, Any] =
                 db=db,
                 user=user,
                 reasoning=reasoning_result["reasoning"],
-                search_params=search_params or {}
+                search_params=search_params,
+                search_run=search_run
             )
 
             # Update search run
@@ -215,6 +255,7 @@ async def _scheduled_search_async(user_id: int, search_params: Dict[str, Any] =
             user.searches_used += 1
 
             await db.commit()
+            await invalidate_responses(SEARCH_RUNS)
 
             # Send post-run summary email (always)
             high_priority_grants = [g for g in grants_found if g.get("priority") == "high"]
@@ -287,26 +328,78 @@ async def _manual_search_async(user_id: int, search_params: Dict[str, Any]) -> D
             await db.close()
 
 
+def _build_grant_filter(user: User, search_params: Dict[str, Any]) -> GrantFilter:
+    """Build a GrantFilter from the user's business profile and search params."""
+    keywords = search_params.get("query", "")
+    geographic_focus = None
+    target_sectors = []
+
+    if user.business_profile:
+        geographic_focus = user.business_profile.geographic_focus
+        target_sectors = user.business_profile.target_sectors or []
+        if not keywords:
+            keywords = ", ".join(target_sectors[:3]) if target_sectors else "grants"
+
+    return GrantFilter(
+        keywords=keywords,
+        min_score=0.0,
+        min_funding=search_params.get("min_funding", 5000),
+        max_funding=search_params.get("max_funding", 1000000),
+        geographic_focus=geographic_focus,
+    )
+
+
+async def _iter_discovered_grants(
+    user: User,
+    search_params: Dict[str, Any],
+    on_progress=None
+) -> AsyncGenerator[EnrichedGrant, None]:
+    """Yield grants from the planned beat-cycle search or a live streaming search."""
+    if "prefetched_grants" in search_params:
+        # Chunks were already searched once for the whole beat cycle
+        logger.info(f"Using {len(search_params['prefetched_grants'])} prefetched grants from planned search")
+        for data in search_params["prefetched_grants"]:
+            try:
+                yield EnrichedGrant.model_validate(data)
+            except Exception as e:
+                logger.warning(f"Skipping malformed prefetched grant: {e}")
+        return
+
+    grant_filter = _build_grant_filter(user, search_params)
+
+    # Use the IntegratedResearchAgent (wraps RecursiveResearchAgent + DeepSeek)
+    try:
+        research_agent = IntegratedResearchAgent(AsyncSessionLocal)
+        async for eg in research_agent.stream_grants(grant_filter, on_progress=on_progress):
+            yield eg
+    except Exception as e:
+        logger.error(f"Research agent search failed: {e}", exc_info=True)
+
+
 async def _discover_grants_with_reasoning(
     db: AsyncSession,
     user: User,
     reasoning: str,
-    search_params: Dict[str, Any]
+    search_params: Dict[str, Any],
+    search_run: Optional[SearchRun] = None
 ) -> List[Dict[str, Any]]:
     """
     Discover grants using DeepSeek via the IntegratedResearchAgent pipeline.
 
     Pipeline:
     1. Build GrantFilter from user profile + search params
-    2. IntegratedResearchAgent uses RecursiveResearchAgent internally
+    2. IntegratedResearchAgent streams grants from RecursiveResearchAgent
     3. RecursiveResearchAgent calls DeepSeek with chunked queries
-    4. Grants are scored, deduplicated, and stored in Postgres
+    4. Each grant is stored, embedded and committed as soon as it arrives,
+       while later chunks are still in flight; search_run.progress is kept
+       current for the live-status endpoint
 
     Args:
         db: Database session
         user: User object
         reasoning: DeepSeek reasoning output
         search_params: Search parameters
+        search_run: Optional SearchRun to report progress on
 
     Returns:
         List of grant dictionaries
@@ -314,48 +407,35 @@ async def _discover_grants_with_reasoning(
     logger.info("Discovering grants with DeepSeek reasoning pipeline")
     logger.info(f"Reasoning strategy: {reasoning[:200]}...")
 
-    # Build GrantFilter from user profile and search params
-    keywords = search_params.get("query", "")
-    geographic_focus = None
-    target_sectors = []
-
-    if user.business_profile:
-        geographic_focus = user.business_profile.geographic_focus
-        target_sectors = user.business_profile.target_sectors or []
-        if not keywords:
-            keywords = ", ".join(target_sectors[:3]) if target_sectors else "grants"
-
-    grant_filter = GrantFilter(
-        keywords=keywords,
-        min_score=0.0,
-        min_funding=search_params.get("min_funding", 5000),
-        max_funding=search_params.get("max_funding", 1000000),
-        geographic_focus=geographic_focus,
-    )
-
-    # Use the IntegratedResearchAgent (wraps RecursiveResearchAgent + DeepSeek)
-    try:
-        research_agent = IntegratedResearchAgent(AsyncSessionLocal)
-        enriched_grants = await research_agent.search_grants(grant_filter)
-        logger.info(f"Research agent returned {len(enriched_grants)} grants")
-    except Exception as e:
-        logger.error(f"Research agent search failed: {e}", exc_info=True)
-        enriched_grants = []
+    grants_discovered = []
+    progress: Dict[str, Any] = {"grants_stored": 0}
+
+    async def report_progress(event) -> None:
+        if search_run is None:
+            return
+        progress.update(
+            tier=event.tier,
+            chunks_done=event.chunks_done,
+            chunks_total=event.chunks_total,
+        )
+        search_run.progress = dict(progress)
+        search_run.sources_searched = event.chunks_done
+        await db.commit()
 
     # Convert EnrichedGrant objects → dicts and store in database
-    grants_discovered = []
-    for eg in enriched_grants:
+    async for eg in _iter_discovered_grants(user, search_params, on_progress=report_progress):
         try:
-            # Check for existing grant by title
-            existing = await db.execute(
-                select(Grant).where(Grant.title == eg.title, Grant.user_id == user.id)
-            )
-            if existing.scalar_one_or_none():
-                logger.info(f"Skipping duplicate grant: {eg.title}")
-                continue
+            # Grants without a URL identity fall back to an exact title check
+            if grant_url_key(eg.source_url) is None:
+                existing = await db.execute(
+                    select(Grant.id).where(Grant.title == eg.title, Grant.user_id == user.id).limit(1)
+                )
+                if existing.scalar_one_or_none():
+                    logger.info(f"Skipping duplicate grant: {eg.title}")
+                    continue
 
-            # Store in database
-            db_grant = Grant(
+            # Store in database; a grant this user already has (same normalized URL) is skipped
+            grant_id = (await db.execute(grant_upsert_statement([dict(
                 user_id=user.id,
                 title=eg.title,
                 description=eg.description or "",
@@ -376,14 +456,15 @@ async def _discover_grants_with_reasoning(
                 keywords_json=eg.keywords,
                 categories_project_json=eg.categories_project,
                 record_status="ACTIVE",
-            )
-            db.add(db_grant)
-            await db.flush()
+            )], update=False).returning(Grant.id))).scalar_one_or_none()
+            if grant_id is None:
+                logger.info(f"Skipping duplicate grant: {eg.title}")
+                continue
 
             # Generate and store grant embedding for semantic search
             try:
                 embed_svc = get_embedding_service()
-                await embed_svc.embed_grant(db, db_grant.id, eg.title, eg.description or "")
+                await embed_svc.embed_grant(db, grant_id, eg.title, eg.description or "")
             except Exception as embed_err:
                 logger.warning(f"Failed to embed grant '{eg.title}': {embed_err}")
 
@@ -392,7 +473,7 @@ async def _discover_grants_with_reasoning(
             priority = "high" if score >= 0.7 else ("medium" if score >= 0.4 else "low")
 
             grants_discovered.append({
-                "id": db_grant.id,
+                "id": grant_id,
                 "title": eg.title,
                 "description": eg.description,
                 "funding_amount_display": eg.funding_amount_display,
@@ -404,6 +485,14 @@ async def _discover_grants_with_reasoning(
                 "funder_name": eg.funder_name,
             })
 
+            # Commit each grant so it is visible while the search continues
+            progress["grants_stored"] = len(grants_discovered)
+            if search_run is not None:
+                search_run.grants_found = len(grants_discovered)
+                search_run.progress = dict(progress)
+            await db.commit()
+            await invalidate_responses(GRANTS, SEARCH_RUNS)
+
         except Exception as e:
             logger.error(f"Failed to process grant '{getattr(eg, 'title', '?')}': {e}")
             continue
@@ -426,7 +515,7 @@ def bulk_grant_analysis(user_id: int, grant_ids: List[int]):
         Analysis results
     """
     try:
-        result = asyncio.run(_bulk_analysis_async(user_id, grant_ids))
+        result = run_async(_bulk_analysis_async(user_id, grant_ids))
         return result
     except Exception as e:
         logger.error(f"Bulk analysis failed: {str(e)}")
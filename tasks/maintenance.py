@@ -4,22 +4,24 @@ Handles usage resets, warnings, cleanup, and reporting.
 """
 
 import logging
-import asyncio
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from sqlalchemy import select, and_
 
 from celery_app import celery_app
 from database.session import get_db
+from tasks.batch_ops import run_batched, task_progress
+from tasks.worker_runtime import run_async
 from database.models import User, Grant, SubscriptionStatus, GeneratedApplication
 from services.resend_client import get_resend_client
 from services.application_rag import get_rag_service
+from services.response_cache import GRANTS, SEARCH_RUNS, invalidate_responses
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task
-def reset_monthly_usage_counters():
+@celery_app.task(bind=True)
+def reset_monthly_usage_counters(self):
     """
     Reset monthly usage counters for all users.
     Called on the 1st of each month at midnight by Celery Beat.
@@ -28,36 +30,32 @@ def reset_monthly_usage_counters():
         Dict with reset statistics
     """
     try:
-        result = asyncio.run(_reset_usage_async())
+        result = run_async(_reset_usage_async(task_progress(self)))
         return result
     except Exception as e:
         logger.error(f"Failed to reset usage counters: {str(e)}")
         raise
 
 
-async def _reset_usage_async() -> Dict[str, Any]:
+async def _reset_usage_async(progress=None) -> Dict[str, Any]:
     """Reset usage counters for all active subscribers."""
     async for db in get_db():
         try:
-            # Get all active subscribers
-            result = await db.execute(
-                select(User).where(
-                    User.subscription_status.in_([
-                        SubscriptionStatus.ACTIVE,
-                        SubscriptionStatus.TRIALING
-                    ])
-                )
+            reset_count = await run_batched(
+                db,
+                User.__table__,
+                [User.subscription_status.in_([
+                    SubscriptionStatus.ACTIVE,
+                    SubscriptionStatus.TRIALING
+                ])],
+                values={
+                    "searches_used": 0,
+                    "applications_used": 0,
+                    "usage_period_start": datetime.utcnow(),
+                },
+                label="Reset usage counters",
+                progress=progress,
             )
-            users = result.scalars().all()
-
-            reset_count = 0
-            for user in users:
-                user.searches_used = 0
-                user.applications_used = 0
-                user.usage_period_start = datetime.utcnow()
-                reset_count += 1
-
-            await db.commit()
 
             logger.info(f"Reset usage counters for {reset_count} users")
 
@@ -83,7 +81,7 @@ def check_and_warn_usage_limits():
         Dict with warning statistics
     """
     try:
-        result = asyncio.run(_check_usage_async())
+        result = run_async(_check_usage_async())
         return result
     except Exception as e:
         logger.error(f"Failed to check usage limits: {str(e)}")
@@ -166,7 +164,7 @@ def cleanup_expired_embeddings():
         Dict with cleanup statistics
     """
     try:
-        result = asyncio.run(_cleanup_embeddings_async())
+        result = run_async(_cleanup_embeddings_async())
         return result
     except Exception as e:
         logger.error(f"Failed to cleanup embeddings: {str(e)}")
@@ -222,7 +220,7 @@ def send_weekly_reports():
         Dict with report statistics
     """
     try:
-        result = asyncio.run(_send_reports_async())
+        result = run_async(_send_reports_async())
         return result
     except Exception as e:
         logger.error(f"Failed to send weekly reports: {str(e)}")
@@ -300,8 +298,8 @@ async def _send_reports_async() -> Dict[str, Any]:
             await db.close()
 
 
-@celery_app.task
-def cleanup_old_search_runs():
+@celery_app.task(bind=True)
+def cleanup_old_search_runs(self):
     """
     Clean up search run records older than 90 days.
     Keeps database size manageable.
@@ -310,14 +308,14 @@ def cleanup_old_search_runs():
         Dict with cleanup statistics
     """
     try:
-        result = asyncio.run(_cleanup_search_runs_async())
+        result = run_async(_cleanup_search_runs_async(task_progress(self)))
         return result
     except Exception as e:
         logger.error(f"Failed to cleanup search runs: {str(e)}")
         raise
 
 
-async def _cleanup_search_runs_async() -> Dict[str, Any]:
+async def _cleanup_search_runs_async(progress=None) -> Dict[str, Any]:
     """Delete old search run records."""
     async for db in get_db():
         try:
@@ -326,19 +324,15 @@ async def _cleanup_search_runs_async() -> Dict[str, Any]:
             ninety_days_ago = datetime.utcnow() - timedelta(days=90)
 
             # Delete old search runs
-            result = await db.execute(
-                select(SearchRun).where(
-                    SearchRun.created_at < ninety_days_ago
-                )
+            deleted_count = await run_batched(
+                db,
+                SearchRun.__table__,
+                [SearchRun.created_at < ninety_days_ago],
+                label="Delete old search runs",
+                progress=progress,
             )
-            old_runs = result.scalars().all()
-
-            deleted_count = len(old_runs)
-
-            for run in old_runs:
-                await db.delete(run)
-
-            await db.commit()
+            if deleted_count:
+                await invalidate_responses(SEARCH_RUNS)
 
             logger.info(f"Deleted {deleted_count} old search runs")
 
@@ -365,7 +359,7 @@ def check_trial_expirations():
         Dict with reminder statistics
     """
     try:
-        result = asyncio.run(_check_trials_async())
+        result = run_async(_check_trials_async())
         return result
     except Exception as e:
         logger.error(f"Failed to check trial expirations: {str(e)}")
@@ -423,50 +417,82 @@ async def _check_trials_async() -> Dict[str, Any]:
             await db.close()
 
 
-@celery_app.task
-def mark_stale_grants():
+@celery_app.task(bind=True)
+def mark_stale_grants(self):
     """
     Mark grants not updated in 60+ days as STALE.
     Called daily to keep grant freshness accurate.
     """
     try:
-        result = asyncio.run(_mark_stale_grants_async())
+        result = run_async(_mark_stale_grants_async(task_progress(self)))
         return result
     except Exception as e:
         logger.error(f"Failed to mark stale grants: {str(e)}")
         raise
 
 
-async def _mark_stale_grants_async() -> Dict[str, Any]:
+async def _mark_stale_grants_async(progress=None) -> Dict[str, Any]:
     """Mark old grants as stale."""
     async for db in get_db():
         try:
             sixty_days_ago = datetime.utcnow() - timedelta(days=60)
 
-            result = await db.execute(
-                select(Grant).where(
-                    and_(
-                        Grant.record_status == "ACTIVE",
-                        Grant.updated_at < sixty_days_ago,
-                    )
-                )
+            stale_count = await run_batched(
+                db,
+                Grant.__table__,
+                [Grant.record_status == "ACTIVE", Grant.updated_at < sixty_days_ago],
+                values={"record_status": "STALE"},
+                label="Mark stale grants",
+                progress=progress,
             )
-            stale_grants = result.scalars().all()
+            if stale_count:
+                await invalidate_responses(GRANTS)
+            logger.info(f"Marked {stale_count} grants as STALE (>60 days old)")
 
-            for grant in stale_grants:
-                grant.record_status = "STALE"
+            return {
+                "grants_marked_stale": stale_count,
+                "cutoff_date": sixty_days_ago.isoformat(),
+                "timestamp": datetime.utcnow().isoformat(),
+            }
 
+        except Exception as e:
+            logger.error(f"Error marking stale grants: {str(e)}")
+            raise
+        finally:
+            await db.close()
+
+
+@celery_app.task
+def refresh_dashboard_aggregates():
+    """
+    Rebuild the grant_stats dashboard aggregates from the grants table.
+    Triggers keep them current between runs; this corrects any drift.
+    """
+    try:
+        result = run_async(_refresh_dashboard_aggregates_async())
+        return result
+    except Exception as e:
+        logger.error(f"Failed to refresh dashboard aggregates: {str(e)}")
+        raise
+
+
+async def _refresh_dashboard_aggregates_async() -> Dict[str, Any]:
+    """Recompute grant_stats in one transaction."""
+    from services.dashboard_stats import rebuild_grant_stats
+
+    async for db in get_db():
+        try:
+            buckets = await rebuild_grant_stats(db)
             await db.commit()
-            logger.info(f"Marked {len(stale_grants)} grants as STALE (>60 days old)")
+            logger.info(f"Rebuilt dashboard aggregates ({buckets} buckets)")
 
             return {
-                "grants_marked_stale": len(stale_grants),
-                "cutoff_date": sixty_days_ago.isoformat(),
+                "buckets": buckets,
                 "timestamp": datetime.utcnow().isoformat(),
             }
 
         except Exception as e:
-            logger.error(f"Error marking stale grants: {str(e)}")
+            logger.error(f"Error refreshing dashboard aggregates: {str(e)}")
             raise
         finally:
             await db.close()
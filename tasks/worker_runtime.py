@@ -0,0 +1,90 @@
+"""
+Persistent event loop and database pool for Celery worker processes.
+
+Tasks used to wrap their coroutines in asyncio.run(), which builds a new event
+loop per task, so nothing loop-bound (asyncpg connections, HTTP and Redis
+clients) survived between tasks and the engine had to use NullPool. Instead each
+worker process runs one event loop on a background thread for its whole life;
+run_async() submits a task's coroutine to it, and the shared engine keeps a
+connection pool sized to the number of tasks the process runs at once.
+
+celery_app.py calls init_worker_runtime() when a worker process starts and
+shutdown_worker_runtime() when it exits. Outside a worker (scripts, eager
+tasks) the loop is started on first use.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+from config.settings import Settings
+
+logger = logging.getLogger(__name__)
+settings = Settings()
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    """The running worker loop of this process (a forked child starts its own)."""
+    global _loop, _loop_thread, _loop_pid
+    with _lock:
+        if _loop is not None and _loop_pid == os.getpid() and _loop_thread.is_alive():
+            return _loop
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="worker-event-loop", daemon=True)
+        thread.start()
+        _loop, _loop_thread, _loop_pid = loop, thread, os.getpid()
+        logger.info(f"Started worker event loop in process {_loop_pid}")
+        return loop
+
+
+def init_worker_runtime(concurrent_tasks: int = 1) -> None:
+    """Start this process's event loop and size the database pool.
+
+    concurrent_tasks is how many tasks this process may run at the same time:
+    1 for prefork children, the worker concurrency for thread-based pools.
+    """
+    from database.session import configure_pool
+
+    configure_pool(max(1, concurrent_tasks) * settings.DB_CONNECTIONS_PER_TASK)
+    _ensure_loop()
+
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine on the worker loop and wait for its result (use instead of asyncio.run)."""
+    future = asyncio.run_coroutine_threadsafe(coro, _ensure_loop())
+    try:
+        return future.result()
+    except BaseException:
+        # e.g. SoftTimeLimitExceeded raised in the task thread: stop the coroutine too
+        future.cancel()
+        raise
+
+
+def shutdown_worker_runtime(timeout: float = 10.0) -> None:
+    """Close pooled connections on the loop that opened them, then stop the loop."""
+    global _loop, _loop_thread, _loop_pid
+    with _lock:
+        loop, thread = _loop, _loop_thread
+        if loop is None or _loop_pid != os.getpid() or not thread.is_alive():
+            return
+        _loop = _loop_thread = _loop_pid = None
+
+    from database.session import dispose_engine
+
+    try:
+        asyncio.run_coroutine_threadsafe(dispose_engine(), loop).result(timeout)
+        asyncio.run_coroutine_threadsafe(loop.shutdown_asyncgens(), loop).result(timeout)
+    except Exception as e:
+        logger.warning(f"Worker runtime shutdown incomplete: {str(e)}")
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
@@ -0,0 +1,151 @@
+"""
+Tests for concurrent section generation in the application generator task.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tasks import application_generator
+from tasks.application_generator import _generate_section
+
+
+@pytest.fixture
+def fast_sections(monkeypatch):
+    monkeypatch.setattr(application_generator.settings, "APPLICATION_SECTION_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(application_generator.settings, "APPLICATION_SECTION_RETRIES", 1)
+    monkeypatch.setattr(application_generator.asyncio, "sleep", _no_sleep)
+
+
+async def _no_sleep(delay):
+    return None
+
+
+@pytest.mark.asyncio
+async def test_slow_attempt_times_out_and_is_retried(fast_sections):
+    calls = []
+
+    async def generator(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            await asyncio.Event().wait()  # hangs until the timeout cancels it
+        return {"content": "done", "tokens_used": 5}
+
+    result = await _generate_section("needs_statement", generator, asyncio.Semaphore(1), grant="g")
+
+    assert result["content"] == "done"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_retries(fast_sections):
+    async def generator(**kwargs):
+        raise ValueError("bad response")
+
+    with pytest.raises(ValueError, match="bad response"):
+        await _generate_section("budget_narrative", generator, asyncio.Semaphore(1))
+
+
+@pytest.mark.asyncio
+async def test_sections_share_the_concurrency_cap():
+    running = []
+    peak = []
+
+    async def generator(**kwargs):
+        running.append(1)
+        peak.append(len(running))
+        await asyncio.sleep(0.02)
+        running.pop()
+        return {"content": "x"}
+
+    semaphore = asyncio.Semaphore(3)
+    started = time.monotonic()
+    await asyncio.gather(*(_generate_section(str(i), generator, semaphore) for i in range(6)))
+
+    assert max(peak) == 3
+    # Two waves of three, not six sequential calls
+    assert time.monotonic() - started < 0.1
+
+
+
+@pytest.mark.asyncio
+async def test_regenerate_section_reuses_stored_context_and_prompt_prefix(monkeypatch):
+    calls = []
+
+    class FakeDeepSeek:
+        async def chat_completion(self, messages, temperature, max_tokens, use_cache=True):
+            calls.append({"messages": messages, "use_cache": use_cache})
+            return {"choices": [{"message": {"content": "New summary"}}], "usage": {"total_tokens": 42}}
+
+    grant = SimpleNamespace(
+        id=5, title="Solar Grant", funder_name="DOE", funding_amount_display="$50k",
+        description="Solar", summary_llm=None, identified_sector="Energy",
+    )
+
+    async def load_grant(db, grant_id):
+        return grant
+
+    async def no_rag(*args, **kwargs):
+        raise AssertionError("RAG context should come from the application")
+
+    monkeypatch.setattr(application_generator, "_load_grant", load_grant)
+    monkeypatch.setattr(application_generator, "_build_generation_context", no_rag)
+    monkeypatch.setattr(application_generator, "get_deepseek_client", lambda: FakeDeepSeek())
+
+    application = SimpleNamespace(
+        grant_id=5, user_id=1, tokens_used=100,
+        sections={"executive_summary": "Old summary", "impact_statement": "Impact"},
+        generation_context={"business_context": "We build solar farms", "context_chunks": []},
+    )
+
+    result = await application_generator.regenerate_application_section(
+        None, application, "executive_summary", feedback="Shorter"
+    )
+
+    # Original section prompt, then the previous text and the rewrite request
+    original = []
+    await application_generator._generate_executive_summary(
+        deepseek_client=SimpleNamespace(chat_completion=_record(original)),
+        grant=grant, business_context="We build solar farms",
+    )
+    assert len(calls) == 1 and calls[0]["use_cache"] is False
+    assert calls[0]["messages"][:2] == original[0]
+    assert calls[0]["messages"][2] == {"role": "assistant", "content": "Old summary"}
+    assert "Shorter" in calls[0]["messages"][3]["content"]
+    assert result["content"] == "New summary"
+    assert application.sections == {"executive_summary": "New summary", "impact_statement": "Impact"}
+    assert application.tokens_used == 142
+
+
+def _record(calls):
+    async def chat_completion(messages, **kwargs):
+        calls.append(messages)
+        return {"choices": [{"message": {"content": ""}}]}
+    return chat_completion
+
+
+@pytest.mark.parametrize("retries, discarded", [(0, []), (3, [(1, 5)])])
+def test_draft_is_discarded_only_after_the_last_retry(monkeypatch, retries, discarded):
+    task = application_generator.generate_grant_application
+    calls = []
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("LLM down")
+
+    async def discard(user_id, grant_id):
+        calls.append((user_id, grant_id))
+
+    monkeypatch.setattr(application_generator, "_generate_application_async", fail)
+    monkeypatch.setattr(application_generator, "_discard_draft", discard)
+    monkeypatch.setattr(task, "retry", lambda exc: exc)
+
+    task.push_request(retries=retries)
+    try:
+        with pytest.raises(RuntimeError):
+            task.run(1, 5, 9)
+    finally:
+        task.pop_request()
+
+    assert calls == discarded
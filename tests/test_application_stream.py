@@ -0,0 +1,103 @@
+"""
+Tests for the application generation event stream.
+"""
+
+import json
+
+import pytest
+
+from services.application_stream import ApplicationStream, StreamPublisher, format_sse, stream_channel
+from tasks.application_generator import _complete_section
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.closed = False
+
+    async def subscribe(self, channel):
+        self.channel = channel
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=1.0):
+        return {"data": json.dumps(self.messages.pop(0))} if self.messages else None
+
+    async def unsubscribe(self, channel):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self, replay, live):
+        self.replay = [json.dumps(e) for e in replay]
+        self.pubsub_client = FakePubSub(live)
+
+    def pubsub(self):
+        return self.pubsub_client
+
+    async def lrange(self, key, start, end):
+        return self.replay
+
+
+def make_stream(replay, live):
+    stream = ApplicationStream(redis_url="redis://test")
+    client = FakeRedis(replay, live)
+    stream._get_redis = lambda: client
+    return stream, client
+
+
+@pytest.mark.asyncio
+async def test_subscribe_replays_then_skips_duplicates_until_terminal():
+    started = {"id": "0.1", "event": "application", "application_id": 7}
+    stream, client = make_stream(
+        replay=[started],
+        live=[
+            started,
+            {"id": "0.2", "event": "token", "section": "needs_statement", "text": "Hi"},
+            {"id": "0.3", "event": "completed", "result": {}},
+            {"id": "0.4", "event": "token", "section": "x", "text": "never read"},
+        ],
+    )
+
+    events = [e async for e in stream.subscribe(stream_channel(1, "t"))]
+
+    assert [e["id"] for e in events] == ["0.1", "0.2", "0.3"]
+    assert client.pubsub_client.channel == "appstream:v1:1:t"
+    assert client.pubsub_client.closed
+
+
+@pytest.mark.asyncio
+async def test_publisher_ids_include_attempt_and_stop_after_redis_failure():
+    sent = []
+
+    class FlakyStream:
+        async def publish(self, channel, event):
+            sent.append(event)
+            return len(sent) < 2
+
+    publish = StreamPublisher(FlakyStream(), "chan", attempt=2)
+    await publish("application", application_id=3)
+    await publish("token", section="s", text="a")
+    await publish("token", section="s", text="b")
+
+    assert [e["id"] for e in sent] == ["2.1", "2.2"]
+    assert format_sse(sent[0]) == 'id: 2.1\nevent: application\ndata: {"application_id": 3}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_streamed_section_forwards_every_delta():
+    class StreamingClient:
+        async def chat_completion_stream(self, messages, temperature, max_tokens):
+            for delta in ("Our ", "mission"):
+                yield delta
+
+    deltas = []
+
+    async def on_token(text):
+        deltas.append(text)
+
+    result = await _complete_section(StreamingClient(), [], max_tokens=10, on_token=on_token)
+
+    assert deltas == ["Our ", "mission"]
+    assert result["content"] == "Our mission"
@@ -0,0 +1,93 @@
+"""
+Tests for chunked maintenance UPDATE/DELETE.
+"""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+from database.models import Grant
+from tasks.batch_ops import run_batched
+
+
+class FakeResult:
+    def __init__(self, ids):
+        self.ids = ids
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.ids
+
+
+class LockTimeout(Exception):
+    sqlstate = "55P03"
+
+
+class FakeSession:
+    def __init__(self, batches, lock_failures=0):
+        self.batches = list(batches)
+        self.lock_failures = lock_failures
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, statement, params=None):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        if sql.startswith("SET LOCAL"):
+            return None
+        if self.lock_failures:
+            self.lock_failures -= 1
+            raise OperationalError(sql, {}, LockTimeout())
+        self.statements.append(statement)
+        return FakeResult(self.batches.pop(0))
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.mark.asyncio
+async def test_update_walks_the_table_in_id_chunks():
+    db = FakeSession([[1, 2, 3], [7, 8, 9], [12]])
+    seen = []
+
+    count = await run_batched(
+        db, Grant.__table__, [Grant.record_status == "ACTIVE"],
+        values={"record_status": "STALE"}, label="stale", batch_size=3,
+        progress=lambda label, rows, batches: seen.append((rows, batches)),
+    )
+
+    assert count == 7
+    # One committed statement per chunk; a short chunk ends the walk
+    assert db.commits == 3
+    assert seen == [(3, 1), (6, 2), (7, 3)]
+    sql = str(db.statements[2].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE grants SET record_status=")
+    assert "grants.id > %(id_1)s" in sql and "LIMIT" in sql and "RETURNING grants.id" in sql
+    assert db.statements[2].compile().params["id_1"] == 9
+
+
+@pytest.mark.asyncio
+async def test_delete_retries_a_chunk_after_lock_timeout():
+    db = FakeSession([[4, 5]], lock_failures=1)
+
+    count = await run_batched(db, Grant.__table__, [Grant.record_status == "EXPIRED"], label="delete", batch_size=10)
+
+    assert count == 2
+    assert db.rollbacks == 1
+    assert str(db.statements[0].compile(dialect=postgresql.dialect())).startswith("DELETE FROM grants")
+
+
+@pytest.mark.asyncio
+async def test_other_database_errors_are_not_retried():
+    db = FakeSession([[1]], lock_failures=1)
+    LockTimeout.sqlstate = "40P01"
+    try:
+        with pytest.raises(OperationalError):
+            await run_batched(db, Grant.__table__, [], label="delete")
+    finally:
+        LockTimeout.sqlstate = "55P03"
@@ -345,4 +345,54 @@ async def test_enriched_grant_json_serialization(sample_enriched_grant):
     # Test that we can reconstruct from dict
     reconstructed = EnrichedGrant(**grant_dict)
     assert reconstructed.id == sample_enriched_grant.id
-    assert reconstructed.research_scores.sector_relevance == sample_enriched_grant.research_scores.sector_relevance
\ No newline at end of file
+    assert reconstructed.research_scores.sector_relevance == sample_enriched_grant.research_scores.sector_relevance
+
+@pytest.mark.asyncio
+async def test_bulk_store_grants_batches_writes(monkeypatch):
+    """A search cycle is persisted with one duplicate lookup, one upsert and one analyses insert."""
+    from types import SimpleNamespace
+    from app import crud
+
+    def enriched(title, url, score=None):
+        return EnrichedGrant(
+            id=title, title=title, description="Description", source_url=url,
+            compliance_scores=ComplianceScores(final_weighted_score=score) if score is not None else None,
+        )
+
+    title_duplicate = SimpleNamespace(id=7, title="Known", description="", user_id=None, source_url_key="other")
+    upsert_calls = []
+
+    async def fake_find(db, rows):
+        return [title_duplicate if row["title"] == "Known" else None for row in rows]
+
+    async def fake_upsert(db, rows):
+        upsert_calls.append(rows)
+        return [SimpleNamespace(id=100 + i, title=row["title"], description=row["description"]) for i, row in enumerate(rows)]
+
+    monkeypatch.setattr(crud, "find_duplicate_grants", fake_find)
+    monkeypatch.setattr(crud, "bulk_upsert_grants", fake_upsert)
+    invalidated = []
+    monkeypatch.setattr(crud, "invalidate_responses", AsyncMock(side_effect=lambda *tags: invalidated.append(tags)))
+    monkeypatch.setattr("services.embedding_service.get_embedding_service", lambda: SimpleNamespace(embed_grants=AsyncMock()))
+
+    db = AsyncMock()
+    db.begin_nested = MagicMock(return_value=AsyncMock())
+    stored = await crud.bulk_store_grants(db, [
+        enriched("New A", "https://a.example/1", 0.9),
+        enriched("New A again", "https://www.a.example/1/"),  # same URL identity as above
+        enriched("Known", "https://b.example/2"),
+        enriched("No URL", "not-a-url"),
+        enriched("New C", "https://c.example/3"),
+    ])
+
+    assert [g.id for g in stored] == [7, 100, 101]
+    assert [row["title"] for row in upsert_calls[0]] == ["New A", "New C"]
+    assert title_duplicate.description == "Description"  # more complete value filled in
+    assert invalidated == []  # nothing is committed yet; the caller invalidates after its commit
+    analyses_call = db.execute.await_args_list[0]
+    assert analyses_call.args[1] == [{
+        "grant_id": 100, "final_score": 0.9, "relevance_score": None, "compliance_score": None,
+        "feasibility_score": None, "relevance_details": None,
+        "compliance_details": {"business_logic_alignment": None, "feasibility_score": None,
+                               "strategic_synergy": None, "final_weighted_score": 0.9},
+    }]
@@ -0,0 +1,55 @@
+"""
+Tests for the grant_stats dashboard aggregates readers.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from services.dashboard_stats import read_distribution, read_stats
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, statement, params=None):
+        self.queries += 1
+        return iter(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_read_stats_is_one_query():
+    db = FakeSession([
+        SimpleNamespace(dimension="all", grant_count=40, score_sum=300.0, score_count=30),
+        SimpleNamespace(dimension="created_month", grant_count=4, score_sum=0, score_count=0),
+    ])
+
+    stats = await read_stats(db)
+
+    assert db.queries == 1
+    assert stats == {"totalGrants": 40, "averageScore": 10.0, "grantsThisMonth": 4, "upcomingDeadlines": 0}
+
+
+@pytest.mark.asyncio
+async def test_read_stats_requires_populated_table():
+    with pytest.raises(LookupError):
+        await read_stats(FakeSession([]))
+
+
+@pytest.mark.asyncio
+async def test_read_distribution_matches_chart_format():
+    db = FakeSession([
+        SimpleNamespace(dimension="sector", bucket="Health", grant_count=3),
+        SimpleNamespace(dimension="deadline_month", bucket="2026-12", grant_count=2),
+        SimpleNamespace(dimension="deadline_month", bucket="2026-11", grant_count=1),
+        SimpleNamespace(dimension="score_bucket", bucket="7", grant_count=5),
+        SimpleNamespace(dimension="score_bucket", bucket="10", grant_count=1),
+    ])
+
+    distribution = await read_distribution(db)
+
+    assert distribution["categories"] == [{"name": "Health", "value": 3}]
+    assert [d["name"] for d in distribution["deadlines"]] == ["2026-11", "2026-12"]
+    assert distribution["scores"] == [{"name": "70-79", "count": 5}, {"name": "100-109", "count": 1}]
@@ -0,0 +1,148 @@
+"""
+Tests for the DeepSeek client transport.
+"""
+
+import asyncio
+
+import pytest
+
+from services import deepseek_client
+from services.deepseek_client import close_http_client, get_http_client, reset_http_clients
+
+
+@pytest.mark.asyncio
+async def test_http_client_is_pooled_per_loop():
+    first = get_http_client()
+    assert get_http_client() is first
+
+    await close_http_client()
+    assert first.is_closed
+    assert get_http_client() is not first
+    await close_http_client()
+
+
+def test_http_client_not_shared_across_loops():
+    async def grab():
+        client = get_http_client()
+        await close_http_client()
+        return client
+
+    assert asyncio.run(grab()) is not asyncio.run(grab())
+
+
+@pytest.mark.asyncio
+async def test_reset_http_clients_forgets_pool():
+    get_http_client()
+    reset_http_clients()
+    assert len(deepseek_client._http_clients) == 0
+
+
+@pytest.mark.asyncio
+async def test_llm_cache_hit_counts_saved_tokens():
+    from services.llm_cache import LLMResponseCache, make_cache_key
+
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=60)
+    payload = {"model": "deepseek-chat", "messages": [{"role": "user", "content": "hi"}],
+               "temperature": 0.7, "max_tokens": 100, "stream": False}
+    key = make_cache_key(payload)
+
+    assert await cache.get(key) is None
+    await cache.set(key, {"choices": [], "usage": {"total_tokens": 42}})
+    assert (await cache.get(key))["usage"]["total_tokens"] == 42
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["tokens_saved"] == 42
+
+
+@pytest.mark.asyncio
+async def test_llm_cache_key_and_lru_eviction():
+    from services.llm_cache import LLMResponseCache, make_cache_key
+
+    base = {"model": "deepseek-chat", "messages": [], "temperature": 0.7, "max_tokens": 100}
+    assert make_cache_key({**base, "stream": True}) == make_cache_key(base)
+    assert make_cache_key({**base, "temperature": 0.3}) != make_cache_key(base)
+
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=60)
+    await cache.set("a", {})
+    await cache.set("b", {})
+    await cache.get("a")
+    await cache.set("c", {})
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_backs_off_on_429_and_recovers():
+    import httpx
+    from services.rate_limiter import AdaptiveRateLimiter
+
+    limiter = AdaptiveRateLimiter(rate=4.0, max_rate=8.0, burst=2)
+    throttled = httpx.Response(429, headers={"Retry-After": "0.05"})
+
+    assert await limiter.observe(throttled) == 0.05
+    assert limiter.rate == 2.0
+    assert limiter.stats()["throttled"] == 1
+
+    async with limiter.acquire():
+        pass
+    assert limiter.waited_seconds > 0
+
+    await limiter.observe(httpx.Response(200))
+    assert limiter.rate > 2.0
+
+
+def test_parse_retry_after_formats():
+    from services.rate_limiter import parse_retry_after
+
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("250ms") == 0.25
+    assert parse_retry_after("1.5s") == 1.5
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.asyncio
+async def test_per_call_timeout_keeps_the_short_connect_timeout(monkeypatch):
+    import httpx
+    from services.rate_limiter import AdaptiveRateLimiter
+
+    sent = []
+
+    class FakeClient:
+        async def post(self, url, json, headers, timeout):
+            sent.append(timeout)
+            return httpx.Response(200, json={"usage": {}}, request=httpx.Request("POST", url))
+
+    monkeypatch.setattr(deepseek_client, "get_http_client", lambda: FakeClient())
+    monkeypatch.setattr(deepseek_client, "get_rate_limiter", lambda: AdaptiveRateLimiter(rate=100.0, max_rate=100.0, burst=10))
+
+    client = deepseek_client.DeepSeekClient(api_key="test")
+    await client.chat_completion([{"role": "user", "content": "hi"}], use_cache=False)
+
+    assert sent[0].read == 60.0
+    assert sent[0].connect == deepseek_client.CONNECT_TIMEOUT_SECONDS == 10.0
+
+
+@pytest.mark.asyncio
+async def test_stream_releases_concurrency_slot_before_yielding_tokens(monkeypatch):
+    import httpx
+    from services.rate_limiter import AdaptiveRateLimiter
+
+    limiter = AdaptiveRateLimiter(rate=100.0, max_rate=100.0, burst=10, max_concurrency=1)
+    lines = ['data: {"choices": [{"delta": {"content": "Hi"}}]}', "data: [DONE]"]
+
+    def handler(request):
+        return httpx.Response(200, content="\n".join(lines).encode())
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(deepseek_client, "get_http_client", lambda: http)
+    monkeypatch.setattr(deepseek_client, "get_rate_limiter", lambda: limiter)
+
+    client = deepseek_client.DeepSeekClient(api_key="test")
+    async for token in client.chat_completion_stream([{"role": "user", "content": "hi"}]):
+        assert token == "Hi"
+        # The only slot is free again while this stream is still open
+        assert not limiter._state()["semaphore"].locked()
+    await http.aclose()
@@ -0,0 +1,122 @@
+"""
+Tests for batch duplicate grant detection.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.duplicate_detection import (
+    bulk_upsert_grants, dedupe_batch, find_duplicate_grants, grant_upsert_statement, grant_url_key,
+)
+
+LONG_TITLE = "Rural Community Solar Infrastructure Development Grant 2026"
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, match_rows, grants):
+        self.results = [FakeResult(match_rows), FakeResult(grants)]
+        self.calls = []
+
+    async def execute(self, statement, params=None, execution_options=None):
+        self.calls.append(params)
+        return self.results.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_in_priority_order_and_confirms_fuzzy_candidates():
+    existing = [SimpleNamespace(id=10), SimpleNamespace(id=11)]
+    rows = [
+        # Grant 0: URL match wins over the fuzzy candidate listed after it
+        SimpleNamespace(idx=0, id=10, strategy=1, title="Anything"),
+        SimpleNamespace(idx=0, id=11, strategy=3, title=LONG_TITLE),
+        # Grant 1: nearest title is not similar enough, next one is
+        SimpleNamespace(idx=1, id=12, strategy=3, title="Urban Water Resilience Planning Grant Program"),
+        SimpleNamespace(idx=1, id=11, strategy=3, title=LONG_TITLE + "."),
+    ]
+    db = FakeSession(rows, existing)
+
+    found = await find_duplicate_grants(db, [
+        {"title": "Other", "source_url": "https://a.example/1"},
+        {"title": LONG_TITLE, "source_url": ""},
+        {"title": "Unrelated", "deadline": "2026-11-01T00:00:00Z"},
+    ])
+
+    assert [g.id if g else None for g in found] == [10, 11, None]
+    # One matching query for the whole batch, one to load the matches
+    assert len(db.calls) == 2
+    assert db.calls[0]["url_keys"] == [grant_url_key("https://a.example/1"), None, None]
+    assert db.calls[0]["deadlines"][2] == datetime(2026, 11, 1)
+
+
+def test_dedupe_batch_drops_repeats_within_batch():
+    batch = [
+        {"title": LONG_TITLE, "source_url": "https://a.example/1"},
+        {"title": "Different", "source_url": "https://a.example/1"},
+        {"title": LONG_TITLE.lower(), "source_url": "https://b.example/2"},
+        {"title": "Small Grant", "source_url": "https://c.example/3", "deadline": datetime(2026, 1, 1)},
+        {"title": "Small Grant", "source_url": "https://d.example/4", "deadline": datetime(2026, 1, 1)},
+        {"title": "Small Grant", "source_url": "https://e.example/5"},
+    ]
+
+    kept = dedupe_batch(batch)
+
+    assert [g["source_url"] for g in kept] == [
+        "https://a.example/1",
+        "https://c.example/3",
+        "https://e.example/5",
+    ]
+
+
+def test_url_key_ignores_presentation_differences_but_not_query():
+    key = grant_url_key("https://www.Grants.gov/view/?oppId=123&utm_source=mail#apply")
+
+    assert key == grant_url_key("http://grants.gov/view?oppId=123")
+    assert key != grant_url_key("https://grants.gov/view?oppId=124")
+    assert grant_url_key("mailto:someone@example.com") is None
+    assert grant_url_key(None) is None
+
+
+def test_upsert_targets_the_unique_url_key_index():
+    stmt = grant_upsert_statement([{"title": "T", "source_url": "https://a.example/1", "description": None}])
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT (source_url_key, coalesce(user_id, 0)) WHERE source_url_key IS NOT NULL" in sql
+    # Incoming NULLs keep the stored value
+    assert "description = coalesce(excluded.description, grants.description)" in sql
+    assert stmt.compile().params["source_url_key_m0"] == grant_url_key("https://a.example/1")
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_is_one_statement_and_maps_rows_back_by_url():
+    rows = [
+        {"title": "A", "source_url": "https://a.example/1"},
+        {"title": "B", "source_url": "https://b.example/2", "description": "d"},
+    ]
+    returned = [
+        SimpleNamespace(id=2, source_url_key=grant_url_key("https://b.example/2")),
+        SimpleNamespace(id=1, source_url_key=grant_url_key("https://a.example/1")),
+    ]
+    db = FakeSession(returned, [])
+    db.results = [FakeResult(returned)]
+
+    grants = await bulk_upsert_grants(db, rows)
+
+    assert [g.id for g in grants] == [1, 2]
+    assert len(db.calls) == 1
@@ -0,0 +1,214 @@
+"""
+Tests for embedding generation helpers.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from services.embedding_executor import EmbeddingExecutor
+
+
+@pytest.mark.asyncio
+async def test_executor_batches_concurrent_callers_off_loop():
+    calls = []
+    loop_thread = threading.get_ident()
+
+    def fake_embed(texts):
+        calls.append((threading.get_ident(), list(texts)))
+        return [[float(len(t))] for t in texts]
+
+    executor = EmbeddingExecutor(fake_embed, max_batch_size=64, max_wait_ms=50)
+    results = await asyncio.gather(
+        executor.embed(["a"]),
+        executor.embed(["bb", "ccc"]),
+        executor.embed(["dddd"]),
+    )
+    executor.shutdown()
+
+    assert results == [[[1.0]], [[2.0], [3.0]], [[4.0]]]
+    assert len(calls) == 1
+    assert calls[0][0] != loop_thread
+    assert executor.stats()["avg_batch_size"] == 4
+
+
+@pytest.mark.asyncio
+async def test_executor_propagates_unavailable_model():
+    executor = EmbeddingExecutor(lambda texts: None, max_wait_ms=1)
+    assert await executor.embed(["x"]) is None
+    assert await executor.embed([]) == []
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_embedding_cache_disk_tier_roundtrip(tmp_path):
+    from unittest.mock import AsyncMock, MagicMock
+    from services.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache("test-model", disk_dir=str(tmp_path))
+    key = cache.hash("chunk text")
+    assert key == cache.hash("chunk text")
+    assert key != EmbeddingCache("other-model").hash("chunk text")
+
+    db = MagicMock()
+    db.execute = AsyncMock()
+    db.begin_nested = MagicMock(side_effect=Exception("no database"))
+
+    await cache.put_many(db, {key: [0.5, 0.25]})
+    found = await cache.get_many(db, [key])
+
+    assert list(found[key]) == [0.5, 0.25]
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_warm_up_model_marks_ready(monkeypatch):
+    from services import embedding_service
+
+    class FakeModel:
+        def embed(self, texts):
+            return iter([[0.0] * 384 for _ in texts])
+
+    monkeypatch.setattr(embedding_service, "_embedding_model", FakeModel())
+    monkeypatch.setattr(embedding_service, "_model_status", {
+        "state": "not_loaded", "error": None, "load_seconds": None, "loaded_at": None
+    })
+
+    assert embedding_service.get_model_status()["state"] == "not_loaded"
+    assert embedding_service.warm_up_model() is True
+    assert embedding_service.get_model_status()["state"] == "ready"
+
+
+@pytest.mark.asyncio
+async def test_score_grants_for_user_is_one_query():
+    from types import SimpleNamespace
+    from services.embedding_service import EmbeddingService
+
+    class FakeSession:
+        def __init__(self):
+            self.statements = []
+
+        async def execute(self, statement, params=None):
+            self.statements.append((str(statement), params))
+            return [
+                SimpleNamespace(grant_id=1, similarity=1.0),
+                SimpleNamespace(grant_id=2, similarity=0.0),
+                SimpleNamespace(grant_id=3, similarity=float("nan")),
+            ]
+
+    db = FakeSession()
+    scores = await EmbeddingService().score_grants_for_user(db, user_id=7, grant_ids=[1, 2, 3, 4])
+
+    assert scores == {1: 1.0, 2: 0.5, 3: 0.5, 4: 0.5}
+    assert len(db.statements) == 1
+    assert db.statements[0][1]["ids"] == [1, 2, 3, 4]
+    assert "embedding_centroid" in db.statements[0][0]
+
+
+@pytest.mark.asyncio
+async def test_score_requested_grants_top_k_ranks_before_limit():
+    from types import SimpleNamespace
+    from services.embedding_service import EmbeddingService
+
+    class FakeSession:
+        async def execute(self, statement, params=None):
+            self.sql = " ".join(str(statement).split())
+            return [SimpleNamespace(grant_id=3, similarity=0.8), SimpleNamespace(grant_id=1, similarity=0.2)]
+
+    db = FakeSession()
+    scores = await EmbeddingService().score_grants_for_user(db, user_id=7, grant_ids=[1, 2, 3, 4], top_k=2)
+
+    assert "ORDER BY distance NULLS LAST LIMIT :topk" in db.sql
+    # Only the top_k best; the rest are not padded in as neutral scores
+    assert list(scores) == [3, 1]
+
+
+def test_vector_type_defers_to_binary_codec_on_asyncpg():
+    import numpy as np
+    from pgvector.utils import Vector as PgVectorValue
+    from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+    from database.vector import Vector
+
+    # asyncpg: raw float32 arrays go straight to pgvector's binary codec
+    assert Vector(3).bind_processor(asyncpg.dialect()) is None
+    assert PgVectorValue._to_db_binary(np.array([1, 2, 3], dtype=np.float32))[4:] == (
+        np.array([1, 2, 3], dtype=">f4").tobytes()
+    )
+    # Sync drivers (Alembic, scripts) keep the text format
+    assert Vector(3).bind_processor(psycopg2.dialect())([1, 2, 3]) == "[1.0,2.0,3.0]"
+
+
+class _RowsSession:
+    """Fake session returning queued row lists and recording SQL."""
+
+    def __init__(self, *results, scalar=None):
+        self.results = list(results)
+        self.statements = []
+        self.scalar_value = scalar
+
+    async def execute(self, statement, params=None):
+        from unittest.mock import MagicMock
+        self.statements.append(str(statement))
+        result = MagicMock()
+        rows = self.results.pop(0)
+        result.all.return_value = rows
+        result.__iter__.return_value = iter(rows)
+        return result
+
+    async def scalar(self, statement):
+        return self.scalar_value
+
+
+@pytest.mark.asyncio
+async def test_grant_context_uses_stored_vectors_without_inference():
+    from types import SimpleNamespace
+    from services.embedding_service import EmbeddingService
+
+    svc = EmbeddingService()
+
+    async def no_inference(texts):
+        raise AssertionError("stored grant vectors should be the query")
+
+    svc.agenerate_embeddings = no_inference
+    db = _RowsSession([
+        SimpleNamespace(text_content="Solar installs", chunk_index=2, similarity=0.9, query_vectors=4),
+        SimpleNamespace(text_content="Team of 12", chunk_index=0, similarity=0.4, query_vectors=4),
+    ])
+
+    chunks = await svc.retrieve_relevant_context(db, user_id=1, query="Solar grant", top_k=2, grant_id=9)
+
+    assert [c["chunk_index"] for c in chunks] == [2, 0]
+    assert "max(1 - (pe.embedding <=> q.embedding))" in db.statements[0]
+
+
+@pytest.mark.asyncio
+async def test_query_embedding_is_cached_by_text_hash():
+    import numpy as np
+    from types import SimpleNamespace
+    from services.embedding_service import EmbeddingService
+
+    svc = EmbeddingService()
+    store = {}
+    inferred = []
+
+    async def get_many(db, keys):
+        return {k: store[k] for k in keys if k in store}
+
+    async def put_many(db, vectors):
+        store.update(vectors)
+
+    async def embed(texts):
+        inferred.extend(texts)
+        return [np.zeros(384, dtype=np.float32) for _ in texts]
+
+    svc.cache.get_many = get_many
+    svc.cache.put_many = put_many
+    svc.agenerate_embeddings = embed
+    row = SimpleNamespace(text_content="Mission", chunk_index=0, similarity=0.7)
+
+    # Grant without stored vectors falls back to embedding the query text
+    db = _RowsSession([], [row], [row], scalar=None)
+    await svc.retrieve_relevant_context(db, user_id=1, query="Solar grant", grant_id=9)
+    await svc.retrieve_relevant_context(db, user_id=1, query="Solar grant")
+
+    assert inferred == ["Solar grant"]
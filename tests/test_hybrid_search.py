@@ -0,0 +1,50 @@
+"""
+Tests for hybrid (full-text + vector) grant search.
+"""
+
+import pytest
+
+from services import hybrid_search
+from services.hybrid_search import reciprocal_rank_fusion
+
+
+class FakeSession:
+    def begin_nested(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_rrf_rewards_agreement_between_retrievers():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 4]], k=60)
+
+    # 3 appears in both lists and beats 1, which only tops one of them
+    assert list(fused)[0] == 3
+    assert fused[3] == pytest.approx(1 / 63 + 1 / 61)
+    assert set(fused) == {1, 2, 3, 4}
+
+
+@pytest.mark.asyncio
+async def test_hybrid_candidates_fall_back_when_full_text_missing(monkeypatch):
+    async def broken_lexical(db, query, limit):
+        raise RuntimeError('column "search_vector" does not exist')
+
+    monkeypatch.setattr(hybrid_search, "lexical_candidates", broken_lexical)
+    assert await hybrid_search.hybrid_grant_candidates(FakeSession(), "solar") is None
+
+
+@pytest.mark.asyncio
+async def test_hybrid_candidates_survive_vector_failure(monkeypatch):
+    async def lexical(db, query, limit):
+        return [5, 7]
+
+    async def broken_semantic(db, query, limit):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(hybrid_search, "lexical_candidates", lexical)
+    monkeypatch.setattr(hybrid_search, "semantic_candidates", broken_semantic)
+    assert list(await hybrid_search.hybrid_grant_candidates(FakeSession(), "solar")) == [5, 7]
@@ -0,0 +1,82 @@
+"""
+Tests for keyset (cursor) pagination helpers.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    fetch_keyset_page,
+    keyset_condition,
+)
+from database.models import SearchRun
+
+
+def test_cursor_roundtrip_and_sort_binding():
+    created = datetime(2026, 1, 2, 3, 4, 5)
+    token = encode_cursor("created_at", created, 42)
+
+    assert decode_cursor(token, "created_at") == (created, 42)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, "title")
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", "created_at")
+
+
+def test_keyset_condition_seeks_past_last_row():
+    condition = keyset_condition(SearchRun.created_at, SearchRun.id, datetime(2026, 1, 1), 7, descending=True)
+    sql = str(select(SearchRun.id).where(condition).compile(dialect=postgresql.dialect()))
+
+    assert "search_runs.created_at < " in sql
+    assert "search_runs.id < " in sql
+    assert "OFFSET" not in sql
+
+
+@pytest.mark.asyncio
+async def test_fetch_keyset_page_returns_cursor_only_when_more_rows():
+    rows = [SimpleNamespace(id=i, created_at=datetime(2026, 1, i)) for i in (3, 2, 1)]
+
+    class FakeSession:
+        async def execute(self, statement):
+            limit = statement._limit_clause.value
+            return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: rows[:limit]))
+
+    kwargs = dict(
+        sort_key="created_at",
+        sort_column=SearchRun.created_at,
+        id_column=SearchRun.id,
+        descending=True,
+        sort_value=lambda run: run.created_at,
+    )
+    page, next_cursor = await fetch_keyset_page(FakeSession(), select(SearchRun), limit=2, **kwargs)
+    assert [r.id for r in page] == [3, 2]
+    assert decode_cursor(next_cursor, "created_at") == (datetime(2026, 1, 2), 2)
+
+    page, next_cursor = await fetch_keyset_page(FakeSession(), select(SearchRun), limit=3, **kwargs)
+    assert len(page) == 3 and next_cursor is None
+
+
+def test_grant_listing_query_has_one_row_per_grant():
+    from app.crud import grant_listing_query, safe_convert_to_enriched_grant
+    from database.models import Grant as DBGrant
+
+    sql = str(grant_listing_query().compile(dialect=postgresql.dialect()))
+    assert "LEFT OUTER JOIN LATERAL" in sql
+    assert "LIMIT" in sql  # latest analysis only
+    assert "search_vector" not in sql and "embedding_centroid" not in sql
+
+    # Listing rows carry the latest analysis as flat columns
+    row = SimpleNamespace(
+        **{column.key: None for column in DBGrant.__table__.columns},
+        analysis_id=3, analysis_final_score=0.9, analysis_feasibility_score=0.4,
+    )
+    row.id, row.title, row.description = 1, "Solar grant", "Rooftop solar for nonprofits"
+    enriched = safe_convert_to_enriched_grant(row)
+    assert enriched.compliance_scores.final_weighted_score == 0.9
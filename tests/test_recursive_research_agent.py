@@ -0,0 +1,76 @@
+"""
+Tests for RecursiveResearchAgent chunk planning.
+"""
+
+import pytest
+
+from agents.recursive_research_agent import ChunkedSearchResult, RecursiveResearchAgent
+from app.models import GrantFilter
+
+
+def _agent_with_fake_chunks(grants_per_chunk: int):
+    agent = RecursiveResearchAgent(db_session_maker=None)
+    calls = []
+
+    async def fake_process(chunk, processed_urls):
+        calls.append(chunk.chunk_id)
+        grants = [
+            {
+                "title": f"{chunk.chunk_id} grant {i}",
+                "source_url": f"https://example.org/{chunk.chunk_id}/{i}",
+                "geographic_focus": chunk.geographic_focus,
+                "sector_focus": chunk.sector_focus,
+            }
+            for i in range(grants_per_chunk)
+        ]
+        return ChunkedSearchResult(grants=grants, search_metadata={}, chunk_info=chunk)
+
+    agent._process_search_chunk = fake_process
+    return agent, calls
+
+
+@pytest.mark.asyncio
+async def test_planned_search_executes_each_distinct_chunk_once():
+    agent, calls = _agent_with_fake_chunks(grants_per_chunk=0)
+    filters = {
+        user_id: GrantFilter(keywords="broadband, shelters", geographic_focus="Louisiana")
+        for user_id in (1, 2, 3)
+    }
+
+    results = await agent.search_grants_for_filters(filters)
+
+    chunks = agent._create_search_chunks(filters[1])
+    assert len(calls) == len({agent._chunk_signature(c) for c in chunks})
+    assert set(results) == {1, 2, 3}
+
+
+@pytest.mark.asyncio
+async def test_planned_search_fans_out_and_stops_widening():
+    agent, calls = _agent_with_fake_chunks(grants_per_chunk=2)
+    filters = {1: GrantFilter(keywords="broadband"), 2: GrantFilter(keywords="shelters")}
+
+    results = await agent.search_grants_for_filters(filters)
+
+    # Local tier alone yields enough grants, so wider tiers are never searched
+    assert all(call.split("_")[-2] == "local" for call in calls)
+    assert results[1] and [g.title for g in results[1]] == [g.title for g in results[2]]
+
+
+@pytest.mark.asyncio
+async def test_streaming_search_yields_incrementally_with_progress():
+    agent, calls = _agent_with_fake_chunks(grants_per_chunk=1)
+    events = []
+
+    async def on_progress(event):
+        events.append(event)
+
+    stream = agent.stream_grants_recursive(GrantFilter(keywords="broadband"), on_progress=on_progress)
+    first = await stream.__anext__()
+    assert first.source_url.startswith("https://example.org/")
+
+    rest = [grant async for grant in stream]
+    assert len({g.source_url for g in [first, *rest]}) == 1 + len(rest)
+    # 4 local chunks give 4 grants (< 5), so only the state tier is added
+    assert len(calls) == 8
+    assert events[-1].tier == "state"
+    assert events[-1].chunks_done == events[-1].chunks_total == 8
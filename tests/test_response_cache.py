@@ -0,0 +1,77 @@
+"""
+Tests for the dashboard response cache.
+"""
+
+import pytest
+from starlette.requests import Request
+
+from services.response_cache import GRANTS, SEARCH_RUNS, ResponseCache
+from services import response_cache
+
+
+def make_request(path, query=b"", token=None):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": headers})
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(max_entries=8, ttl_seconds=60)
+    monkeypatch.setattr(response_cache, "get_response_cache", lambda: cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_hit_until_tag_is_invalidated(cache):
+    first = await response_cache.cached_response(make_request("/api/dashboard/stats"), GRANTS)
+    assert not first.hit
+    await first.store({"data": {"totalGrants": 3}})
+
+    second = await response_cache.cached_response(make_request("/api/dashboard/stats"), GRANTS)
+    assert second.hit and second.value == {"data": {"totalGrants": 3}}
+
+    # Search-run writes leave grant-derived responses alone
+    await response_cache.invalidate_responses(SEARCH_RUNS)
+    assert (await response_cache.cached_response(make_request("/api/dashboard/stats"), GRANTS)).hit
+
+    await response_cache.invalidate_responses(GRANTS)
+    assert not (await response_cache.cached_response(make_request("/api/dashboard/stats"), GRANTS)).hit
+
+
+@pytest.mark.asyncio
+async def test_key_covers_params_and_user(cache, monkeypatch):
+    monkeypatch.setattr(response_cache, "_user_scope", lambda request: request.headers.get("authorization", "anon"))
+
+    stored = await response_cache.cached_response(make_request("/api/search-runs/statistics", b"days_back=7", "a"), SEARCH_RUNS)
+    await stored.store({"data": 1})
+
+    assert (await response_cache.cached_response(make_request("/api/search-runs/statistics", b"days_back=7", "a"), SEARCH_RUNS)).hit
+    assert not (await response_cache.cached_response(make_request("/api/search-runs/statistics", b"days_back=30", "a"), SEARCH_RUNS)).hit
+    assert not (await response_cache.cached_response(make_request("/api/search-runs/statistics", b"days_back=7", "b"), SEARCH_RUNS)).hit
+
+
+@pytest.mark.asyncio
+async def test_invalidate_after_commit_waits_for_the_commit(cache):
+    import asyncio
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+
+    engine = create_engine("sqlite://")
+    with Session(engine) as session:
+        session.execute(text("select 1"))
+        response_cache.invalidate_after_commit(session, GRANTS)
+        await asyncio.sleep(0)
+        assert cache.invalidations == 0
+
+        session.commit()
+        await asyncio.sleep(0)
+        assert cache.invalidations == 1 and cache._generations == {GRANTS: 1}
+
+        # Rolled-back writes never invalidate
+        session.execute(text("select 1"))
+        response_cache.invalidate_after_commit(session, GRANTS)
+        session.rollback()
+        session.execute(text("select 1"))
+        session.commit()
+        await asyncio.sleep(0)
+        assert cache.invalidations == 1
@@ -0,0 +1,87 @@
+"""
+Tests for the fast grant listing serialization path.
+"""
+
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.crud import safe_convert_to_enriched_grant
+from app.serialization import grant_row_to_dict, paginated_grants_response
+from database.models import Grant as DBGrant
+
+
+def _listing_row(**overrides):
+    values = {column.key: None for column in DBGrant.__table__.columns}
+    values.update(
+        id=11,
+        title="Rural broadband grant",
+        description="Funding for last-mile connectivity",
+        funding_amount_max=250000,
+        deadline=datetime(2026, 12, 1, 17, 0),
+        retrieved_at=datetime(2026, 10, 1, 8, 30, 15, 123456),
+        keywords_json='["broadband", "rural"]',
+        categories_project_json=["infrastructure"],
+        compliance_summary_json='{"status": "ok"}',
+        risk_assessment_json="not json",
+        overall_composite_score=0.72,
+        analysis_id=5,
+        analysis_final_score=0.8,
+        analysis_feasibility_score=None,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def _render(content):
+    return json.loads(paginated_grants_response(content, 1, 1, 20).body)["items"]
+
+
+def test_fast_path_matches_pydantic_output():
+    for row in (_listing_row(), _listing_row(analysis_id=None, keywords_json=None)):
+        expected = json.loads(safe_convert_to_enriched_grant(row).model_dump_json())
+        assert _render([grant_row_to_dict(row)]) == [expected]
+
+
+def test_fast_path_skips_rows_pydantic_would_reject():
+    assert grant_row_to_dict(_listing_row(description=None)) is None
+
+
+def _stub_keyset_page(monkeypatch, rows):
+    import app.crud as crud
+
+    async def fetch_keyset_page(db, query, **kwargs):
+        return rows, None
+
+    monkeypatch.setattr(crud, "fetch_keyset_page", fetch_keyset_page)
+
+
+@pytest.mark.asyncio
+async def test_get_grants_page_fast_serialize_returns_dicts(monkeypatch):
+    from app.crud import get_grants_page
+
+    _stub_keyset_page(monkeypatch, [_listing_row()])
+
+    page = await get_grants_page(db=None, include_total=False, fast_serialize=True)
+
+    assert [item["id"] for item in page.items] == [grant_row_to_dict(_listing_row())["id"]]
+    assert isinstance(page.items[0], dict)
+
+
+def test_grants_endpoint_serves_fast_path(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.dependencies import get_db_session
+    from app.router import api_router
+
+    _stub_keyset_page(monkeypatch, [_listing_row()])
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api")
+    app.dependency_overrides[get_db_session] = lambda: None
+
+    response = TestClient(app).get("/api/grants", params={"includeTotal": "false"})
+
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()["items"]] == ["Rural broadband grant"]
@@ -0,0 +1,47 @@
+"""
+Tests for the persistent Celery worker event loop.
+"""
+
+import asyncio
+
+import pytest
+
+from tasks import worker_runtime
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    disposed = []
+
+    async def fake_dispose():
+        disposed.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr("database.session.dispose_engine", fake_dispose)
+    yield disposed
+    worker_runtime.shutdown_worker_runtime()
+
+
+def test_tasks_share_one_loop_until_shutdown(runtime):
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = worker_runtime.run_async(current_loop())
+    second = worker_runtime.run_async(current_loop())
+
+    assert first is second
+    assert first.is_running()
+
+    worker_runtime.shutdown_worker_runtime()
+
+    # Pool is disposed on the loop that owns its connections, then the loop stops
+    assert runtime == [first]
+    assert first.is_closed()
+    assert worker_runtime.run_async(current_loop()) is not first
+
+
+def test_run_async_propagates_task_errors(runtime):
+    async def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        worker_runtime.run_async(fail())
@@ -76,16 +76,36 @@ class PgVectorClient:
 
     async def score_grant_for_user(self, grant_id: int, user_id: int) -> float:
         """Score a grant's relevance to a user's business profile."""
+        scores = await self.score_grants_for_user([grant_id], user_id)
+        return scores.get(grant_id, 0.5)
+
+    async def score_grants_for_user(
+        self, grant_ids: List[int], user_id: int
+    ) -> Dict[int, float]:
+        """Score many grants against a user's business profile in one session and query."""
         if self.use_mock:
-            return 0.5
+            return {grant_id: 0.5 for grant_id in grant_ids}
         try:
             from services.embedding_service import get_embedding_service
             svc = get_embedding_service()
             async with self.db_sessionmaker() as session:
-                return await svc.score_grant_relevance(session, grant_id, user_id)
+                return await svc.score_grants_for_user(session, user_id, grant_ids)
         except Exception as e:
-            logger.error(f"Failed to score grant {grant_id} for user {user_id}: {e}")
-            return 0.5
+            logger.error(f"Failed to score {len(grant_ids)} grants for user {user_id}: {e}")
+            return {grant_id: 0.5 for grant_id in grant_ids}
+
+    async def rank_grants_for_user(self, user_id: int, top_k: int = 50) -> Dict[int, float]:
+        """Rank a user's active grants by profile similarity, best first."""
+        if self.use_mock:
+            return {}
+        try:
+            from services.embedding_service import get_embedding_service
+            svc = get_embedding_service()
+            async with self.db_sessionmaker() as session:
+                return await svc.score_grants_for_user(session, user_id, top_k=top_k)
+        except Exception as e:
+            logger.error(f"Failed to rank grants for user {user_id}: {e}")
+            return {}
 
     async def find_similar_grants(
         self, query_embedding: List[float], top_k: int = 10, user_id: Optional[int] = None